@@ -8,9 +8,15 @@ Provides:
 - Component-level compliance details
 - Deal configurations and compliance
 - Monitoring card details
+- Portfolio-wide metrics (vectorized)
+
+CACHING:
+- /overview and /monitoring/{card_type} are served from precomputed
+  snapshots (see dashboard_snapshot.py) with strong ETags; clients that
+  send If-None-Match get 304 Not Modified while nothing has changed
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from typing import Optional, List
 from app.models import (
     DashboardMetrics,
@@ -18,16 +24,33 @@ from app.models import (
     DealConfiguration,
     ComponentType
 )
-from app.services.dashboard_service import DashboardService
+from app.services.dashboard_service import (
+    DashboardService,
+    PORTFOLIO_GROUPS,
+    PORTFOLIO_PERIODS
+)
+from app.services.dashboard_snapshot import get_dashboard_snapshot_cache
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
+async def _snapshot_response(request: Request, key: str) -> Response:
+    """Serve a cached snapshot, or 304 if the client's ETag still matches"""
+    cache = get_dashboard_snapshot_cache()
+    snapshot = await cache.get(key)
+    if cache.matches(request.headers.get("if-none-match"), snapshot):
+        return Response(status_code=304, headers=snapshot.headers())
+    return Response(content=snapshot.body, media_type="application/json", headers=snapshot.headers())
+
+
 @router.get("/overview", response_model=DashboardMetrics)
-async def get_dashboard_overview():
+async def get_dashboard_overview(request: Request):
     """
     Get complete dashboard overview with all 4 component compliances.
 
+    Served from a cached snapshot with an ETag header. Send the ETag back
+    as If-None-Match to get 304 Not Modified when nothing changed.
+
     Returns:
         DashboardMetrics: Complete dashboard with component compliances,
                          monitoring cards, and active deals
@@ -50,7 +73,7 @@ async def get_dashboard_overview():
         }
     """
     try:
-        return await DashboardService.get_dashboard_overview()
+        return await _snapshot_response(request, "overview")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load dashboard: {str(e)}")
 
@@ -145,10 +168,12 @@ async def get_deal_compliance(deal_id: str):
 
 
 @router.get("/monitoring/{card_type}")
-async def get_monitoring_card_details(card_type: str):
+async def get_monitoring_card_details(card_type: str, request: Request):
     """
     Get detailed breakdown for a monitoring card.
 
+    Served from a cached snapshot with an ETag header (If-None-Match -> 304).
+
     Args:
         card_type: One of: contracts, shariah_reviews, impact_validations, documents
 
@@ -178,9 +203,56 @@ async def get_monitoring_card_details(card_type: str):
         )
 
     try:
-        return await DashboardService.get_monitoring_card_details(card_type)
+        return await _snapshot_response(request, f"monitoring:{card_type}")
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to load monitoring card {card_type}: {str(e)}"
         )
+
+
+@router.get("/portfolio")
+async def get_portfolio_metrics(
+    time_period: str = Query("all_time", description=f"One of: {', '.join(PORTFOLIO_PERIODS)}"),
+    group_by: Optional[str] = Query(None, description=f"One of: {', '.join(PORTFOLIO_GROUPS)}")
+):
+    """
+    Get portfolio-wide compliance metrics.
+
+    Computed in a single vectorized pass over all deals (see
+    portfolio_compliance.py), so it stays fast for large portfolios.
+
+    Args:
+        time_period: Only include deals created within this period
+        group_by: Optional breakdown (contract_type, impact_methodology, status, owner)
+
+    Example:
+        GET /api/dashboard/portfolio?time_period=last_30_days&group_by=contract_type
+
+        Returns:
+        {
+            "time_period": "last_30_days",
+            "group_by": "contract_type",
+            "metrics": {
+                "total_contracts": 12,
+                "by_compliance_status": {"compliant": 3, "needs_attention": 2, "in_progress": 7},
+                "components": {"shariah_structure": {...}, ...},
+                "groups": {"murabaha": {"deal_count": 4, ...}, ...}
+            }
+        }
+    """
+    if time_period not in PORTFOLIO_PERIODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid time_period. Must be one of: {', '.join(PORTFOLIO_PERIODS)}"
+        )
+    if group_by is not None and group_by not in PORTFOLIO_GROUPS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid group_by. Must be one of: {', '.join(PORTFOLIO_GROUPS)}"
+        )
+
+    try:
+        return await DashboardService.get_portfolio_metrics(time_period, group_by)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load portfolio metrics: {str(e)}")
@@ -5,10 +5,12 @@ REST API endpoints for Islamic Finance deal lifecycle management.
 
 ENDPOINTS:
 - POST /api/deals - Create new deal from workflow completion
-- GET /api/deals - List all deals (with optional filtering)
+- GET /api/deals - List deals (filtering, projection, keyset pagination)
 - GET /api/deals/{deal_id} - Get specific deal details
 - PUT /api/deals/{deal_id} - Update deal
 - DELETE /api/deals/{deal_id} - Delete deal
+- GET /api/deals/stats/summary - O(1) deal statistics
+- POST /api/deals/stats/verify - Rebuild stats counters and report drift
 
 INTEGRATION:
 - Called by Step 10 (Live Execution) after Guardian deployment
@@ -29,12 +31,19 @@ USAGE:
     # List all active deals
     GET /api/deals?status=active
 
+    # Filter by components and fetch only the rendered columns
+    GET /api/deals?jurisdiction=qatar_qfc&fields=deal_name,status
+
+    # Page through deals (next page cursor is in the X-Next-Cursor header)
+    GET /api/deals?limit=20
+    GET /api/deals?limit=20&cursor=<X-Next-Cursor>
+
     # Get specific deal
     GET /api/deals/deal-550e8400-e29b-41d4-a716-446655440000
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from fastapi.responses import JSONResponse
 
 from app.models import Deal, DealCreate
@@ -89,7 +98,7 @@ async def create_deal(deal_data: DealCreate):
     ```
     """
     try:
-        deal = DealStorage.create_deal(deal_data)
+        deal = await DealStorage.create_deal(deal_data)
         return deal
     except Exception as e:
         raise HTTPException(
@@ -100,53 +109,114 @@ async def create_deal(deal_data: DealCreate):
 
 @router.get("", response_model=List[Deal])
 async def list_deals(
+    response: Response,
     status: Optional[str] = Query(
         None,
         description="Filter by status: draft, active, completed, archived"
     ),
-    limit: Optional[int] = Query(
+    shariah_structure: Optional[str] = Query(None, description="Filter by Shariah structure ID"),
+    jurisdiction: Optional[str] = Query(None, description="Filter by jurisdiction ID"),
+    accounting_standard: Optional[str] = Query(None, description="Filter by accounting standard ID"),
+    impact_framework: Optional[str] = Query(None, description="Filter by impact framework ID"),
+    originator: Optional[str] = Query(None, description="Filter by originating institution"),
+    min_amount: Optional[float] = Query(None, description="Minimum deal amount (inclusive)", ge=0),
+    max_amount: Optional[float] = Query(None, description="Maximum deal amount (inclusive)", ge=0),
+    fields: Optional[str] = Query(
         None,
+        description="Comma-separated list of fields to return (deal_id is always included)"
+    ),
+    limit: int = Query(
+        50,
         description="Maximum number of deals to return",
         ge=1,
         le=100
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description="Pagination cursor from the X-Next-Cursor header of the previous page"
     )
 ):
     """
-    List all deals with optional filtering.
+    List deals with server-side filtering, projection and keyset pagination.
 
     **Query Parameters:**
     - `status` (optional): Filter by deal status (draft, active, completed, archived)
-    - `limit` (optional): Maximum number of deals to return (1-100)
+    - `shariah_structure`, `jurisdiction`, `accounting_standard`, `impact_framework`,
+      `originator` (optional): Exact-match component filters
+    - `min_amount`, `max_amount` (optional): Deal amount range (inclusive)
+    - `fields` (optional): Projection, e.g. `fields=deal_name,status,overall_completion`
+    - `limit` (optional): Page size (1-100, default 50)
+    - `cursor` (optional): Cursor for the next page
 
     **Returns:**
-    - `200 OK`: List of deals sorted by created_at descending (newest first)
+    - `200 OK`: Page of deals sorted by created_at descending (newest first).
+      When more deals exist, the `X-Next-Cursor` response header holds the
+      cursor for the next page. With `fields`, each item only contains the
+      requested fields plus `deal_id`.
+    - `400 Bad Request`: Malformed cursor, unknown field or invalid amount range
 
     **Example:**
     ```bash
-    # Get all deals
-    curl http://localhost:8000/api/deals
+    # Get first page of deals
+    curl -i http://localhost:8000/api/deals
+
+    # Get active Qatar wakala deals
+    curl "http://localhost:8000/api/deals?status=active&jurisdiction=qatar_qfc&shariah_structure=wakala"
 
-    # Get active deals only
-    curl http://localhost:8000/api/deals?status=active
+    # Deals between 100M and 500M, only the columns a dashboard renders
+    curl "http://localhost:8000/api/deals?min_amount=100000000&max_amount=500000000&fields=deal_name,status"
 
-    # Get latest 10 deals
-    curl http://localhost:8000/api/deals?limit=10
+    # Get next page
+    curl "http://localhost:8000/api/deals?limit=10&cursor=MjAyNS0xMS0wNFQxMDowMDowMHxkZWFsLTEyMw=="
     ```
     """
-    try:
-        deals = DealStorage.get_all_deals(status=status)
-
-        # Apply limit if specified
-        if limit:
-            deals = deals[:limit]
+    if min_amount is not None and max_amount is not None and min_amount > max_amount:
+        raise HTTPException(status_code=400, detail="min_amount cannot be greater than max_amount")
+
+    projection = None
+    if fields:
+        projection = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = projection - set(Deal.model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        projection.add("deal_id")
 
-        return deals
+    try:
+        deals, next_cursor = await DealStorage.list_deals(
+            status=status,
+            limit=limit,
+            cursor=cursor,
+            shariah_structure=shariah_structure,
+            jurisdiction=jurisdiction,
+            accounting_standard=accounting_standard,
+            impact_framework=impact_framework,
+            originator=originator,
+            min_amount=min_amount,
+            max_amount=max_amount
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve deals: {str(e)}"
         )
 
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+    # Projected responses bypass response_model validation (partial Deals)
+    if projection is not None:
+        return JSONResponse(
+            content=[d.model_dump(mode="json", include=projection) for d in deals],
+            headers=headers
+        )
+
+    response.headers.update(headers)
+    return deals
+
 
 @router.get("/{deal_id}", response_model=Deal)
 async def get_deal(deal_id: str):
@@ -165,7 +235,7 @@ async def get_deal(deal_id: str):
     curl http://localhost:8000/api/deals/deal-550e8400-e29b-41d4-a716-446655440000
     ```
     """
-    deal = DealStorage.get_deal(deal_id)
+    deal = await DealStorage.get_deal(deal_id)
 
     if not deal:
         raise HTTPException(
@@ -189,6 +259,7 @@ async def update_deal(deal_id: str, updates: dict):
 
     **Returns:**
     - `200 OK`: Updated deal
+    - `400 Bad Request`: Updates change `deal_id` or `created_at`
     - `404 Not Found`: Deal with specified ID does not exist
 
     **Example:**
@@ -198,7 +269,10 @@ async def update_deal(deal_id: str, updates: dict):
       -d '{"status": "completed", "overall_completion": 100.0}'
     ```
     """
-    deal = DealStorage.update_deal(deal_id, updates)
+    try:
+        deal = await DealStorage.update_deal(deal_id, updates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     if not deal:
         raise HTTPException(
@@ -226,7 +300,7 @@ async def delete_deal(deal_id: str):
     curl -X DELETE http://localhost:8000/api/deals/deal-550e8400-e29b-41d4-a716-446655440000
     ```
     """
-    deleted = DealStorage.delete_deal(deal_id)
+    deleted = await DealStorage.delete_deal(deal_id)
 
     if not deleted:
         raise HTTPException(
@@ -242,6 +316,11 @@ async def get_deal_stats():
     """
     Get statistics about all deals.
 
+    Served from counters maintained on every create/update/delete, so the
+    cost does not grow with the number of deals. With DEAL_STORAGE_BACKEND=sql
+    the counts are grouped queries on the deals table, so every worker
+    process reports the same numbers.
+
     **Returns:**
     - `200 OK`: Storage statistics including:
       - total_deals
@@ -250,6 +329,9 @@ async def get_deal_stats():
       - draft_deals
       - archived_deals
       - average_completion
+      - deals_by_status / deals_by_shariah_structure / deals_by_jurisdiction
+      - certificates_issued
+      - tokenized_deals
 
     **Example:**
     ```bash
@@ -257,10 +339,38 @@ async def get_deal_stats():
     ```
     """
     try:
-        stats = DealStorage.get_storage_stats()
+        stats = await DealStorage.get_storage_stats()
         return stats
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve stats: {str(e)}"
         )
+
+
+@router.post("/stats/verify")
+async def verify_deal_stats():
+    """
+    Rebuild the stats counters from scratch and report any drift.
+
+    The incremental counters are replaced by the rebuilt ones, so this
+    also repairs drift.
+
+    **Returns:**
+    - `200 OK`: Consistency report
+      - consistent: True if no drift was found
+      - drift: Per-counter incremental vs rebuilt values
+      - checked_deals: Number of deals scanned
+
+    **Example:**
+    ```bash
+    curl -X POST http://localhost:8000/api/deals/stats/verify
+    ```
+    """
+    try:
+        return await DealStorage.verify_aggregates()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to verify stats: {str(e)}"
+        )
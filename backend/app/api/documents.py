@@ -4,7 +4,7 @@ DOCUMENT API ENDPOINTS
 Endpoints for document upload, ingestion, and generation.
 
 FEATURES:
-- Upload PDF/DOCX files
+- Upload PDF/DOCX files (streamed to disk and hashed in fixed-size chunks)
 - Parse with LlamaParse/PyPDF2
 - Ingest into Graphiti knowledge graph
 - Generate PDF/DOCX/Markdown outputs
@@ -90,9 +90,8 @@ async def ingest_document(
         # Get document service
         doc_service = get_document_service()
 
-        # Save uploaded file
-        content = await file.read()
-        file_path = await doc_service.save_upload(content, file.filename)
+        # Stream upload to disk (hashed on the way, never fully in memory)
+        file_path, file_sha256, file_size = await doc_service.save_upload_stream(file, file.filename)
 
         logger.info(f"📄 Processing {file.filename} (type: {document_type})")
 
@@ -103,11 +102,12 @@ async def ingest_document(
             metadata={
                 "original_filename": file.filename,
                 "content_type": file.content_type,
-                "file_size": len(content)
-            }
+                "file_size": file_size
+            },
+            file_sha256=file_sha256
         )
 
-        logger.info(f"✅ Successfully ingested {file.filename} → Episode {uploaded_doc.graphitiEpisodeId}")
+        logger.info(f"✅ Successfully ingested {file.filename} → Episode {uploaded_doc.episode_id}")
 
         return IngestDocumentResponse(
             document=uploaded_doc,
@@ -13,6 +13,9 @@ from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.graphiti_mcp_client import get_graphiti_mcp_client
+from app.services.graphiti_mcp_service import get_graphiti_mcp_service
+from app.services.graphiti_search_cache import get_graphiti_search_cache
+from app.services.graphiti_context import get_graphiti_context_builder
 
 logger = logging.getLogger(__name__)
 
@@ -128,3 +131,17 @@ async def search_graphiti(request: SearchRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/graphiti/cache/stats")
+async def get_search_cache_stats():
+    """
+    Get knowledge-graph cache metrics.
+
+    Returns:
+        search: Search result cache (entries, hits, misses, hit rate,
+                evictions, invalidations)
+        context_blocks: Formatted context block cache (entries, hits, misses)
+    """
+    return {
+        "search": get_graphiti_search_cache().get_stats(),
+        "context_blocks": get_graphiti_context_builder().get_stats(),
+    }
@@ -24,7 +24,7 @@ MIGRATION FROM OLD API:
 
 import logging
 from typing import Optional, Dict, Any, List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
@@ -34,7 +34,11 @@ from app.services.session_service import (
     MessageRole
 )
 from app.services.claude_service import get_claude_service
-from app.services.graphiti_mcp_service import get_graphiti_mcp_service
+from app.services.graphiti_context import get_graphiti_context
+from app.services.template_service import get_template_service
+from app.services.response_buffer import ResponseBuffer
+from app.services.sse_encoder import SSEEncoder, parse_last_event_id
+from app.services.stream_hub import get_stream_hub
 
 logger = logging.getLogger(__name__)
 
@@ -114,7 +118,7 @@ async def create_session(request: CreateSessionRequest):
         session_service = get_session_service()
 
         # Create session with initial message
-        session = session_service.create_session(
+        session = await session_service.create_session(
             template_id=request.template_id,
             system_prompt=request.system_prompt,
             initial_message=request.initial_message,
@@ -138,22 +142,31 @@ async def create_session(request: CreateSessionRequest):
 
 
 @router.get("/{session_id}/stream")
-async def stream_session(session_id: str):
+async def stream_session(session_id: str, last_event_id: Optional[str] = Header(None)):
     """
     Stream Claude response for the current conversation state.
 
     STATEFUL STREAMING:
-    - Retrieves full message history from session
-    - Sends complete history to Claude API (stateless API)
+    - Retrieves message history from session (older turns compacted into a
+      summary once the history exceeds the token budget)
+    - Sends pinned context + history to Claude API (stateless API)
     - Streams response chunks via SSE
     - Appends assistant response to session after completion
 
     SSE EVENTS:
     - event: status, data: {"status": "starting"}
-    - event: chunk, data: {"text": "..."}
+    - event: chunk, data: {"text": "..."}  (id: characters of the turn sent so far)
     - event: status, data: {"status": "completed"}
     - event: done, data: {"session_id": "..."}
 
+    LIVE STREAMS:
+    - The turn is generated in a live stream that outlives this connection;
+      a disconnect does not stop it and other viewers share it
+    - Reconnecting while the turn runs (with Last-Event-ID) replays from that
+      offset, then follows the live stream
+    - Reconnecting with Last-Event-ID after the turn completed replays the
+      rest of the last assistant message instead of starting a new turn
+
     CLIENT BEHAVIOR:
     - Can abort stream at any time (AbortController)
     - After interrupt, call /interrupt endpoint
@@ -161,12 +174,13 @@ async def stream_session(session_id: str):
 
     Args:
         session_id: Session identifier
+        last_event_id: Last-Event-ID header of a reconnecting client
 
     Returns:
         Server-Sent Events stream
     """
     session_service = get_session_service()
-    session = session_service.get_session(session_id)
+    session = await session_service.get_session(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
@@ -174,20 +188,44 @@ async def stream_session(session_id: str):
     if session.status == SessionStatus.FAILED:
         raise HTTPException(status_code=400, detail=f"Session in failed state: {session.error_message}")
 
+    hub = get_stream_hub()
+    resume_offset = parse_last_event_id(last_event_id)
+
+    live = hub.get(session_id)
+    if live is not None and not live.done:
+        # A turn is being generated - follow it instead of starting another
+        return _sse_response(hub.sse(live, resume_offset, status="streaming"))
+
+    if resume_offset is not None and session.messages and session.messages[-1].role == MessageRole.ASSISTANT:
+        # The turn the client was reading has completed - replay its tail
+        async def replay_generator():
+            encoder = SSEEncoder(offset=min(resume_offset, len(session.messages[-1].content)))
+            yield encoder.resume(session.messages[-1].content)
+            yield encoder.event("status", {"status": "completed"})
+            yield encoder.event("done", {"session_id": session_id})
+
+        return _sse_response(replay_generator())
+
     try:
         # Update status to streaming
-        session_service.update_status(session_id, SessionStatus.STREAMING)
+        await session_service.update_status(session_id, SessionStatus.STREAMING)
 
         # Get Claude service
         claude_service = get_claude_service()
 
-        # Get Graphiti context if needed (from initial setup)
-        context = None
-        if session.context_document_ids or session.context_text:
-            context = await _get_graphiti_context(session)
-
-        # Build messages for Claude (from session history)
-        messages = session_service.get_messages_for_claude(session_id)
+        # Get Graphiti context once and pin it for the rest of the session
+        if session.pinned_context is None and (session.context_document_ids or session.context_text):
+            pinned_context = await _get_graphiti_context(session) or None
+            if pinned_context:
+                session = await session_service.get_session(session_id)
+                session.pinned_context = pinned_context
+                await session_service.save_session(session)
+
+        # Build messages for Claude (pinned context + budgeted history)
+        messages = await session_service.build_messages_for_claude(
+            session_id,
+            context=session.pinned_context
+        )
 
         if not messages:
             raise HTTPException(
@@ -195,71 +233,77 @@ async def stream_session(session_id: str):
                 detail="Session has no messages. Call /interrupt to add a message first."
             )
 
-        # Add context to first user message if this is the first turn
-        if context and len(messages) == 1:
-            messages[0]["content"] = f"{context}\n\n---\n\n{messages[0]['content']}"
+        # Another request may have started the turn while this one was preparing
+        live = hub.get(session_id)
+        if live is not None and not live.done:
+            return _sse_response(hub.sse(live, resume_offset, status="streaming"))
 
-        # SSE generator function
-        async def event_generator():
+        # Generate the turn in a live stream that outlives this connection
+        async def produce(live):
+            response = ResponseBuffer()
             try:
-                # Send start status
-                yield f"event: status\ndata: {{\"status\": \"starting\"}}\n\n"
-
-                # Stream Claude response
-                full_response = ""
-
-                async for chunk in claude_service.stream_with_messages(
-                    system_prompt=session.system_prompt,
-                    messages=messages,
-                    metadata={"session_id": session_id, "template_id": session.template_id}
-                ):
-                    # Escape special characters for JSON
-                    chunk_escaped = chunk.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-                    yield f"event: chunk\ndata: {{\"text\": \"{chunk_escaped}\"}}\n\n"
-                    full_response += chunk
+                # Interrupts posted to any worker arrive via pub/sub
+                async with session_service.subscribe_interrupts(session_id) as interrupts:
+                    async for chunk in claude_service.stream_with_messages(
+                        system_prompt=session.system_prompt,
+                        messages=messages,
+                        metadata={"session_id": session_id, "template_id": session.template_id},
+                        buffer=response
+                    ):
+                        if await interrupts.poll() is not None:
+                            # The user's message is already appended; the next
+                            # /stream answers it
+                            logger.info(f"⏸️ Session {session_id} stream stopped by interrupt")
+                            live.add_event("status", {"status": "interrupted"})
+                            return
+                        live.append(chunk)
 
                 # Append assistant response to session
-                session_service.append_message(
+                await session_service.append_message(
                     session_id=session_id,
                     role=MessageRole.ASSISTANT,
-                    content=full_response
+                    content=response.text
                 )
 
                 # Update status to active (ready for next turn)
-                session_service.update_status(session_id, SessionStatus.ACTIVE)
+                await session_service.update_status(session_id, SessionStatus.ACTIVE)
 
                 # Send completion status
-                yield f"event: status\ndata: {{\"status\": \"completed\"}}\n\n"
-                yield f"event: done\ndata: {{\"session_id\": \"{session_id}\"}}\n\n"
+                live.add_event("status", {"status": "completed"})
+                live.add_event("done", {"session_id": session_id})
 
-                logger.info(f"✅ Session {session_id} stream completed ({len(full_response)} chars)")
+                logger.info(f"✅ Session {session_id} stream completed ({len(response)} chars)")
 
             except Exception as e:
                 logger.error(f"❌ Session {session_id} stream error: {e}")
-                session_service.update_status(
+                await session_service.update_status(
                     session_id,
                     SessionStatus.FAILED,
                     error_message=str(e)
                 )
-                error_msg = str(e).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-                yield f"event: error\ndata: {{\"error\": \"{error_msg}\"}}\n\n"
-
-        return StreamingResponse(
-            event_generator(),
-            media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-            }
-        )
+                raise
+
+        live = hub.start(session_id, produce)
+        return _sse_response(hub.sse(live, resume_offset))
 
     except Exception as e:
         logger.error(f"❌ Failed to stream session {session_id}: {e}")
-        session_service.update_status(session_id, SessionStatus.FAILED, error_message=str(e))
+        await session_service.update_status(session_id, SessionStatus.FAILED, error_message=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+        }
+    )
+
+
 @router.post("/{session_id}/interrupt", response_model=InterruptSessionResponse)
 async def interrupt_session(session_id: str, request: InterruptSessionRequest):
     """
@@ -268,7 +312,8 @@ async def interrupt_session(session_id: str, request: InterruptSessionRequest):
     INTERRUPT FLOW:
     1. Client aborts current stream (AbortController)
     2. Client calls this endpoint with new user message
-    3. Backend appends user message to session
+    3. Backend appends user message to session and publishes the interrupt
+       (a stream still running on any worker stops)
     4. Client reconnects to /stream to get response
 
     This enables collaborative, interactive conversations like Claude CLI:
@@ -285,25 +330,20 @@ async def interrupt_session(session_id: str, request: InterruptSessionRequest):
         Status and message count
     """
     session_service = get_session_service()
-    session = session_service.get_session(session_id)
+    session = await session_service.get_session(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
 
     try:
-        # Append user message to session
-        success = session_service.append_message(
-            session_id=session_id,
-            role=MessageRole.USER,
-            content=request.message
-        )
+        # Append user message, mark interrupted (ready for next stream) and
+        # stop a stream still running on any worker
+        success = await session_service.add_interrupt_message(session_id, request.message)
 
         if not success:
             raise HTTPException(status_code=500, detail="Failed to append message")
 
-        # Update status to interrupted (ready for next stream)
-        session_service.update_status(session_id, SessionStatus.INTERRUPTED)
-
+        session = await session_service.get_session(session_id)
         logger.info(
             f"⏸️ Session {session_id} interrupted "
             f"(message: {len(request.message)} chars, "
@@ -336,7 +376,7 @@ async def get_session(session_id: str):
         Session state
     """
     session_service = get_session_service()
-    session = session_service.get_session(session_id)
+    session = await session_service.get_session(session_id)
 
     if not session:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
@@ -366,7 +406,7 @@ async def delete_session(session_id: str):
         Success status
     """
     session_service = get_session_service()
-    success = session_service.delete_session(session_id)
+    success = await session_service.delete_session(session_id)
 
     if not success:
         raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
@@ -384,8 +424,9 @@ async def _get_graphiti_context(session) -> str:
     """
     Retrieve Graphiti context for session.
 
-    Uses the context_text and context_document_ids from session
-    to search the knowledge graph.
+    Uses the context_text and user_notes from session to search the
+    knowledge graph, plus the template's required standards. Shares the
+    search and formatted-block caches with workflow executions.
 
     Args:
         session: SessionState
@@ -393,64 +434,14 @@ async def _get_graphiti_context(session) -> str:
     Returns:
         Formatted context string
     """
+    required_standards = None
     try:
-        graphiti_mcp_service = get_graphiti_mcp_service()
-
-        # Build search query from context
-        search_parts = []
-        if session.context_text:
-            search_parts.append(session.context_text[:300])
-        if session.user_notes:
-            search_parts.extend(session.user_notes.values())
-
-        search_query = " ".join(search_parts)
-
-        if not search_query.strip():
-            search_query = "Islamic finance compliance requirements"
-
-        logger.info(f"🔍 Searching Graphiti for session context: '{search_query[:100]}...'")
-
-        # Search using MCP
-        results = await graphiti_mcp_service.search(
-            query_text=search_query,
-            group_ids=["aaoifi-documents", "context-documents"],
-            num_results=10
-        )
-
-        # Build context from results
-        context_parts = []
-
-        if results.get('facts'):
-            context_parts.append("## AAOIFI Standards and Compliance Requirements\n")
-
-            high_relevance = [f for f in results['facts'] if f.get('relevance', 0) >= 0.7]
-
-            if high_relevance:
-                for i, fact_data in enumerate(high_relevance[:5], 1):
-                    fact_text = fact_data.get('fact', '')
-                    relevance = fact_data.get('relevance', 0)
-                    context_parts.append(
-                        f"{i}. [{relevance*100:.0f}% relevant] {fact_text}"
-                    )
-                context_parts.append("")
-
-        # Context quality indicator
-        confidence = results.get('confidence', 'low')
-        fact_count = len(results.get('facts', []))
-
-        context_parts.append(f"---")
-        context_parts.append(
-            f"*Context quality: {confidence} ({fact_count} facts retrieved)*\n"
-        )
-
-        formatted_context = "\n".join(context_parts)
-
-        logger.info(
-            f"✅ Retrieved Graphiti context: {fact_count} facts, confidence={confidence}"
-        )
-
-        return formatted_context
-
-    except Exception as e:
-        logger.error(f"❌ Failed to retrieve Graphiti context: {e}")
-        return ""
+        required_standards = get_template_service().get_template(session.template_id).required_standards
+    except ValueError:
+        pass  # Ad-hoc session without a registered template
+
+    return await get_graphiti_context(
+        context_text=session.context_text,
+        user_notes=session.user_notes,
+        required_standards=required_standards
+    )
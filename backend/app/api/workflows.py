@@ -4,7 +4,8 @@ WORKFLOW API ENDPOINTS
 Endpoints for workflow execution and management.
 
 FEATURES:
-- Create workflow executions
+- Create workflow executions (run by the background execution runner:
+  worker pool, per-tenant limits, priorities)
 - SSE streaming for real-time Claude responses
 - Interrupt handling for user guidance
 - Execution status tracking
@@ -12,13 +13,17 @@ FEATURES:
 
 import logging
 from typing import Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime
 
 from app.services import get_workflow_engine, get_template_service
 from app.services.methodology_service import methodology_service
+from app.services.sse_encoder import SSEEncoder, parse_last_event_id
+from app.services.execution_runner import PRIORITY_ORDER, QueueFullError, get_execution_runner
+from app.services.stream_hub import get_stream_hub
+from app.services.workflow_engine import ExecutionStatus
 from app.models import (
     GenerateTemplateFromMethodologiesRequest,
     GenerateTemplateFromMethodologiesResponse,
@@ -42,6 +47,8 @@ class ExecuteWorkflowRequest(BaseModel):
     context_text: Optional[str] = None
     context_document_ids: list[str] = []
     user_notes: dict[str, str] = {}
+    tenant_id: str = "default"
+    priority: str = "medium"  # low | medium | high | critical
 
 
 class ExecuteWorkflowResponse(BaseModel):
@@ -63,10 +70,14 @@ class InterruptRequest(BaseModel):
 @router.post("/workflows/execute", response_model=ExecuteWorkflowResponse)
 async def execute_workflow(request: ExecuteWorkflowRequest):
     """
-    Create a new workflow execution.
+    Create a workflow execution and queue it on the background runner.
+
+    The execution runs whether or not a client opens the stream URL;
+    subscribers attach to its progress (queued or running).
 
     Args:
-        request: Workflow execution parameters
+        request: Workflow execution parameters (tenant_id and priority
+            control scheduling)
 
     Returns:
         Execution ID and stream URL
@@ -84,36 +95,98 @@ async def execute_workflow(request: ExecuteWorkflowRequest):
                 detail=f"Template not found: {request.template_id}"
             )
 
+        if request.priority not in PRIORITY_ORDER:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid priority: {request.priority}. Must be one of {list(PRIORITY_ORDER)}"
+            )
+
         # Create execution
-        execution_id = engine.create_execution(
+        execution_id = await engine.create_execution(
             template_id=request.template_id,
             context_text=request.context_text,
             context_document_ids=request.context_document_ids,
-            user_notes=request.user_notes
+            user_notes=request.user_notes,
+            tenant_id=request.tenant_id,
+            priority=request.priority
         )
 
         logger.info(f"✅ Created workflow execution: {execution_id}")
 
+        # Run it in the background
+        execution = await engine.get_execution(execution_id)
+        await _submit_execution(execution, template)
+
         return ExecuteWorkflowResponse(
             execution_id=execution_id,
-            status="pending",
+            status=ExecutionStatus.QUEUED.value,
             stream_url=f"/api/workflows/{execution_id}/stream"
         )
 
     except HTTPException:
         raise
+    except QueueFullError as e:
+        logger.warning(f"⚠️ Execution rejected: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Failed to create execution: {e}")
         raise HTTPException(status_code=500, detail=f"Execution creation failed: {str(e)}")
 
 
+async def _submit_execution(execution, template):
+    """Queue an execution on the background runner (returns its LiveStream)"""
+    engine = get_workflow_engine()
+
+    async def produce(live):
+        async for chunk in engine.execute_workflow(
+            execution_id=execution.id,
+            system_prompt=template.system_prompt,
+            required_standards=template.required_standards  # Pass AAOIFI standards
+        ):
+            live.append(chunk)
+
+        final_execution = await engine.get_execution(execution.id)
+        live.add_event("status", {"status": final_execution.status})
+        live.add_event("done", {"execution_id": execution.id})
+
+    # Mark queued first: a worker may pick the job up (and mark it running) at once
+    await engine.update_status(execution.id, ExecutionStatus.QUEUED)
+    try:
+        return get_execution_runner().submit(
+            execution.id,
+            produce,
+            tenant_id=execution.tenant_id,
+            priority=execution.priority,
+            base_offset=len(execution.current_response)
+        )
+    except Exception:
+        await engine.update_status(execution.id, execution.status)
+        raise
+
+
 @router.get("/workflows/{execution_id}/stream")
-async def stream_claude(execution_id: str):
+async def stream_claude(execution_id: str, last_event_id: Optional[str] = Header(None)):
     """
     Stream Claude execution using Server-Sent Events (SSE).
 
+    Executions run on the background runner (started by POST /execute);
+    this endpoint attaches to the execution's live stream. A client that
+    disconnects does not stop it, and every viewer shares the one Claude
+    stream. Without a live stream in this process (retention expired,
+    restart, other worker):
+    - completed/failed executions are replayed from the stored response
+      (Claude is never called again)
+    - queued/running/interrupted executions (running elsewhere) return the
+      stored response so far and their current status, without `done`
+    - only pending executions (never submitted) are queued here
+
+    Chunk events carry `id: <offset>` (characters of the execution's response
+    delivered so far). A client reconnecting with `Last-Event-ID` is replayed
+    from that offset and then follows the live stream.
+
     Args:
         execution_id: Workflow execution ID
+        last_event_id: Last-Event-ID header of a reconnecting client
 
     Returns:
         SSE stream of Claude responses
@@ -122,9 +195,10 @@ async def stream_claude(execution_id: str):
         # Get workflow engine and template service
         engine = get_workflow_engine()
         template_service = get_template_service()
+        hub = get_stream_hub()
 
         # Get execution
-        execution = engine.get_execution(execution_id)
+        execution = await engine.get_execution(execution_id)
         if not execution:
             raise HTTPException(
                 status_code=404,
@@ -139,37 +213,37 @@ async def stream_claude(execution_id: str):
                 detail=f"Template not found: {execution.template_id}"
             )
 
-        # Define SSE generator
-        async def event_generator():
-            """Generate SSE events from Claude stream"""
-            try:
-                # Send initial status
-                yield f"event: status\ndata: {{\"status\": \"starting\"}}\n\n"
-
-                # Stream Claude response with required standards from template
-                async for chunk in engine.execute_workflow(
-                    execution_id=execution_id,
-                    system_prompt=template.system_prompt,
-                    required_standards=template.required_standards  # Pass AAOIFI standards
-                ):
-                    # Send chunk as SSE event
-                    # Escape newlines and quotes for JSON
-                    chunk_escaped = chunk.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
-                    yield f"event: chunk\ndata: {{\"text\": \"{chunk_escaped}\"}}\n\n"
-
-                # Send completion status
-                final_execution = engine.get_execution(execution_id)
-                yield f"event: status\ndata: {{\"status\": \"{final_execution.status}\"}}\n\n"
-                yield f"event: done\ndata: {{\"execution_id\": \"{execution_id}\"}}\n\n"
-
-            except Exception as e:
-                logger.error(f"❌ Stream error: {e}")
-                error_msg = str(e).replace('"', '\\"')
-                yield f"event: error\ndata: {{\"error\": \"{error_msg}\"}}\n\n"
+        resume_offset = parse_last_event_id(last_event_id)
+        live = hub.get(execution_id)
+
+        if live is None and execution.status != ExecutionStatus.PENDING:
+            # No live stream here - replay what is stored; a finished execution
+            # ends with done, one still running elsewhere only reports its status
+            finished = execution.status in (ExecutionStatus.COMPLETED, ExecutionStatus.FAILED)
+
+            async def replay_generator():
+                encoder = SSEEncoder(offset=min(resume_offset or 0, len(execution.current_response)))
+                yield encoder.resume(execution.current_response)
+                yield encoder.event("status", {"status": execution.status})
+                if finished:
+                    yield encoder.event("done", {"execution_id": execution_id})
+
+            events = replay_generator()
+
+        else:
+            if live is None:
+                live = await _submit_execution(execution, template)
+                status = ExecutionStatus.QUEUED.value
+            elif execution.status == ExecutionStatus.QUEUED:
+                status = ExecutionStatus.QUEUED.value
+            else:
+                status = "streaming"
+
+            events = hub.sse(live, resume_offset, history=execution.current_response, status=status)
 
         # Return SSE response
         return StreamingResponse(
-            event_generator(),
+            events,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -180,6 +254,9 @@ async def stream_claude(execution_id: str):
 
     except HTTPException:
         raise
+    except QueueFullError as e:
+        logger.warning(f"⚠️ Execution rejected: {e}")
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
         logger.error(f"❌ Failed to start stream: {e}")
         raise HTTPException(status_code=500, detail=f"Stream failed: {str(e)}")
@@ -201,7 +278,7 @@ async def interrupt_execution(execution_id: str, request: InterruptRequest):
         engine = get_workflow_engine()
 
         # Get execution
-        execution = engine.get_execution(execution_id)
+        execution = await engine.get_execution(execution_id)
         if not execution:
             raise HTTPException(
                 status_code=404,
@@ -209,7 +286,7 @@ async def interrupt_execution(execution_id: str, request: InterruptRequest):
             )
 
         # Add interrupt
-        engine.add_interrupt(execution_id, request.message)
+        await engine.add_interrupt(execution_id, request.message)
 
         logger.info(f"⏸️ Execution {execution_id} interrupted")
 
@@ -236,7 +313,7 @@ async def get_execution_status(execution_id: str):
     try:
         engine = get_workflow_engine()
 
-        execution = engine.get_execution(execution_id)
+        execution = await engine.get_execution(execution_id)
         if not execution:
             raise HTTPException(
                 status_code=404,
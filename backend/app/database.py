@@ -39,14 +39,20 @@ DATABASE_URL = os.getenv(
 # SQLAlchemy ENGINE & SESSION
 # ============================================================================
 
+# Pool sizing only applies to server databases; SQLite (aiosqlite) manages
+# its own connection pool
+_pool_kwargs = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": 5,
+    "max_overflow": 10,
+}
+
 # Create async engine
 engine = create_async_engine(
     DATABASE_URL,
     echo=os.getenv("DEBUG", "false").lower() == "true",  # SQL logging in debug mode
     future=True,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=5,
-    max_overflow=10,
+    **_pool_kwargs,
 )
 
 # Create async session factory
@@ -0,0 +1,63 @@
+"""
+DATABASE MODELS
+===============
+SQLAlchemy ORM tables for persistent storage.
+
+Mirrors the Pydantic models in app/models.py column-for-column so records
+convert directly with model_dump() / getattr().
+
+INDEXES (deals):
+- status, shariah_structure, jurisdiction: dashboard and listing filters
+- created_at: default sort order
+- (created_at, deal_id): keyset pagination for GET /api/deals
+"""
+
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, String
+
+from app.database import Base
+
+
+class DealRecord(Base):
+    """Persistent deal row (see app.models.Deal)"""
+    __tablename__ = "deals"
+
+    deal_id = Column(String(64), primary_key=True)
+    deal_name = Column(String(255), nullable=False)
+
+    # Selected components
+    shariah_structure = Column(String(64), nullable=False, index=True)
+    jurisdiction = Column(String(64), nullable=False, index=True)
+    accounting_standard = Column(String(64), nullable=False)
+    impact_framework = Column(String(64), nullable=True)
+
+    # Deal details
+    deal_amount = Column(Float, nullable=True)
+    currency = Column(String(8), nullable=True)
+    originator = Column(String(255), nullable=True)
+
+    # Guardian integration
+    guardian_policy_id = Column(String(255), nullable=True)
+    guardian_transaction_id = Column(String(255), nullable=True)
+
+    # Lifecycle
+    created_at = Column(DateTime, nullable=False, index=True)
+    updated_at = Column(DateTime, nullable=False)
+    status = Column(String(32), nullable=False, index=True)
+    overall_completion = Column(Float, nullable=True)
+
+    # Guardian certificate
+    has_certificate = Column(Boolean, nullable=False, default=False)
+    certificate_id = Column(String(255), nullable=True)
+    certificate_status = Column(String(32), nullable=True)
+
+    # ATS token
+    has_token = Column(Boolean, nullable=False, default=False)
+    token_id = Column(String(64), nullable=True)
+    token_name = Column(String(255), nullable=True)
+    token_symbol = Column(String(32), nullable=True)
+    total_supply = Column(Integer, nullable=True)
+    holders_count = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_deals_created_at_deal_id", "created_at", "deal_id"),
+    )
@@ -57,15 +57,63 @@ async def lifespan(app: FastAPI):
     os.makedirs(os.getenv("UPLOAD_DIR", "./uploads"), exist_ok=True)
     os.makedirs(os.getenv("OUTPUT_DIR", "./outputs"), exist_ok=True)
 
-    # Seed mock data for development
-    from app.services.deal_storage import seed_mock_deals
-    seed_mock_deals()
-    logger.info("✅ Seeded mock deals with digital assets")
+    # Initialize deal storage (creates tables for the SQL backend)
+    from app.services.deal_storage import DealStorage, seed_mock_deals
+    await DealStorage.initialize()
+
+    # Seed mock data for development (only into an empty store, so
+    # persistent backends keep their data across restarts)
+    if await DealStorage.count_deals() == 0:
+        await seed_mock_deals()
+        logger.info("✅ Seeded mock deals with digital assets")
+
+    # Keep dashboard snapshots warm (rebuilt on deal/task writes and TTL)
+    from app.services.dashboard_snapshot import get_dashboard_snapshot_cache
+    snapshot_cache = get_dashboard_snapshot_cache()
+    await snapshot_cache.start()
+
+    # Session/execution state backends (in-memory: sweeps idle/over-budget
+    # entries out of memory; Redis: shared by all workers)
+    from app.services.session_service import get_session_service
+    from app.services.workflow_engine import get_workflow_engine
+    state_backends = [get_session_service().sessions, get_workflow_engine().executions]
+    for backend in state_backends:
+        await backend.start()
+
+    # Background execution workers (POST /api/workflows/execute)
+    from app.services.execution_runner import get_execution_runner
+    execution_runner = get_execution_runner()
+    await execution_runner.start()
+
+    # Warm the blade-graphiti MCP session pool (direct mode) so the first
+    # knowledge-graph request doesn't pay subprocess startup
+    graphiti_client = None
+    if os.getenv("GRAPHITI_MCP_MODE", "direct").lower() == "direct" and os.getenv("NEO4J_URI"):
+        from app.services.graphiti_mcp_client import get_graphiti_mcp_client
+        try:
+            graphiti_client = get_graphiti_mcp_client()
+            await graphiti_client.connect()
+        except Exception as e:
+            logger.warning(f"⚠️ Graphiti MCP pool not started (will retry on first use): {e}")
 
     yield
 
     # Shutdown
     logger.info("👋 Shutting down Islamic Finance Workflows API")
+    await snapshot_cache.stop()
+    # Queued/running executions are not resumed after a restart - end them
+    # in (possibly shared) state so stream clients get a final status
+    abandoned = await execution_runner.stop()
+    if abandoned:
+        await get_workflow_engine().fail_unfinished(abandoned, "Server shut down before the execution finished")
+    from app.services.pdf_extraction import get_pdf_extractor
+    get_pdf_extractor().close()
+    from app.services.stream_hub import get_stream_hub
+    await get_stream_hub().stop()
+    for backend in state_backends:
+        await backend.stop()
+    if graphiti_client is not None:
+        await graphiti_client.disconnect()
 
 
 # ============================================================================
@@ -95,6 +143,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],  # Deal listing pagination, dashboard caching
 )
 
 
@@ -218,6 +267,33 @@ async def config():
     }
 
 
+@app.get("/api/state/stats", tags=["Health"])
+async def state_stats():
+    """
+    Session/execution state backend accounting
+    In-memory: resident bytes, spill tier size and eviction counters per store
+    Redis: entry counts and read/write counters
+    Interrupts: interrupt-to-ack latency of workflow executions
+    Streams: live SSE streams, viewers and replays
+    Runner: queued/running executions per priority and tenant
+    Parse cache: hits/misses of the document parse cache
+    """
+    from app.services.execution_runner import get_execution_runner
+    from app.services.parse_cache import get_parse_cache
+    from app.services.session_service import get_session_service
+    from app.services.stream_hub import get_stream_hub
+    from app.services.workflow_engine import get_workflow_engine
+
+    return {
+        "sessions": await get_session_service().sessions.get_stats(),
+        "executions": await get_workflow_engine().executions.get_stats(),
+        "interrupts": get_workflow_engine().get_interrupt_stats(),
+        "streams": get_stream_hub().get_stats(),
+        "runner": get_execution_runner().get_stats(),
+        "parse_cache": get_parse_cache().get_stats(),
+    }
+
+
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
@@ -97,9 +97,11 @@ class UploadedDocument(BaseModel):
     filesize: int
     mime_type: str
     uploaded_at: datetime
-    episode_id: Optional[str] = None  # Graphiti episode ID
+    episode_id: Optional[str] = None  # Graphiti episode ID (first chunk)
     parsed: bool = False
     content_preview: str = ""
+    chunk_count: int = 0  # Chunks the document was split into
+    chunks_added: int = 0  # New/changed chunks sent to Graphiti
 
 
 # ============================================================================
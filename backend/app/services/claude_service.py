@@ -13,16 +13,32 @@ WHY LANGFUSE:
 FEATURES:
 - Streaming and non-streaming Claude responses
 - Automatic Langfuse trace creation
-- Token usage tracking
+- Token usage tracking (including prompt cache reads/writes)
+- Prompt caching of stable prefixes (CLAUDE_PROMPT_CACHING, default on)
+- Optional local response cache for deterministic reruns (LLM_CACHE_ENABLED,
+  see llm_response_cache.py)
 - Error handling and logging
+
+PROMPT CACHING:
+- cache_control breakpoints on the template system prompt, the knowledge
+  graph context block, and earlier conversation turns
+- Repeat runs of the same template read these prefixes from Anthropic's
+  prompt cache (lower input cost and time-to-first-token)
+- Prefixes shorter than the model's minimum cacheable length are simply
+  not cached by the API
 """
 
 import os
+import time
+import asyncio
 import logging
 from typing import AsyncGenerator, Optional, Dict, Any, List
 from datetime import datetime
 import anthropic
 
+from app.services.llm_response_cache import LLMResponseCache, get_llm_response_cache, make_key
+from app.services.response_buffer import ResponseBuffer
+
 # Initialize logger FIRST
 logger = logging.getLogger(__name__)
 
@@ -72,7 +88,9 @@ class ClaudeService:
         langfuse_host: Optional[str] = None,
         model: str = "claude-sonnet-4-5-20250929",
         max_tokens: int = 16384,
-        temperature: float = 0.7
+        temperature: float = 0.7,
+        prompt_caching: bool = True,
+        response_cache: Optional[LLMResponseCache] = None
     ):
         """
         Initialize Claude service with Langfuse tracing.
@@ -85,6 +103,9 @@ class ClaudeService:
             model: Claude model to use
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature
+            prompt_caching: Mark stable prompt prefixes for prompt caching
+            response_cache: Local response cache for generate/stream_generate
+                (None disables it)
         """
         # Initialize Anthropic client (ASYNC)
         self.anthropic_api_key = anthropic_api_key or os.getenv("ANTHROPIC_API_KEY")
@@ -118,8 +139,24 @@ class ClaudeService:
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
-
-        logger.info(f"🤖 Claude service initialized: {self.model}")
+        self.prompt_caching = prompt_caching
+        self.response_cache = response_cache
+
+        # Cumulative token usage across calls (see get_usage_stats)
+        self.usage_totals = {
+            "calls": 0,
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        }
+        self.last_usage: Optional[Dict[str, Any]] = None
+
+        logger.info(
+            f"🤖 Claude service initialized: {self.model} "
+            f"(prompt caching {'on' if prompt_caching else 'off'}, "
+            f"response cache {'on' if response_cache else 'off'})"
+        )
 
     @observe()
     async def generate(
@@ -142,15 +179,29 @@ class ClaudeService:
             Response dict with text and usage stats
         """
         try:
+            # Serve repeat requests from the local response cache
+            cache_key = self._response_cache_key(system_prompt, user_message, context)
+            if cache_key:
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"⚡ Claude response served from cache: {len(cached.text)} chars")
+                    return {
+                        "text": cached.text,
+                        "model": cached.model,
+                        "usage": cached.usage,
+                        "stop_reason": cached.stop_reason,
+                        "cached": True
+                    }
+
             # Build messages with structured context injection
             messages = []
 
             # Add context if provided - structured for clarity
             if context and context.strip():
-                context_message = self._format_context_message(context)
+                context_message = self.format_context_message(context)
                 messages.append({
                     "role": "user",
-                    "content": context_message
+                    "content": self._cacheable_content(context_message)
                 })
 
             # Add user message
@@ -169,7 +220,7 @@ class ClaudeService:
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system=system_prompt,
+                system=self._system_blocks(system_prompt),
                 messages=messages
             )
 
@@ -179,19 +230,24 @@ class ClaudeService:
             # DISABLED: Langfuse v3 removed langfuse_context API
             pass
 
+            usage = self._record_usage(response.usage)
+
             logger.info(
                 f"✅ Claude response: {len(response_text)} chars, "
-                f"{response.usage.input_tokens} in, {response.usage.output_tokens} out"
+                f"{usage['input_tokens']} in, {usage['output_tokens']} out, "
+                f"cache {usage['cache_read_input_tokens']} read / "
+                f"{usage['cache_creation_input_tokens']} written"
             )
 
+            if cache_key:
+                await self.response_cache.put(
+                    cache_key, self.model, [response_text], usage, response.stop_reason
+                )
+
             return {
                 "text": response_text,
                 "model": self.model,
-                "usage": {
-                    "input_tokens": response.usage.input_tokens,
-                    "output_tokens": response.usage.output_tokens,
-                    "total_tokens": response.usage.input_tokens + response.usage.output_tokens
-                },
+                "usage": usage,
                 "stop_reason": response.stop_reason
             }
 
@@ -206,7 +262,8 @@ class ClaudeService:
         system_prompt: str,
         user_message: str,
         context: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        buffer: Optional[ResponseBuffer] = None
     ) -> AsyncGenerator[str, None]:
         """
         Generate streaming Claude response with Langfuse tracing.
@@ -216,20 +273,41 @@ class ClaudeService:
             user_message: User message
             context: Optional context from Graphiti
             metadata: Optional metadata for tracing
+            buffer: Shared accumulator; every chunk is appended before it is
+                yielded, so callers read buffer.text instead of re-joining
 
         Yields:
             Response chunks as they arrive
         """
+        buffer = buffer if buffer is not None else ResponseBuffer()
+        start = buffer.mark()
+
         try:
+            # Replay repeat requests from the local response cache
+            cache_key = self._response_cache_key(system_prompt, user_message, context)
+            if cache_key:
+                cached = await self.response_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(
+                        f"⚡ Claude stream replayed from cache: {len(cached.chunks)} chunks, "
+                        f"{len(cached.text)} chars"
+                    )
+                    for text in cached.chunks:
+                        buffer.append(text)
+                        yield text
+                        # Let each chunk go out as its own SSE event, as it did live
+                        await asyncio.sleep(0)
+                    return
+
             # Build messages with structured context injection
             messages = []
 
             # Add context if provided - structured for clarity
             if context and context.strip():
-                context_message = self._format_context_message(context)
+                context_message = self.format_context_message(context)
                 messages.append({
                     "role": "user",
-                    "content": context_message
+                    "content": self._cacheable_content(context_message)
                 })
 
             # Add user message
@@ -244,33 +322,43 @@ class ClaudeService:
             # Call Claude with streaming
             logger.info(f"🤖 Streaming Claude: {self.model}")
 
-            full_response = ""
-            input_tokens = 0
-            output_tokens = 0
+            chars_before = len(buffer)
+            started = time.perf_counter()
+            first_token_at = None
 
             async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system=system_prompt,
+                system=self._system_blocks(system_prompt),
                 messages=messages
             ) as stream:
                 async for text in stream.text_stream:
-                    full_response += text
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    buffer.append(text)
                     yield text
 
                 # Get final message with usage
                 final_message = await stream.get_final_message()
-                input_tokens = final_message.usage.input_tokens
-                output_tokens = final_message.usage.output_tokens
+                usage = self._record_usage(final_message.usage, started, first_token_at)
 
             # Update Langfuse with complete output and usage
             # DISABLED: Langfuse v3 removed langfuse_context API
             pass
 
+            # Only reached when the stream ran to completion
+            if cache_key:
+                await self.response_cache.put(
+                    cache_key, self.model, buffer.chunks_since(start), usage, final_message.stop_reason
+                )
+
             logger.info(
-                f"✅ Claude stream complete: {len(full_response)} chars, "
-                f"{input_tokens} in, {output_tokens} out"
+                f"✅ Claude stream complete: {len(buffer) - chars_before} chars, "
+                f"{usage['input_tokens']} in, {usage['output_tokens']} out, "
+                f"cache {usage['cache_read_input_tokens']} read / "
+                f"{usage['cache_creation_input_tokens']} written, "
+                f"TTFT {usage['time_to_first_token_ms']}ms"
             )
 
         except Exception as e:
@@ -284,7 +372,8 @@ class ClaudeService:
         self,
         system_prompt: str,
         messages: List[Dict[str, str]],
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        buffer: Optional[ResponseBuffer] = None
     ) -> AsyncGenerator[str, None]:
         """
         Generate streaming Claude response with full message history.
@@ -302,6 +391,8 @@ class ClaudeService:
             system_prompt: System prompt (separate from messages)
             messages: Full conversation history [{"role": "user", "content": "...}, ...]
             metadata: Optional metadata for tracing
+            buffer: Shared accumulator; every chunk is appended before it is
+                yielded, so callers read buffer.text instead of re-joining
 
         Yields:
             Response chunks as they arrive
@@ -332,29 +423,34 @@ class ClaudeService:
                 f"(last: {len(messages[-1]['content'])} chars)"
             )
 
-            full_response = ""
-            input_tokens = 0
-            output_tokens = 0
+            buffer = buffer if buffer is not None else ResponseBuffer()
+            chars_before = len(buffer)
+            started = time.perf_counter()
+            first_token_at = None
 
             async with self.client.messages.stream(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                system=system_prompt,
-                messages=messages  # ✅ Full conversation history
+                system=self._system_blocks(system_prompt),
+                messages=self._cacheable_history(messages)  # ✅ Full conversation history
             ) as stream:
                 async for text in stream.text_stream:
-                    full_response += text
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    buffer.append(text)
                     yield text
 
                 # Get final message with usage
                 final_message = await stream.get_final_message()
-                input_tokens = final_message.usage.input_tokens
-                output_tokens = final_message.usage.output_tokens
+                usage = self._record_usage(final_message.usage, started, first_token_at)
 
             logger.info(
-                f"✅ Claude stream complete: {len(full_response)} chars, "
-                f"{input_tokens} in, {output_tokens} out, "
+                f"✅ Claude stream complete: {len(buffer) - chars_before} chars, "
+                f"{usage['input_tokens']} in, {usage['output_tokens']} out, "
+                f"cache {usage['cache_read_input_tokens']} read / "
+                f"{usage['cache_creation_input_tokens']} written, "
+                f"TTFT {usage['time_to_first_token_ms']}ms, "
                 f"{len(messages)} message turns"
             )
 
@@ -362,7 +458,134 @@ class ClaudeService:
             logger.error(f"❌ Claude streaming (messages API) failed: {e}")
             raise
 
-    def _format_context_message(self, context: str) -> str:
+    def _response_cache_key(
+        self,
+        system_prompt: str,
+        user_message: str,
+        context: Optional[str]
+    ) -> Optional[str]:
+        """Local response cache key for a request (None when the cache is off)"""
+        if self.response_cache is None:
+            return None
+        return make_key(
+            model=self.model,
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            system_prompt=system_prompt,
+            messages=[{"role": "user", "content": user_message}],
+            context=context.strip() if context else None
+        )
+
+    # ========================================================================
+    # PROMPT CACHING
+    # ========================================================================
+
+    def _system_blocks(self, system_prompt: str):
+        """System prompt as a cacheable text block (plain string if caching is off)"""
+        if not self.prompt_caching:
+            return system_prompt
+        return [{
+            "type": "text",
+            "text": system_prompt,
+            "cache_control": {"type": "ephemeral"}
+        }]
+
+    def _cacheable_content(self, content):
+        """Message content with a cache breakpoint on its last block"""
+        if not self.prompt_caching:
+            return content
+        if isinstance(content, str):
+            return [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+        blocks = [dict(block) for block in content]
+        if blocks:
+            blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        return blocks
+
+    def _cacheable_history(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Copy of the conversation with cache breakpoints on earlier turns.
+
+        Marks the final message (written to cache for the next turn) and the
+        previous user message (read back from the cache written last turn).
+        Together with the system prompt that is 3 of the API's 4 breakpoints;
+        cache_control already present on history blocks is dropped so the
+        limit holds. Caller's messages are not modified.
+        """
+        if not self.prompt_caching:
+            return messages
+
+        history = []
+        for message in messages:
+            message = dict(message)
+            if isinstance(message["content"], list):
+                message["content"] = [
+                    {key: value for key, value in block.items() if key != "cache_control"}
+                    if isinstance(block, dict) else block
+                    for block in message["content"]
+                ]
+            history.append(message)
+        marked = [len(history) - 1]
+        previous_user = next(
+            (i for i in range(len(history) - 2, -1, -1) if history[i]["role"] == "user"),
+            None
+        )
+        if previous_user is not None:
+            marked.append(previous_user)
+
+        for i in marked:
+            history[i]["content"] = self._cacheable_content(history[i]["content"])
+        return history
+
+    def _record_usage(
+        self,
+        usage,
+        started: Optional[float] = None,
+        first_token_at: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Normalize an API usage object and add it to the running totals.
+
+        Returns:
+            Usage dict with input/output/total and cache read/write tokens
+            (plus time_to_first_token_ms for streams)
+        """
+        record = {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": usage.input_tokens + usage.output_tokens,
+            "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+            "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        }
+        if started is not None:
+            record["time_to_first_token_ms"] = (
+                round((first_token_at - started) * 1000) if first_token_at else None
+            )
+
+        self.usage_totals["calls"] += 1
+        for key in ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens"):
+            self.usage_totals[key] += record[key]
+        self.last_usage = record
+        return record
+
+    def get_usage_stats(self) -> Dict[str, Any]:
+        """
+        Cumulative token usage, including prompt cache reads and writes.
+
+        cache_hit_ratio is the share of prompt tokens served from cache.
+        """
+        totals = dict(self.usage_totals)
+        prompt_tokens = (
+            totals["input_tokens"]
+            + totals["cache_creation_input_tokens"]
+            + totals["cache_read_input_tokens"]
+        )
+        totals["cache_hit_ratio"] = (
+            totals["cache_read_input_tokens"] / prompt_tokens if prompt_tokens else 0.0
+        )
+        totals["last_call"] = self.last_usage
+        return totals
+
+    def format_context_message(self, context: str) -> str:
         """
         Format context from Graphiti into a well-structured message for Claude.
 
@@ -421,6 +644,12 @@ def get_claude_service() -> ClaudeService:
             langfuse_host=os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com"),
             model=os.getenv("CLAUDE_MODEL", "claude-sonnet-4-5-20250929"),
             max_tokens=int(os.getenv("CLAUDE_MAX_TOKENS", "16384")),
-            temperature=float(os.getenv("CLAUDE_TEMPERATURE", "0.7"))
+            temperature=float(os.getenv("CLAUDE_TEMPERATURE", "0.7")),
+            prompt_caching=os.getenv("CLAUDE_PROMPT_CACHING", "true").lower() == "true",
+            response_cache=(
+                get_llm_response_cache()
+                if os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+                else None
+            )
         )
     return _claude_service
@@ -0,0 +1,455 @@
+"""
+COMPLIANCE AGGREGATION ENGINE
+=============================
+Computes component-level compliance from real deal, task and evidence data
+and keeps portfolio rollups up to date incrementally.
+
+DATA SOURCES:
+- Deals: DealStorage (components, overall_completion, Guardian artifacts)
+- Tasks: task_service (open / overdue tasks per deal)
+- Requirements: COMPONENT_REQUIREMENTS in dashboard_service
+
+CALCULATION (per component of a deal):
+- completed_requirements = total_requirements x deal completion
+- evidence_count = required_evidence x share of Guardian evidence artifacts
+  recorded on the deal (policy, transaction, certificate, token)
+- overall_completion = (control x 0.6) + (evidence x 0.4)
+
+CACHING:
+- Per-deal DealConfiguration is cached until that deal's inputs change
+- DealStorage and task_service notify the engine on writes (invalidate)
+- Writes from other processes (DEAL_STORAGE_BACKEND=sql with several
+  workers) are noticed by polling DealStorage.store_version() at most every
+  COMPLIANCE_STORE_CHECK_SECONDS; a changed version reloads every deal
+- Deals with open tasks are also refreshed when their next due date passes
+  (due dates are compared on task_service's clock; heap entries for a
+  deadline that has since changed are skipped)
+- Per-ComponentType rollups are sums updated by subtracting a deal's old
+  contribution and adding its new one, so reads never rebuild the portfolio
+- Refreshes fetch deals first and then apply all changes without awaiting,
+  and reads wait for an in-flight refresh, so no read sees a half-applied
+  refresh
+
+CONFIGURATION:
+- COMPLIANCE_STORE_CHECK_SECONDS (default 5)
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models import (
+    ComplianceStatus,
+    ComponentCompliance,
+    ComponentType,
+    Deal,
+    DealConfiguration,
+)
+from app.services import task_service
+from app.services.deal_storage import DealStorage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_CHECK_SECONDS = float(os.getenv("COMPLIANCE_STORE_CHECK_SECONDS", "5"))
+
+
+# Defaults for component IDs not listed in COMPONENT_REQUIREMENTS:
+# (total_requirements, required_evidence)
+DEFAULT_REQUIREMENTS = {
+    ComponentType.SHARIAH_STRUCTURE: (10, 5),
+    ComponentType.JURISDICTION: (20, 10),
+    ComponentType.ACCOUNTING: (30, 15),
+    ComponentType.IMPACT: (10, 8),
+}
+
+# Rollup display metadata: (component_id, component_name)
+ROLLUP_NAMES = {
+    ComponentType.SHARIAH_STRUCTURE: ("aggregated_shariah", "All Shariah Structures"),
+    ComponentType.JURISDICTION: ("aggregated_jurisdiction", "All Jurisdictions"),
+    ComponentType.ACCOUNTING: ("aggregated_accounting", "All Accounting Frameworks"),
+    ComponentType.IMPACT: ("aggregated_impact", "All Impact Metrics"),
+}
+
+
+def classify_compliance(overall_completion: float, needs_attention: int) -> ComplianceStatus:
+    """Compliance status rule shared by components and rollups"""
+    if overall_completion >= 90:
+        return ComplianceStatus.COMPLIANT
+    elif needs_attention > 5:
+        return ComplianceStatus.NEEDS_ATTENTION
+    return ComplianceStatus.IN_PROGRESS
+
+
+def build_component_compliance(
+    component_type: ComponentType,
+    component_id: str,
+    component_name: str,
+    total_requirements: int,
+    completed_requirements: int,
+    required_evidence: int,
+    evidence_count: int,
+    needs_attention: Optional[int] = None
+) -> ComponentCompliance:
+    """
+    Build a ComponentCompliance from raw counts.
+
+    Args:
+        needs_attention: Override for needs_attention_count (defaults to
+            outstanding requirements)
+    """
+    control_completion = (completed_requirements / total_requirements * 100) if total_requirements > 0 else 0
+    evidence_completion = (evidence_count / required_evidence * 100) if required_evidence > 0 else 0
+    overall_completion = (control_completion * 0.6) + (evidence_completion * 0.4)
+
+    if needs_attention is None:
+        needs_attention = total_requirements - completed_requirements
+
+    return ComponentCompliance(
+        component_type=component_type,
+        component_id=component_id,
+        component_name=component_name,
+        total_requirements=total_requirements,
+        completed_requirements=completed_requirements,
+        evidence_count=evidence_count,
+        required_evidence_count=required_evidence,
+        control_completion=control_completion,
+        evidence_completion=evidence_completion,
+        overall_completion=overall_completion,
+        status=classify_compliance(overall_completion, needs_attention),
+        needs_attention_count=needs_attention,
+        last_updated=datetime.utcnow().isoformat()
+    )
+
+
+def evidence_ratio(deal: Deal) -> float:
+    """Share of Guardian evidence artifacts recorded on a deal (0.0 - 1.0)"""
+    artifacts = (
+        bool(deal.guardian_policy_id),
+        bool(deal.guardian_transaction_id),
+        deal.has_certificate and deal.certificate_status == 'issued',
+        deal.has_token,
+    )
+    return sum(artifacts) / len(artifacts)
+
+
+class _Rollup:
+    """Summed counts for one ComponentType across all deals"""
+
+    def __init__(self):
+        self.total_requirements = 0
+        self.completed_requirements = 0
+        self.required_evidence = 0
+        self.evidence_count = 0
+        self.needs_attention = 0
+
+    def apply(self, compliance: ComponentCompliance, sign: int) -> None:
+        self.total_requirements += sign * compliance.total_requirements
+        self.completed_requirements += sign * compliance.completed_requirements
+        self.required_evidence += sign * compliance.required_evidence_count
+        self.evidence_count += sign * compliance.evidence_count
+        self.needs_attention += sign * compliance.needs_attention_count
+
+
+class ComplianceEngine:
+    """
+    Incremental compliance aggregation over the deal portfolio.
+
+    Writes only mark deals dirty; the next read recomputes just those deals
+    and patches the rollups.
+    """
+
+    def __init__(self, requirements: Dict[str, Dict], store_check_seconds: float = DEFAULT_STORE_CHECK_SECONDS):
+        """
+        Initialize engine.
+
+        Args:
+            requirements: COMPONENT_REQUIREMENTS catalogue
+            store_check_seconds: Minimum seconds between deal store version
+                checks (only for stores shared between processes)
+        """
+        self.requirements = requirements
+        self.store_check_seconds = store_check_seconds
+
+        self._deals: Dict[str, DealConfiguration] = {}
+        self._rollups: Dict[ComponentType, _Rollup] = {t: _Rollup() for t in ComponentType}
+        self._status_counts: Counter = Counter()
+        self._structure_counts: Counter = Counter()
+
+        # Pending invalidations (None in the set = reload everything)
+        self._dirty: Set[Optional[str]] = {None}
+        # (due_date, deal_id) heap of upcoming open-task deadlines; entries
+        # whose deal has a different current deadline are stale and skipped
+        self._deadlines: List[Tuple[datetime, str]] = []
+        self._next_deadline: Dict[str, datetime] = {}
+        self._lock = asyncio.Lock()
+
+        # Deal store version as of the last check (None = not polled yet)
+        self._store_version = None
+        self._store_checked_at = 0.0
+
+        DealStorage.add_listener(self.invalidate)
+        task_service.add_task_listener(self.invalidate)
+
+        logger.info("🔧 Compliance engine initialized (incremental rollups)")
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, deal_id: Optional[str] = None) -> None:
+        """Mark a deal's compliance stale (None = all deals)"""
+        self._dirty.add(deal_id)
+
+    async def _check_store_version(self) -> None:
+        """Reload everything if another process wrote to the deal store"""
+        if time.monotonic() - self._store_checked_at < self.store_check_seconds:
+            return
+        self._store_checked_at = time.monotonic()
+
+        version = await DealStorage.store_version()
+        if version is None:
+            return
+        if self._store_version is not None and version != self._store_version:
+            self.invalidate(None)
+        self._store_version = version
+
+    async def refresh(self) -> None:
+        """Recompute stale deals and patch the rollups"""
+        await self._check_store_version()
+
+        now = task_service.utc_now()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            due, deal_id = heapq.heappop(self._deadlines)
+            if self._next_deadline.get(deal_id) == due:
+                del self._next_deadline[deal_id]
+                self._dirty.add(deal_id)
+
+        # An in-flight refresh has already taken the dirty set - wait for it
+        if not self._dirty and not self._lock.locked():
+            return
+
+        async with self._lock:
+            if not self._dirty:
+                return
+            dirty, self._dirty = self._dirty, set()
+
+            # Fetch first, then apply without awaiting so reads never see a
+            # partially applied refresh
+            if None in dirty:
+                deals = await DealStorage.get_all_deals()
+                self._reset()
+                for deal in deals:
+                    self._add(deal)
+                logger.info(f"📊 Compliance engine loaded {len(self._deals)} deals")
+                return
+
+            fetched = {deal_id: await DealStorage.get_deal(deal_id) for deal_id in dirty}
+            for deal_id, deal in fetched.items():
+                self._remove(deal_id)
+                if deal:
+                    self._add(deal)
+
+    def _reset(self) -> None:
+        self._deals.clear()
+        self._rollups = {t: _Rollup() for t in ComponentType}
+        self._status_counts.clear()
+        self._structure_counts.clear()
+        self._deadlines.clear()
+        self._next_deadline.clear()
+
+    def _apply(self, config: DealConfiguration, sign: int) -> None:
+        for component_type, compliance in self._components(config):
+            self._rollups[component_type].apply(compliance, sign)
+        self._status_counts[config.status] += sign
+        self._structure_counts[config.shariah_compliance.component_name] += sign
+        for counter in (self._status_counts, self._structure_counts):
+            for key in [k for k, v in counter.items() if v <= 0]:
+                del counter[key]
+
+    def _add(self, deal: Deal) -> None:
+        config, next_deadline = self._compute(deal)
+        self._deals[deal.deal_id] = config
+        self._apply(config, 1)
+        if next_deadline:
+            self._next_deadline[deal.deal_id] = next_deadline
+            heapq.heappush(self._deadlines, (next_deadline, deal.deal_id))
+
+            # Rebuild once stale entries outnumber live ones
+            if len(self._deadlines) > 2 * len(self._next_deadline):
+                self._deadlines = [(due, deal_id) for deal_id, due in self._next_deadline.items()]
+                heapq.heapify(self._deadlines)
+
+    def _remove(self, deal_id: str) -> None:
+        self._next_deadline.pop(deal_id, None)
+        config = self._deals.pop(deal_id, None)
+        if config:
+            self._apply(config, -1)
+
+    @staticmethod
+    def _components(config: DealConfiguration) -> List[Tuple[ComponentType, ComponentCompliance]]:
+        components = [
+            (ComponentType.SHARIAH_STRUCTURE, config.shariah_compliance),
+            (ComponentType.JURISDICTION, config.jurisdiction_compliance),
+            (ComponentType.ACCOUNTING, config.accounting_compliance),
+        ]
+        if config.impact_compliance:
+            components.append((ComponentType.IMPACT, config.impact_compliance))
+        return components
+
+    # ------------------------------------------------------------------
+    # Per-deal computation
+    # ------------------------------------------------------------------
+
+    def _component(
+        self,
+        component_type: ComponentType,
+        component_id: str,
+        completion: float,
+        evidence: float
+    ) -> ComponentCompliance:
+        reqs = self.requirements.get(component_id, {})
+        default_total, default_evidence = DEFAULT_REQUIREMENTS[component_type]
+        total_requirements = reqs.get('total_requirements', default_total)
+        required_evidence = reqs.get('required_evidence', default_evidence)
+
+        return build_component_compliance(
+            component_type=component_type,
+            component_id=component_id,
+            component_name=reqs.get('name', component_id),
+            total_requirements=total_requirements,
+            completed_requirements=int(total_requirements * completion),
+            required_evidence=required_evidence,
+            evidence_count=int(required_evidence * evidence)
+        )
+
+    def _compute(self, deal: Deal) -> Tuple[DealConfiguration, Optional[datetime]]:
+        """
+        Compute a deal's compliance.
+
+        Returns:
+            (configuration, next open-task deadline that will change the status)
+        """
+        completion = min(max((deal.overall_completion or 0.0) / 100, 0.0), 1.0)
+        evidence = evidence_ratio(deal)
+        impact = deal.impact_framework or 'none'
+
+        shariah = self._component(ComponentType.SHARIAH_STRUCTURE, deal.shariah_structure, completion, evidence)
+        jurisdiction = self._component(ComponentType.JURISDICTION, deal.jurisdiction, completion, evidence)
+        accounting = self._component(ComponentType.ACCOUNTING, deal.accounting_standard, completion, evidence)
+        impact_compliance = None
+        if impact != 'none':
+            impact_compliance = self._component(ComponentType.IMPACT, impact, completion, evidence)
+
+        components = [c for c in (shariah, jurisdiction, accounting, impact_compliance) if c]
+        overall = sum(c.overall_completion for c in components) / len(components)
+
+        # Open tasks: overdue ones flag the deal, future deadlines schedule a refresh
+        now = task_service.utc_now()
+        open_deadlines = [
+            t.due_date for t in task_service.get_contract_tasks(deal.deal_id)
+            if t.due_date and t.status.status not in ('completed', 'cancelled')
+        ]
+        has_overdue = any(d < now for d in open_deadlines)
+        next_deadline = min((d for d in open_deadlines if d >= now), default=None)
+
+        if has_overdue or any(c.status == ComplianceStatus.NEEDS_ATTENTION for c in components):
+            status = ComplianceStatus.NEEDS_ATTENTION
+        elif overall >= 90:
+            status = ComplianceStatus.COMPLIANT
+        else:
+            status = ComplianceStatus.IN_PROGRESS
+
+        config = DealConfiguration(
+            deal_id=deal.deal_id,
+            deal_name=deal.deal_name,
+            shariah_structure=deal.shariah_structure,
+            jurisdiction=deal.jurisdiction,
+            accounting=deal.accounting_standard,
+            impact=impact,
+            takaful_enabled=False,
+            shariah_compliance=shariah,
+            jurisdiction_compliance=jurisdiction,
+            accounting_compliance=accounting,
+            impact_compliance=impact_compliance,
+            overall_completion=overall,
+            status=status,
+            created_at=deal.created_at.isoformat()
+        )
+        return config, next_deadline
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get_deal(self, deal_id: str) -> Optional[DealConfiguration]:
+        """Cached compliance for one deal"""
+        await self.refresh()
+        return self._deals.get(deal_id)
+
+    async def get_deals(
+        self,
+        component_type: Optional[ComponentType] = None,
+        component_id: Optional[str] = None
+    ) -> List[DealConfiguration]:
+        """Cached compliance for all deals, optionally filtered by component"""
+        await self.refresh()
+        deals = list(self._deals.values())
+
+        if component_type and component_id:
+            attr = {
+                ComponentType.SHARIAH_STRUCTURE: 'shariah_structure',
+                ComponentType.JURISDICTION: 'jurisdiction',
+                ComponentType.ACCOUNTING: 'accounting',
+                ComponentType.IMPACT: 'impact',
+            }[component_type]
+            deals = [d for d in deals if getattr(d, attr) == component_id]
+
+        return deals
+
+    async def get_rollup(self, component_type: ComponentType) -> ComponentCompliance:
+        """Portfolio-wide compliance for a component type"""
+        await self.refresh()
+        rollup = self._rollups[component_type]
+        component_id, component_name = ROLLUP_NAMES[component_type]
+
+        return build_component_compliance(
+            component_type=component_type,
+            component_id=component_id,
+            component_name=component_name,
+            total_requirements=rollup.total_requirements,
+            completed_requirements=rollup.completed_requirements,
+            required_evidence=rollup.required_evidence,
+            evidence_count=rollup.evidence_count,
+            needs_attention=rollup.needs_attention
+        )
+
+    async def get_status_counts(self) -> Dict[ComplianceStatus, int]:
+        """Number of deals per compliance status"""
+        await self.refresh()
+        return dict(self._status_counts)
+
+    async def get_structure_counts(self) -> Dict[str, int]:
+        """Number of deals per Shariah structure (display name)"""
+        await self.refresh()
+        return dict(self._structure_counts)
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_compliance_engine: Optional[ComplianceEngine] = None
+
+
+def get_compliance_engine() -> ComplianceEngine:
+    """Get or create compliance engine singleton"""
+    global _compliance_engine
+    if _compliance_engine is None:
+        from app.services.dashboard_service import COMPONENT_REQUIREMENTS
+        _compliance_engine = ComplianceEngine(COMPONENT_REQUIREMENTS)
+    return _compliance_engine
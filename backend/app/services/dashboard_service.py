@@ -1,26 +1,50 @@
 """
 DASHBOARD SERVICE
 =================
-Business logic for calculating compliance metrics from workflow executions.
+Business logic for calculating compliance metrics from deal data.
 
 Implements:
-- Component-level compliance aggregation
+- Component-level compliance aggregation (via ComplianceEngine)
 - Deal configuration compliance calculation
 - Monitoring card generation
-- Progress calculation formulas
+- Progress calculation formulas (see compliance_engine)
 """
 
-from datetime import datetime
-from typing import List, Optional, Dict
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Dict
+
+import numpy as np
+
 from app.models import (
     DashboardMetrics,
     ComponentCompliance,
     DealConfiguration,
     MonitoringCard,
     ComponentType,
-    ComplianceStatus,
-    WorkflowExecution
+    ComplianceStatus
 )
+from app.services import task_service
+from app.services.compliance_engine import get_compliance_engine
+from app.services.deal_storage import DealStorage
+from app.services.portfolio_compliance import PortfolioComplianceCalculator
+
+# Lookback windows for portfolio metrics (None = no cutoff)
+PORTFOLIO_PERIODS = {
+    'last_7_days': timedelta(days=7),
+    'last_30_days': timedelta(days=30),
+    'last_90_days': timedelta(days=90),
+    'this_year': None,  # Resolved against the current year
+    'all_time': None,
+}
+
+# group_by option -> per-deal attribute column
+PORTFOLIO_GROUPS = {
+    'contract_type': 'shariah_structure',
+    'impact_methodology': 'impact_framework',
+    'status': 'status',
+    'owner': 'originator',
+}
 
 
 # ============================================================================
@@ -89,81 +113,35 @@ COMPONENT_REQUIREMENTS = {
 
 
 class DashboardService:
-    """Service for calculating dashboard metrics from execution data"""
+    """Service for calculating dashboard metrics from deal data"""
 
     @staticmethod
     async def get_dashboard_overview() -> DashboardMetrics:
         """
         Calculate dashboard metrics from all deals.
 
-        For MVP, returns mock data. In production, this would:
-        1. Query all workflow executions from database
-        2. Calculate component compliances
-        3. Generate monitoring cards
-        4. Calculate summary metrics
+        Component rollups and deal counts come from the compliance engine's
+        incrementally maintained cache, so cost does not grow with the
+        number of deals beyond listing them.
         """
-        # MVP: Return mock data with proper structure
-        # TODO: Replace with real data from database
-
-        # Mock: 3 active deals
-        mock_deals = [
-            DashboardService._create_mock_deal(
-                deal_id="exec-001",
-                deal_name="UAE Sukuk Ijara Deal",
-                shariah="sukuk_ijara",
-                jurisdiction="uae_dfsa",
-                accounting="aaoifi",
-                impact="green_sukuk",
-                overall_completion=85.0,
-                status=ComplianceStatus.IN_PROGRESS
-            ),
-            DashboardService._create_mock_deal(
-                deal_id="exec-002",
-                deal_name="Saudi Murabaha Financing",
-                shariah="murabaha",
-                jurisdiction="saudi_cma",
-                accounting="aaoifi",
-                impact="none",
-                overall_completion=92.0,
-                status=ComplianceStatus.COMPLIANT
-            ),
-            DashboardService._create_mock_deal(
-                deal_id="exec-003",
-                deal_name="Dubai Green Sukuk",
-                shariah="sukuk_murabaha",
-                jurisdiction="uae_dfsa",
-                accounting="ifrs_islamic",
-                impact="sdg",
-                overall_completion=45.0,
-                status=ComplianceStatus.NEEDS_ATTENTION
-            ),
-        ]
+        engine = get_compliance_engine()
+        deals = await engine.get_deals()
+        status_counts = await engine.get_status_counts()
 
         # Calculate component-level compliance (aggregated)
-        shariah_compliance = await DashboardService.get_component_compliance(
-            ComponentType.SHARIAH_STRUCTURE
-        )
-        jurisdiction_compliance = await DashboardService.get_component_compliance(
-            ComponentType.JURISDICTION
-        )
-        accounting_compliance = await DashboardService.get_component_compliance(
-            ComponentType.ACCOUNTING
-        )
-        impact_compliance = await DashboardService.get_component_compliance(
-            ComponentType.IMPACT
-        )
+        shariah_compliance = await engine.get_rollup(ComponentType.SHARIAH_STRUCTURE)
+        jurisdiction_compliance = await engine.get_rollup(ComponentType.JURISDICTION)
+        accounting_compliance = await engine.get_rollup(ComponentType.ACCOUNTING)
+        impact_compliance = await engine.get_rollup(ComponentType.IMPACT)
 
         # Generate monitoring cards
+        needs_attention = status_counts.get(ComplianceStatus.NEEDS_ATTENTION, 0)
         contracts_card = MonitoringCard(
             title="Contracts",
-            total_count=len(mock_deals),
-            needs_attention_count=1,
-            status=ComplianceStatus.IN_PROGRESS,
-            breakdown_by_component={
-                "Sukuk Ijara": 1,
-                "Sukuk Murabaha": 1,
-                "Murabaha": 1
-            },
+            total_count=len(deals),
+            needs_attention_count=needs_attention,
+            status=ComplianceStatus.NEEDS_ATTENTION if needs_attention else ComplianceStatus.IN_PROGRESS,
+            breakdown_by_component=await engine.get_structure_counts(),
             last_updated=datetime.utcnow().isoformat()
         )
 
@@ -180,15 +158,19 @@ class DashboardService:
             last_updated=datetime.utcnow().isoformat()
         )
 
+        impact_breakdown = DashboardService._impact_breakdown(deals)
+        impact_attention = sum(
+            1 for d in deals
+            if d.impact_compliance and d.impact_compliance.status == ComplianceStatus.NEEDS_ATTENTION
+        )
         impact_validations_card = MonitoringCard(
             title="Impact Validations",
-            total_count=5,
-            needs_attention_count=0,
-            status=ComplianceStatus.COMPLIANT,
+            total_count=len(deals),
+            needs_attention_count=impact_attention,
+            status=ComplianceStatus.NEEDS_ATTENTION if impact_attention else ComplianceStatus.COMPLIANT,
             breakdown_by_component={
-                "Green Standards": 2,
-                "SDG Metrics": 2,
-                "Not Applicable": 1
+                COMPONENT_REQUIREMENTS.get(k, {}).get('name', k) if k != 'none' else "Not Applicable": v
+                for k, v in impact_breakdown.items()
             },
             last_updated=datetime.utcnow().isoformat()
         )
@@ -208,13 +190,14 @@ class DashboardService:
             last_updated=datetime.utcnow().isoformat()
         )
 
-        # Calculate overall platform compliance
+        # Calculate overall platform compliance (components with requirements only)
+        rollups = [
+            c for c in (shariah_compliance, jurisdiction_compliance, accounting_compliance, impact_compliance)
+            if c.total_requirements > 0
+        ]
         overall_platform_compliance = (
-            shariah_compliance.overall_completion +
-            jurisdiction_compliance.overall_completion +
-            accounting_compliance.overall_completion +
-            impact_compliance.overall_completion
-        ) / 4.0
+            sum(c.overall_completion for c in rollups) / len(rollups) if rollups else 0.0
+        )
 
         return DashboardMetrics(
             shariah_compliance=shariah_compliance,
@@ -225,10 +208,10 @@ class DashboardService:
             shariah_reviews_card=shariah_reviews_card,
             impact_validations_card=impact_validations_card,
             documents_card=documents_card,
-            active_deals=mock_deals,
-            total_deals=len(mock_deals),
-            compliant_deals=len([d for d in mock_deals if d.status == ComplianceStatus.COMPLIANT]),
-            deals_needing_attention=len([d for d in mock_deals if d.status == ComplianceStatus.NEEDS_ATTENTION]),
+            active_deals=deals,
+            total_deals=len(deals),
+            compliant_deals=status_counts.get(ComplianceStatus.COMPLIANT, 0),
+            deals_needing_attention=needs_attention,
             overall_platform_compliance=overall_platform_compliance
         )
 
@@ -239,74 +222,10 @@ class DashboardService:
         """
         Get aggregated compliance for a component type.
 
-        For MVP, returns mock aggregated data.
-        In production, would aggregate across all deals using this component.
+        Sums requirements and evidence across every deal using a component
+        of this type (maintained incrementally by the compliance engine).
         """
-        # MVP: Return mock aggregated compliance
-        if component_type == ComponentType.SHARIAH_STRUCTURE:
-            return ComponentCompliance(
-                component_type=component_type,
-                component_id="aggregated_shariah",
-                component_name="All Shariah Structures",
-                total_requirements=37,  # Sum of sukuk_ijara + sukuk_murabaha + murabaha
-                completed_requirements=30,
-                evidence_count=15,
-                required_evidence_count=19,
-                control_completion=81.1,  # 30/37 * 100
-                evidence_completion=78.9,  # 15/19 * 100
-                overall_completion=80.2,  # (81.1 * 0.6) + (78.9 * 0.4)
-                status=ComplianceStatus.IN_PROGRESS,
-                needs_attention_count=7,
-                last_updated=datetime.utcnow().isoformat()
-            )
-        elif component_type == ComponentType.JURISDICTION:
-            return ComponentCompliance(
-                component_type=component_type,
-                component_id="aggregated_jurisdiction",
-                component_name="All Jurisdictions",
-                total_requirements=55,  # Sum of uae_dfsa + saudi_cma
-                completed_requirements=48,
-                evidence_count=22,
-                required_evidence_count=27,
-                control_completion=87.3,  # 48/55 * 100
-                evidence_completion=81.5,  # 22/27 * 100
-                overall_completion=85.0,  # (87.3 * 0.6) + (81.5 * 0.4)
-                status=ComplianceStatus.IN_PROGRESS,
-                needs_attention_count=7,
-                last_updated=datetime.utcnow().isoformat()
-            )
-        elif component_type == ComponentType.ACCOUNTING:
-            return ComponentCompliance(
-                component_type=component_type,
-                component_id="aggregated_accounting",
-                component_name="All Accounting Frameworks",
-                total_requirements=77,  # Sum of aaoifi + ifrs_islamic
-                completed_requirements=65,
-                evidence_count=25,
-                required_evidence_count=30,
-                control_completion=84.4,  # 65/77 * 100
-                evidence_completion=83.3,  # 25/30 * 100
-                overall_completion=84.0,  # (84.4 * 0.6) + (83.3 * 0.4)
-                status=ComplianceStatus.IN_PROGRESS,
-                needs_attention_count=12,
-                last_updated=datetime.utcnow().isoformat()
-            )
-        else:  # IMPACT
-            return ComponentCompliance(
-                component_type=component_type,
-                component_id="aggregated_impact",
-                component_name="All Impact Metrics",
-                total_requirements=18,  # Sum of green_sukuk + sdg
-                completed_requirements=14,
-                evidence_count=11,
-                required_evidence_count=14,
-                control_completion=77.8,  # 14/18 * 100
-                evidence_completion=78.6,  # 11/14 * 100
-                overall_completion=78.1,  # (77.8 * 0.6) + (78.6 * 0.4)
-                status=ComplianceStatus.IN_PROGRESS,
-                needs_attention_count=4,
-                last_updated=datetime.utcnow().isoformat()
-            )
+        return await get_compliance_engine().get_rollup(component_type)
 
     @staticmethod
     async def get_deals(
@@ -315,95 +234,37 @@ class DashboardService:
     ) -> List[DealConfiguration]:
         """
         Get all deals, optionally filtered by component.
-
-        For MVP, returns mock deals.
-        In production, would query database with filters.
         """
-        # Get all mock deals
-        all_deals = [
-            DashboardService._create_mock_deal(
-                deal_id="exec-001",
-                deal_name="UAE Sukuk Ijara Deal",
-                shariah="sukuk_ijara",
-                jurisdiction="uae_dfsa",
-                accounting="aaoifi",
-                impact="green_sukuk",
-                overall_completion=85.0,
-                status=ComplianceStatus.IN_PROGRESS
-            ),
-            DashboardService._create_mock_deal(
-                deal_id="exec-002",
-                deal_name="Saudi Murabaha Financing",
-                shariah="murabaha",
-                jurisdiction="saudi_cma",
-                accounting="aaoifi",
-                impact="none",
-                overall_completion=92.0,
-                status=ComplianceStatus.COMPLIANT
-            ),
-            DashboardService._create_mock_deal(
-                deal_id="exec-003",
-                deal_name="Dubai Green Sukuk",
-                shariah="sukuk_murabaha",
-                jurisdiction="uae_dfsa",
-                accounting="ifrs_islamic",
-                impact="sdg",
-                overall_completion=45.0,
-                status=ComplianceStatus.NEEDS_ATTENTION
-            ),
-        ]
-
-        # Apply filters if provided
-        if component_type and component_id:
-            filtered_deals = []
-            for deal in all_deals:
-                if component_type == ComponentType.SHARIAH_STRUCTURE and deal.shariah_structure == component_id:
-                    filtered_deals.append(deal)
-                elif component_type == ComponentType.JURISDICTION and deal.jurisdiction == component_id:
-                    filtered_deals.append(deal)
-                elif component_type == ComponentType.ACCOUNTING and deal.accounting == component_id:
-                    filtered_deals.append(deal)
-                elif component_type == ComponentType.IMPACT and deal.impact == component_id:
-                    filtered_deals.append(deal)
-            return filtered_deals
-
-        return all_deals
+        return await get_compliance_engine().get_deals(component_type, component_id)
 
     @staticmethod
     async def get_deal_compliance(deal_id: str) -> Optional[DealConfiguration]:
         """
         Get full compliance breakdown for a specific deal.
 
-        For MVP, returns mock deal if ID matches.
-        In production, would query database.
+        Single cached lookup; only recomputed when the deal or its tasks change.
         """
-        all_deals = await DashboardService.get_deals()
-        for deal in all_deals:
-            if deal.deal_id == deal_id:
-                return deal
-        return None
+        return await get_compliance_engine().get_deal(deal_id)
 
     @staticmethod
     async def get_monitoring_card_details(card_type: str) -> Dict:
         """
         Get detailed breakdown for a monitoring card.
 
-        For MVP, returns mock detailed breakdowns.
-        In production, would query database.
+        Contracts and impact validations come from real deal data; Shariah
+        reviews and documents remain static until those stores exist.
         """
         if card_type == 'contracts':
+            engine = get_compliance_engine()
+            deals = await engine.get_deals()
+            status_counts = await engine.get_status_counts()
             return {
-                "total_count": 3,
-                "needs_attention_count": 1,
-                "breakdown": {
-                    "sukuk_ijara": 1,
-                    "sukuk_murabaha": 1,
-                    "murabaha": 1
-                },
+                "total_count": len(deals),
+                "needs_attention_count": status_counts.get(ComplianceStatus.NEEDS_ATTENTION, 0),
+                "breakdown": dict(Counter(d.shariah_structure for d in deals)),
                 "details": [
-                    {"id": "exec-001", "name": "UAE Sukuk Ijara Deal", "status": "in_progress"},
-                    {"id": "exec-002", "name": "Saudi Murabaha Financing", "status": "compliant"},
-                    {"id": "exec-003", "name": "Dubai Green Sukuk", "status": "needs_attention"},
+                    {"id": d.deal_id, "name": d.deal_name, "status": d.status.value}
+                    for d in deals
                 ]
             }
         elif card_type == 'shariah_reviews':
@@ -422,15 +283,19 @@ class DashboardService:
                 ]
             }
         elif card_type == 'impact_validations':
+            deals = await get_compliance_engine().get_deals()
             return {
-                "total_count": 5,
-                "needs_attention_count": 0,
-                "breakdown": {
-                    "green_standards": 2,
-                    "sdg_metrics": 2,
-                    "not_applicable": 1
-                },
-                "details": []
+                "total_count": len(deals),
+                "needs_attention_count": sum(
+                    1 for d in deals
+                    if d.impact_compliance and d.impact_compliance.status == ComplianceStatus.NEEDS_ATTENTION
+                ),
+                "breakdown": DashboardService._impact_breakdown(deals),
+                "details": [
+                    {"id": d.deal_id, "name": d.deal_name, "impact": d.impact,
+                     "status": d.impact_compliance.status.value}
+                    for d in deals if d.impact_compliance
+                ]
             }
         else:  # documents
             return {
@@ -447,121 +312,64 @@ class DashboardService:
             }
 
     @staticmethod
-    def _create_mock_deal(
-        deal_id: str,
-        deal_name: str,
-        shariah: str,
-        jurisdiction: str,
-        accounting: str,
-        impact: str,
-        overall_completion: float,
-        status: ComplianceStatus
-    ) -> DealConfiguration:
-        """Helper to create mock deal configuration with component compliances"""
-
-        # Get component requirements
-        shariah_reqs = COMPONENT_REQUIREMENTS.get(shariah, {})
-        jurisdiction_reqs = COMPONENT_REQUIREMENTS.get(jurisdiction, {})
-        accounting_reqs = COMPONENT_REQUIREMENTS.get(accounting, {})
-        impact_reqs = COMPONENT_REQUIREMENTS.get(impact, {})
-
-        # Calculate mock compliance for each component
-        shariah_compliance = DashboardService._create_mock_component_compliance(
-            ComponentType.SHARIAH_STRUCTURE,
-            shariah,
-            shariah_reqs.get('name', shariah),
-            shariah_reqs.get('total_requirements', 10),
-            shariah_reqs.get('required_evidence', 5),
-            completion_percentage=overall_completion
-        )
-
-        jurisdiction_compliance = DashboardService._create_mock_component_compliance(
-            ComponentType.JURISDICTION,
-            jurisdiction,
-            jurisdiction_reqs.get('name', jurisdiction),
-            jurisdiction_reqs.get('total_requirements', 20),
-            jurisdiction_reqs.get('required_evidence', 10),
-            completion_percentage=overall_completion
-        )
-
-        accounting_compliance = DashboardService._create_mock_component_compliance(
-            ComponentType.ACCOUNTING,
-            accounting,
-            accounting_reqs.get('name', accounting),
-            accounting_reqs.get('total_requirements', 30),
-            accounting_reqs.get('required_evidence', 15),
-            completion_percentage=overall_completion
-        )
+    async def get_portfolio_metrics(
+        time_period: str = 'all_time',
+        group_by: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Portfolio-wide compliance metrics computed in one vectorized pass.
 
-        impact_compliance = None
-        if impact != 'none':
-            impact_compliance = DashboardService._create_mock_component_compliance(
-                ComponentType.IMPACT,
-                impact,
-                impact_reqs.get('name', impact),
-                impact_reqs.get('total_requirements', 10),
-                impact_reqs.get('required_evidence', 8),
-                completion_percentage=overall_completion
-            )
-
-        return DealConfiguration(
-            deal_id=deal_id,
-            deal_name=deal_name,
-            shariah_structure=shariah,
-            jurisdiction=jurisdiction,
-            accounting=accounting,
-            impact=impact,
-            takaful_enabled=False,
-            shariah_compliance=shariah_compliance,
-            jurisdiction_compliance=jurisdiction_compliance,
-            accounting_compliance=accounting_compliance,
-            impact_compliance=impact_compliance,
-            overall_completion=overall_completion,
-            status=status,
-            created_at=datetime.utcnow().isoformat()
-        )
+        Uses PortfolioComplianceCalculator (NumPy columns) rather than the
+        per-deal compliance engine, so cost stays low for 10k+ deals.
 
-    @staticmethod
-    def _create_mock_component_compliance(
-        component_type: ComponentType,
-        component_id: str,
-        component_name: str,
-        total_requirements: int,
-        required_evidence: int,
-        completion_percentage: float
-    ) -> ComponentCompliance:
-        """Helper to create mock component compliance"""
+        Args:
+            time_period: One of PORTFOLIO_PERIODS (filters on deal created_at)
+            group_by: Optional PORTFOLIO_GROUPS key for per-group breakdown
 
-        # Calculate completed requirements based on completion percentage
-        completed_requirements = int(total_requirements * (completion_percentage / 100))
-        evidence_count = int(required_evidence * (completion_percentage / 100))
+        Returns:
+            Dict with status counts, per-component rollups and optional groups
+        """
+        if time_period not in PORTFOLIO_PERIODS:
+            raise ValueError(f"Unknown time_period: {time_period}")
+        if group_by is not None and group_by not in PORTFOLIO_GROUPS:
+            raise ValueError(f"Unknown group_by: {group_by}")
 
-        control_completion = (completed_requirements / total_requirements * 100) if total_requirements > 0 else 0
-        evidence_completion = (evidence_count / required_evidence * 100) if required_evidence > 0 else 0
-        overall_completion = (control_completion * 0.6) + (evidence_completion * 0.4)
+        deals = await DealStorage.get_all_deals()
+        overdue_ids = {t.contract_id for t in task_service.get_overdue_tasks()}
 
-        needs_attention = total_requirements - completed_requirements
+        calculator = PortfolioComplianceCalculator.from_deals(deals, COMPONENT_REQUIREMENTS, overdue_ids)
 
-        # Determine status
-        if overall_completion >= 90:
-            status = ComplianceStatus.COMPLIANT
-        elif needs_attention > 5:
-            status = ComplianceStatus.NEEDS_ATTENTION
+        now = datetime.now()
+        if time_period == 'this_year':
+            cutoff = datetime(now.year, 1, 1)
+        elif PORTFOLIO_PERIODS[time_period] is not None:
+            cutoff = now - PORTFOLIO_PERIODS[time_period]
         else:
-            status = ComplianceStatus.IN_PROGRESS
-
-        return ComponentCompliance(
-            component_type=component_type,
-            component_id=component_id,
-            component_name=component_name,
-            total_requirements=total_requirements,
-            completed_requirements=completed_requirements,
-            evidence_count=evidence_count,
-            required_evidence_count=required_evidence,
-            control_completion=control_completion,
-            evidence_completion=evidence_completion,
-            overall_completion=overall_completion,
-            status=status,
-            needs_attention_count=needs_attention,
-            last_updated=datetime.utcnow().isoformat()
-        )
+            cutoff = None
+        if cutoff is not None:
+            calculator = calculator.subset(calculator.column('created_at') >= np.datetime64(cutoff, 'us'))
+
+        result = calculator.compute()
+        metrics: Dict[str, Any] = {
+            'total_contracts': len(calculator),
+            'by_compliance_status': result.status_counts(),
+            'by_lifecycle_status': dict(Counter(calculator.column('status').tolist())),
+            'by_contract_type': dict(Counter(calculator.column('shariah_structure').tolist())),
+            'average_completion': float(result.overall_completion.mean()) if len(calculator) else 0.0,
+            'overdue_contracts': int(calculator.overdue.sum()),
+            'components': {t.value: result.rollup(t) for t in ComponentType},
+        }
+
+        if group_by:
+            metrics['groups'] = result.group_by(calculator.column(PORTFOLIO_GROUPS[group_by]))
+
+        return {
+            'time_period': time_period,
+            'group_by': group_by,
+            'metrics': metrics,
+        }
+
+    @staticmethod
+    def _impact_breakdown(deals: List[DealConfiguration]) -> Dict[str, int]:
+        """Count deals per impact framework ('none' = not applicable)"""
+        return dict(Counter(d.impact for d in deals))
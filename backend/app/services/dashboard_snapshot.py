@@ -0,0 +1,251 @@
+"""
+DASHBOARD SNAPSHOT CACHE
+========================
+Precomputed, serialized dashboard responses with strong ETags.
+
+WHY:
+- The frontend polls /api/dashboard/overview and /monitoring/{card_type};
+  recomputing DashboardMetrics on every poll is wasted work when nothing
+  changed
+- Snapshots are rebuilt in the background after deal/task writes (debounced)
+  and at least every DASHBOARD_SNAPSHOT_TTL seconds (task deadlines pass
+  without a write event)
+- Each snapshot carries a strong ETag so idle dashboards get 304s
+
+ETAG STABILITY:
+- The ETag hashes the payload with volatile `last_updated` timestamps
+  removed, and a rebuild that produces the same content keeps the previous
+  body and ETag - a TTL refresh alone never busts client caches
+
+USAGE:
+    cache = get_dashboard_snapshot_cache()
+    snapshot = await cache.get("overview")
+    if cache.matches(request.headers.get("if-none-match"), snapshot):
+        return Response(status_code=304, headers=snapshot.headers())
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.services import task_service
+from app.services.deal_storage import DealStorage
+
+logger = logging.getLogger(__name__)
+
+# Seconds a snapshot may be served before it is rebuilt
+DEFAULT_TTL_SECONDS = float(os.getenv("DASHBOARD_SNAPSHOT_TTL", "30"))
+
+# Quiet period after a write before rebuilding (coalesces bursts of writes)
+DEBOUNCE_SECONDS = 0.25
+
+
+def _strip_volatile(value: Any) -> Any:
+    """Drop last_updated timestamps so they don't affect the ETag"""
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k != 'last_updated'}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+class Snapshot:
+    """One serialized dashboard response"""
+
+    def __init__(self, body: bytes, etag: str, built_at: float, version: int):
+        self.body = body
+        self.etag = etag
+        self.built_at = built_at
+        # Data version the snapshot was built from (see invalidate())
+        self.version = version
+
+    def headers(self) -> Dict[str, str]:
+        """Caching headers sent with both 200 and 304 responses"""
+        return {
+            "ETag": self.etag,
+            # Clients may store the response but must revalidate each poll
+            "Cache-Control": "no-cache",
+        }
+
+
+class DashboardSnapshotCache:
+    """
+    TTL + write-invalidated cache of serialized dashboard responses.
+
+    Builders are registered per key and return JSON-serializable data.
+    """
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """
+        Initialize snapshot cache.
+
+        Args:
+            ttl_seconds: Maximum snapshot age before a rebuild
+        """
+        self.ttl_seconds = ttl_seconds
+
+        self._builders: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._snapshots: Dict[str, Snapshot] = {}
+        # Bumped on every write; snapshots built from an older version are stale
+        self._version = 0
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.builds = 0
+        self.hits = 0
+
+        DealStorage.add_listener(self.invalidate)
+        task_service.add_task_listener(self.invalidate)
+
+    def register(self, key: str, builder: Callable[[], Awaitable[Any]]) -> None:
+        """Register the coroutine function that computes a snapshot's payload"""
+        self._builders[key] = builder
+
+    # ------------------------------------------------------------------
+    # Invalidation and background refresh
+    # ------------------------------------------------------------------
+
+    def invalidate(self, _deal_id: Optional[str] = None) -> None:
+        """Mark every snapshot stale (dashboard views span all deals)"""
+        self._version += 1
+        if self._wake is not None:
+            self._wake.set()
+
+    async def start(self) -> None:
+        """Start the background refresher (call from app lifespan)"""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._refresh_loop())
+            logger.info(f"✅ Dashboard snapshot refresher started (ttl={self.ttl_seconds}s)")
+
+    async def stop(self) -> None:
+        """Stop the background refresher"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wake = None
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.ttl_seconds)
+                await asyncio.sleep(DEBOUNCE_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            for key, snapshot in list(self._snapshots.items()):
+                if not self._is_fresh(snapshot):
+                    try:
+                        await self._build(key)
+                    except Exception as e:
+                        logger.error(f"❌ Dashboard snapshot refresh failed for {key}: {e}")
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Snapshot:
+        """
+        Get a snapshot, building it inline if missing, stale or expired.
+
+        With the background refresher running, reads after the first are
+        almost always served straight from memory.
+        """
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None and self._is_fresh(snapshot):
+            self.hits += 1
+            return snapshot
+        return await self._build(key)
+
+    def _is_fresh(self, snapshot: Snapshot) -> bool:
+        return (
+            snapshot.version == self._version
+            and time.monotonic() - snapshot.built_at < self.ttl_seconds
+        )
+
+    async def _build(self, key: str) -> Snapshot:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have rebuilt it while we waited
+            current = self._snapshots.get(key)
+            if current is not None and self._is_fresh(current):
+                return current
+
+            version = self._version
+            payload = await self._builders[key]()
+            if hasattr(payload, 'model_dump'):
+                payload = payload.model_dump(mode='json')
+
+            digest = hashlib.sha256(
+                json.dumps(_strip_volatile(payload), sort_keys=True, separators=(',', ':')).encode()
+            ).hexdigest()
+            etag = f'"{digest[:32]}"'
+            now = time.monotonic()
+            self.builds += 1
+
+            if current is not None and current.etag == etag:
+                # Content unchanged - keep body and ETag, just renew
+                current.built_at = now
+                current.version = version
+                return current
+
+            snapshot = Snapshot(json.dumps(payload).encode(), etag, now, version)
+            self._snapshots[key] = snapshot
+            return snapshot
+
+    @staticmethod
+    def matches(if_none_match: Optional[str], snapshot: Snapshot) -> bool:
+        """True if an If-None-Match header covers the snapshot's ETag"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        # If-None-Match uses weak comparison (RFC 9110 13.1.2)
+        tags = [t.strip() for t in if_none_match.split(',')]
+        return any(t.removeprefix('W/') == snapshot.etag for t in tags)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache metrics for monitoring"""
+        return {
+            "snapshots": len(self._snapshots),
+            "stale": sum(1 for s in self._snapshots.values() if not self._is_fresh(s)),
+            "builds": self.builds,
+            "hits": self.hits,
+            "ttl_seconds": self.ttl_seconds,
+            "background_refresh": self._task is not None,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_snapshot_cache: Optional[DashboardSnapshotCache] = None
+
+
+def get_dashboard_snapshot_cache() -> DashboardSnapshotCache:
+    """Get or create dashboard snapshot cache singleton"""
+    global _snapshot_cache
+    if _snapshot_cache is None:
+        from app.services.dashboard_service import DashboardService
+
+        _snapshot_cache = DashboardSnapshotCache()
+        _snapshot_cache.register("overview", DashboardService.get_dashboard_overview)
+        for card_type in ('contracts', 'shariah_reviews', 'impact_validations', 'documents'):
+            _snapshot_cache.register(
+                f"monitoring:{card_type}",
+                lambda card_type=card_type: DashboardService.get_monitoring_card_details(card_type)
+            )
+    return _snapshot_cache
@@ -0,0 +1,463 @@
+"""
+DEAL STORAGE BACKENDS
+=====================
+Pluggable persistence layer behind the DealStorage API.
+
+BACKENDS:
+- InMemoryDealBackend: Dict storage + sorted secondary indexes (default, demo)
+- SQLDealBackend: SQLite/PostgreSQL via the async engine in app/database.py
+
+WHY INDEXED:
+- Deal listing walks a (created_at, deal_id) ordered index from the cursor
+- Status / structure / jurisdiction filters use per-value indexes
+- Listing cost is O(page) instead of O(total deals)
+
+CONFIGURATION:
+    DEAL_STORAGE_BACKEND=memory   # default
+    DEAL_STORAGE_BACKEND=sql      # uses DATABASE_URL (e.g. sqlite+aiosqlite:///./deals.db)
+
+KEYSET PAGINATION:
+- Deals are ordered newest first by (created_at, deal_id)
+- A cursor encodes the (created_at, deal_id) of the last deal on a page
+- The next page starts strictly after that key, so inserts never shift pages
+"""
+
+import base64
+import bisect
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models import Deal
+
+logger = logging.getLogger(__name__)
+
+# Fields with a secondary index in every backend
+INDEXED_FIELDS = ("status", "shariah_structure", "jurisdiction")
+
+# Sort key for listing: (created_at, deal_id), newest first
+DealKey = Tuple[datetime, str]
+
+
+# ============================================================================
+# CURSOR ENCODING
+# ============================================================================
+
+def encode_cursor(key: DealKey) -> str:
+    """Encode a (created_at, deal_id) key as an opaque URL-safe cursor"""
+    created_at, deal_id = key
+    raw = f"{created_at.isoformat()}|{deal_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> DealKey:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, deal_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), deal_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def deal_key(deal: Deal) -> DealKey:
+    """Sort key for a deal"""
+    return deal.created_at, deal.deal_id
+
+
+# ============================================================================
+# BACKEND INTERFACE
+# ============================================================================
+
+class DealStorageBackend(ABC):
+    """
+    Abstract storage backend used by DealStorage.
+
+    All methods are async so database-backed implementations never block
+    the event loop.
+    """
+
+    async def initialize(self) -> None:
+        """Prepare storage (create tables, etc.). Called on app startup."""
+
+    @abstractmethod
+    async def insert(self, deal: Deal) -> None:
+        """Persist a new deal"""
+
+    @abstractmethod
+    async def get(self, deal_id: str) -> Optional[Deal]:
+        """Get a deal by ID"""
+
+    @abstractmethod
+    async def save(self, deal: Deal) -> None:
+        """Persist changes to an existing deal"""
+
+    @abstractmethod
+    async def delete(self, deal_id: str) -> bool:
+        """Delete a deal, returning False if it did not exist"""
+
+    @abstractmethod
+    async def list(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[DealKey] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None
+    ) -> List[Deal]:
+        """
+        List deals newest first.
+
+        Args:
+            filters: Exact-match filters on Deal fields (INDEXED_FIELDS use an index)
+            limit: Maximum number of deals to return (None = all)
+            after: Keyset cursor; only deals sorting after this key are returned
+            min_amount: Only deals with deal_amount >= min_amount
+            max_amount: Only deals with deal_amount <= max_amount
+        """
+
+    @abstractmethod
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        """Count deals matching exact-match filters"""
+
+    async def version(self) -> Optional[Tuple[Any, ...]]:
+        """
+        Fingerprint of the stored deals that changes on every write by any
+        process, or None if DealStorage listeners see every write (caches
+        in this process need no polling).
+        """
+        return None
+
+    async def aggregate(self) -> Optional[Dict[str, Any]]:
+        """
+        Stats counters computed by the store (DealAggregates.to_dict() shape).
+
+        None means DealStorage serves its own in-process counters, which is
+        only correct while this process is the store's single writer.
+        Backends shared between processes (SQL with several uvicorn
+        workers) must compute them from the store.
+        """
+        return None
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove all deals"""
+
+
+# ============================================================================
+# IN-MEMORY BACKEND
+# ============================================================================
+
+class InMemoryDealBackend(DealStorageBackend):
+    """
+    Dict storage with sorted secondary indexes.
+
+    Each index holds deal keys in ascending (created_at, deal_id) order;
+    listings walk the list backwards from the cursor position.
+    """
+
+    def __init__(self):
+        self._deals: Dict[str, Deal] = {}
+        self._order: List[DealKey] = []
+        self._indexes: Dict[str, Dict[Any, List[DealKey]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        # Sort key and indexed values as of the last insert/save, so an update
+        # removes the entries that were actually stored (not the new ones)
+        self._keys: Dict[str, DealKey] = {}
+        self._indexed_values: Dict[str, Dict[str, Any]] = {}
+
+    def _index_add(self, deal: Deal) -> None:
+        key = deal_key(deal)
+        bisect.insort(self._order, key)
+        values = {field: getattr(deal, field) for field in INDEXED_FIELDS}
+        for field, value in values.items():
+            bisect.insort(self._indexes[field].setdefault(value, []), key)
+        self._keys[deal.deal_id] = key
+        self._indexed_values[deal.deal_id] = values
+
+    @staticmethod
+    def _remove_key(keys: List[DealKey], key: DealKey) -> None:
+        pos = bisect.bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key:
+            keys.pop(pos)
+
+    def _index_remove(self, deal_id: str) -> None:
+        key = self._keys.pop(deal_id, None)
+        if key is None:
+            return
+        self._remove_key(self._order, key)
+        values = self._indexed_values.pop(deal_id, {})
+        for field, value in values.items():
+            keys = self._indexes[field].get(value)
+            if not keys:
+                continue
+            self._remove_key(keys, key)
+            if not keys:
+                del self._indexes[field][value]
+
+    async def insert(self, deal: Deal) -> None:
+        self._deals[deal.deal_id] = deal
+        self._index_add(deal)
+
+    async def get(self, deal_id: str) -> Optional[Deal]:
+        return self._deals.get(deal_id)
+
+    async def save(self, deal: Deal) -> None:
+        current = {field: getattr(deal, field) for field in INDEXED_FIELDS}
+        self._deals[deal.deal_id] = deal
+        if (
+            self._keys.get(deal.deal_id) != deal_key(deal)
+            or self._indexed_values.get(deal.deal_id) != current
+        ):
+            self._index_remove(deal.deal_id)
+            self._index_add(deal)
+
+    async def delete(self, deal_id: str) -> bool:
+        deal = self._deals.pop(deal_id, None)
+        if not deal:
+            return False
+        self._index_remove(deal_id)
+        return True
+
+    def _select_index(self, filters: Dict[str, Any]) -> Tuple[List[DealKey], Dict[str, Any]]:
+        """Pick the smallest matching index; remaining filters are checked per deal"""
+        candidates = [
+            (self._indexes[field].get(value, []), field)
+            for field, value in filters.items()
+            if field in self._indexes
+        ]
+        if not candidates:
+            return self._order, filters
+        keys, field = min(candidates, key=lambda c: len(c[0]))
+        remaining = {f: v for f, v in filters.items() if f != field}
+        return keys, remaining
+
+    async def list(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[DealKey] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None
+    ) -> List[Deal]:
+        keys, remaining = self._select_index(filters or {})
+
+        def matches(deal: Deal) -> bool:
+            if not all(getattr(deal, f) == v for f, v in remaining.items()):
+                return False
+            if min_amount is not None or max_amount is not None:
+                if deal.deal_amount is None:
+                    return False
+                if min_amount is not None and deal.deal_amount < min_amount:
+                    return False
+                if max_amount is not None and deal.deal_amount > max_amount:
+                    return False
+            return True
+
+        # Newest first: start just below the cursor and walk backwards
+        pos = bisect.bisect_left(keys, after) if after else len(keys)
+
+        results: List[Deal] = []
+        while pos > 0 and (limit is None or len(results) < limit):
+            pos -= 1
+            deal = self._deals[keys[pos][1]]
+            if matches(deal):
+                results.append(deal)
+        return results
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        keys, remaining = self._select_index(filters or {})
+        if not remaining:
+            return len(keys)
+        return sum(
+            1 for _, deal_id in keys
+            if all(getattr(self._deals[deal_id], f) == v for f, v in remaining.items())
+        )
+
+    async def clear(self) -> None:
+        self._deals.clear()
+        self._order.clear()
+        self._keys.clear()
+        self._indexed_values.clear()
+        for index in self._indexes.values():
+            index.clear()
+
+
+# ============================================================================
+# SQL BACKEND (SQLite / PostgreSQL)
+# ============================================================================
+
+class SQLDealBackend(DealStorageBackend):
+    """
+    SQLAlchemy backend on the shared async engine from app/database.py.
+
+    Works with any async driver supported there (asyncpg, aiosqlite).
+    """
+
+    def __init__(self):
+        # Imported lazily so the in-memory default has no database dependency
+        from app.database import engine, AsyncSessionLocal
+        from app.db_models import DealRecord
+
+        self._engine = engine
+        self._session_factory = AsyncSessionLocal
+        self._record = DealRecord
+
+    async def initialize(self) -> None:
+        async with self._engine.begin() as conn:
+            await conn.run_sync(self._record.__table__.create, checkfirst=True)
+        logger.info("✅ Deal storage table ready (SQL backend)")
+
+    def _to_deal(self, record) -> Deal:
+        # Stored rows were validated on create; updates follow the in-memory
+        # semantics (plain attribute assignment), so construct without revalidation
+        return Deal.model_construct(**{
+            field: getattr(record, field) for field in Deal.model_fields
+        })
+
+    def _apply_filters(self, stmt, filters: Optional[Dict[str, Any]]):
+        for field, value in (filters or {}).items():
+            stmt = stmt.where(getattr(self._record, field) == value)
+        return stmt
+
+    async def insert(self, deal: Deal) -> None:
+        async with self._session_factory() as session:
+            session.add(self._record(**deal.model_dump()))
+            await session.commit()
+
+    async def get(self, deal_id: str) -> Optional[Deal]:
+        async with self._session_factory() as session:
+            record = await session.get(self._record, deal_id)
+            return self._to_deal(record) if record else None
+
+    async def save(self, deal: Deal) -> None:
+        async with self._session_factory() as session:
+            await session.merge(self._record(**deal.model_dump()))
+            await session.commit()
+
+    async def delete(self, deal_id: str) -> bool:
+        from sqlalchemy import delete
+
+        async with self._session_factory() as session:
+            result = await session.execute(
+                delete(self._record).where(self._record.deal_id == deal_id)
+            )
+            await session.commit()
+            return result.rowcount > 0
+
+    async def list(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        after: Optional[DealKey] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None
+    ) -> List[Deal]:
+        from sqlalchemy import select, or_, and_
+
+        record = self._record
+        stmt = self._apply_filters(select(record), filters)
+
+        if min_amount is not None:
+            stmt = stmt.where(record.deal_amount >= min_amount)
+        if max_amount is not None:
+            stmt = stmt.where(record.deal_amount <= max_amount)
+
+        if after:
+            created_at, deal_id = after
+            stmt = stmt.where(or_(
+                record.created_at < created_at,
+                and_(record.created_at == created_at, record.deal_id < deal_id)
+            ))
+
+        stmt = stmt.order_by(record.created_at.desc(), record.deal_id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            return [self._to_deal(r) for r in result.scalars()]
+
+    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+        from sqlalchemy import select, func
+
+        stmt = self._apply_filters(select(func.count()).select_from(self._record), filters)
+        async with self._session_factory() as session:
+            result = await session.execute(stmt)
+            return result.scalar_one()
+
+    async def version(self) -> Tuple[Any, ...]:
+        from sqlalchemy import select, func
+
+        # Creates and deletes change the count; update_deal bumps updated_at
+        stmt = select(func.count(), func.max(self._record.updated_at))
+        async with self._session_factory() as session:
+            return tuple((await session.execute(stmt)).one())
+
+    async def aggregate(self) -> Dict[str, Any]:
+        from sqlalchemy import select, func, case
+
+        record = self._record
+        totals = select(
+            func.count(),
+            func.coalesce(func.sum(case((record.has_certificate, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((record.has_token, 1), else_=0)), 0),
+            func.coalesce(func.sum(record.overall_completion), 0.0),
+        )
+
+        async with self._session_factory() as session:
+            total, certificates, tokens, completion_sum = (await session.execute(totals)).one()
+            grouped = {}
+            for field in ('status', 'shariah_structure', 'jurisdiction'):
+                column = getattr(record, field)
+                result = await session.execute(select(column, func.count()).group_by(column))
+                grouped[field] = {value: count for value, count in result.all()}
+
+        return {
+            'total_deals': total,
+            'by_status': grouped['status'],
+            'by_shariah_structure': grouped['shariah_structure'],
+            'by_jurisdiction': grouped['jurisdiction'],
+            'certificates_issued': int(certificates),
+            'tokenized_deals': int(tokens),
+            'completion_sum': float(completion_sum),
+        }
+
+    async def clear(self) -> None:
+        from sqlalchemy import delete
+
+        async with self._session_factory() as session:
+            await session.execute(delete(self._record))
+            await session.commit()
+
+
+# ============================================================================
+# BACKEND FACTORY
+# ============================================================================
+
+def create_deal_backend(backend: Optional[str] = None) -> DealStorageBackend:
+    """
+    Create the configured deal storage backend.
+
+    Args:
+        backend: 'memory' or 'sql' (defaults to DEAL_STORAGE_BACKEND env var)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    backend = (backend or os.getenv("DEAL_STORAGE_BACKEND", "memory")).lower()
+
+    if backend == "memory":
+        return InMemoryDealBackend()
+    if backend == "sql":
+        return SQLDealBackend()
+
+    raise ValueError(f"Unknown DEAL_STORAGE_BACKEND: {backend}. Must be 'memory' or 'sql'")
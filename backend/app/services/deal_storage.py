@@ -1,46 +1,196 @@
 """
 DEAL STORAGE SERVICE
 ====================
-In-memory storage for Islamic Finance deal lifecycle management.
+Storage for Islamic Finance deal lifecycle management.
 
 DESIGN:
-- Simple dict-based storage for demo purposes
-- Thread-safe operations with Python's GIL
-- Data persists during backend session only
-- For production: Replace with SQLAlchemy + PostgreSQL
+- Class-based facade over a pluggable backend (see deal_backends.py)
+- In-memory backend with secondary indexes by default (demo)
+- SQLite/PostgreSQL backend via DEAL_STORAGE_BACKEND=sql (survives restarts)
+- Listing uses keyset pagination on (created_at, deal_id)
 
 USAGE:
     from app.services.deal_storage import DealStorage
 
     # Create deal
-    deal = DealStorage.create_deal(deal_create_data)
+    deal = await DealStorage.create_deal(deal_create_data)
 
     # Get all deals
-    deals = DealStorage.get_all_deals()
+    deals = await DealStorage.get_all_deals()
+
+    # Get one page of deals
+    deals, next_cursor = await DealStorage.list_deals(limit=20)
 
     # Get specific deal
-    deal = DealStorage.get_deal(deal_id)
+    deal = await DealStorage.get_deal(deal_id)
 """
 
+import logging
 import uuid
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from app.models import Deal, DealCreate
+from app.services.deal_backends import (
+    DealStorageBackend,
+    create_deal_backend,
+    decode_cursor,
+    deal_key,
+    encode_cursor,
+)
+
+logger = logging.getLogger(__name__)
+
+# Identity and sort-key fields; update_deal rejects changes to them
+IMMUTABLE_FIELDS = frozenset({"deal_id", "created_at"})
+
+
+class DealAggregates:
+    """
+    Incrementally maintained deal counters.
+
+    Updated by DealStorage.create_deal / update_deal / delete_deal so that
+    stats reads never scan the deal store. rebuild() recomputes everything
+    from scratch (startup, consistency checks).
+
+    The counters live in this process, so they only see this process's
+    writes. Backends shared between processes (SQL with several uvicorn
+    workers) compute stats from the store instead (backend.aggregate()).
+    """
+
+    # Deal fields whose changes affect the counters
+    TRACKED_FIELDS = (
+        'status', 'shariah_structure', 'jurisdiction',
+        'has_certificate', 'has_token', 'overall_completion'
+    )
+
+    def __init__(self):
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.by_shariah_structure: Counter = Counter()
+        self.by_jurisdiction: Counter = Counter()
+        self.certificates_issued = 0
+        self.tokenized_deals = 0
+        self.completion_sum = 0.0
+
+    @classmethod
+    def snapshot(cls, deal: Deal) -> Dict[str, Any]:
+        """Capture the tracked fields of a deal (before it is mutated)"""
+        return {field: getattr(deal, field) for field in cls.TRACKED_FIELDS}
+
+    def apply(self, values: Dict[str, Any], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) one deal's contribution"""
+        self.total += sign
+        for counter, field in (
+            (self.by_status, 'status'),
+            (self.by_shariah_structure, 'shariah_structure'),
+            (self.by_jurisdiction, 'jurisdiction'),
+        ):
+            counter[values[field]] += sign
+            if counter[values[field]] <= 0:
+                del counter[values[field]]
+        self.certificates_issued += sign if values['has_certificate'] else 0
+        self.tokenized_deals += sign if values['has_token'] else 0
+        self.completion_sum += sign * (values['overall_completion'] or 0)
+
+    def rebuild(self, deals: List[Deal]) -> None:
+        """Recompute all counters from a full list of deals"""
+        self.__init__()
+        for deal in deals:
+            self.apply(self.snapshot(deal), 1)
+
+    @classmethod
+    def from_dict(cls, counters: Dict[str, Any]) -> "DealAggregates":
+        """Counters from to_dict()-shaped data (e.g. backend.aggregate())"""
+        agg = cls()
+        agg.total = counters['total_deals']
+        agg.by_status = Counter(counters['by_status'])
+        agg.by_shariah_structure = Counter(counters['by_shariah_structure'])
+        agg.by_jurisdiction = Counter(counters['by_jurisdiction'])
+        agg.certificates_issued = counters['certificates_issued']
+        agg.tokenized_deals = counters['tokenized_deals']
+        agg.completion_sum = counters['completion_sum']
+        return agg
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Counters as plain data (used for stats responses and drift reports)"""
+        return {
+            'total_deals': self.total,
+            'by_status': dict(self.by_status),
+            'by_shariah_structure': dict(self.by_shariah_structure),
+            'by_jurisdiction': dict(self.by_jurisdiction),
+            'certificates_issued': self.certificates_issued,
+            'tokenized_deals': self.tokenized_deals,
+            'completion_sum': self.completion_sum,
+        }
 
 
 class DealStorage:
     """
-    In-memory storage for deals.
+    Storage facade for deals.
 
-    Class-based singleton pattern for demo purposes.
-    Data is stored in a class-level dictionary.
+    Class-based singleton pattern; the backend is selected from the
+    DEAL_STORAGE_BACKEND environment variable on first use.
     """
 
-    # Class-level storage dictionary
-    _deals: Dict[str, Deal] = {}
+    # Configured storage backend (created lazily)
+    _backend: Optional[DealStorageBackend] = None
+
+    # Incrementally maintained counters for stats
+    _aggregates: DealAggregates = DealAggregates()
+
+    # Callbacks notified with the deal_id on every write (None = all deals)
+    _listeners: List[Callable[[Optional[str]], None]] = []
 
     @classmethod
-    def create_deal(cls, deal_data: DealCreate) -> Deal:
+    def add_listener(cls, callback: Callable[[Optional[str]], None]) -> None:
+        """
+        Register a callback invoked after each create/update/delete.
+
+        The callback receives the affected deal_id, or None when all deals
+        changed (clear_all, backend swap). Used by the compliance engine to
+        invalidate cached per-deal compliance.
+        """
+        cls._listeners.append(callback)
+
+    @classmethod
+    def _notify(cls, deal_id: Optional[str]) -> None:
+        for callback in cls._listeners:
+            callback(deal_id)
+
+    @classmethod
+    def get_backend(cls) -> DealStorageBackend:
+        """Get (or create) the configured storage backend"""
+        if cls._backend is None:
+            cls._backend = create_deal_backend()
+        return cls._backend
+
+    @classmethod
+    def set_backend(cls, backend: DealStorageBackend) -> None:
+        """
+        Replace the storage backend.
+
+        Example:
+            >>> from app.services.deal_backends import InMemoryDealBackend
+            >>> DealStorage.set_backend(InMemoryDealBackend())
+        """
+        cls._backend = backend
+        cls._aggregates = DealAggregates()
+        cls._notify(None)
+
+    @classmethod
+    async def initialize(cls) -> None:
+        """
+        Initialize the storage backend (create tables, etc.) and load the
+        stats counters from existing data. Called on startup.
+        """
+        backend = cls.get_backend()
+        await backend.initialize()
+        cls._aggregates.rebuild(await backend.list())
+        cls._notify(None)
+
+    @classmethod
+    async def create_deal(cls, deal_data: DealCreate) -> Deal:
         """
         Create a new deal from workflow completion.
 
@@ -58,7 +208,7 @@ class DealStorage:
             ...     accounting_standard="aaoifi",
             ...     impact_framework="qfc_sustainable"
             ... )
-            >>> deal = DealStorage.create_deal(deal_create)
+            >>> deal = await DealStorage.create_deal(deal_create)
             >>> print(deal.deal_id)
             'deal-550e8400-e29b-41d4-a716-446655440000'
         """
@@ -76,16 +226,19 @@ class DealStorage:
             **deal_data.model_dump()
         )
 
-        # Store in memory
-        cls._deals[deal_id] = deal
+        await cls.get_backend().insert(deal)
+        cls._aggregates.apply(DealAggregates.snapshot(deal), 1)
+        cls._notify(deal_id)
 
         return deal
 
     @classmethod
-    def get_all_deals(cls, status: Optional[str] = None) -> List[Deal]:
+    async def get_all_deals(cls, status: Optional[str] = None) -> List[Deal]:
         """
         Get all deals, optionally filtered by status.
 
+        Prefer list_deals() for API listings - this returns every match.
+
         Args:
             status: Optional status filter ('draft', 'active', 'completed', 'archived')
 
@@ -93,22 +246,86 @@ class DealStorage:
             List of deals, sorted by created_at descending (newest first)
 
         Example:
-            >>> all_deals = DealStorage.get_all_deals()
-            >>> active_deals = DealStorage.get_all_deals(status='active')
+            >>> all_deals = await DealStorage.get_all_deals()
+            >>> active_deals = await DealStorage.get_all_deals(status='active')
         """
-        deals = list(cls._deals.values())
+        filters = {'status': status} if status else None
+        return await cls.get_backend().list(filters=filters)
 
-        # Filter by status if provided
-        if status:
-            deals = [d for d in deals if d.status == status]
+    @classmethod
+    async def list_deals(
+        cls,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        shariah_structure: Optional[str] = None,
+        jurisdiction: Optional[str] = None,
+        accounting_standard: Optional[str] = None,
+        impact_framework: Optional[str] = None,
+        originator: Optional[str] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None
+    ) -> Tuple[List[Deal], Optional[str]]:
+        """
+        Get one page of deals using keyset pagination.
 
-        # Sort by created_at descending (newest first)
-        deals.sort(key=lambda d: d.created_at, reverse=True)
+        Args:
+            status: Optional status filter
+            limit: Page size
+            cursor: Opaque cursor from a previous page (None = first page)
+            shariah_structure: Optional Shariah structure filter
+            jurisdiction: Optional jurisdiction filter
+            accounting_standard: Optional accounting standard filter
+            impact_framework: Optional impact framework filter
+            originator: Optional originator filter (exact match)
+            min_amount: Optional minimum deal_amount (inclusive)
+            max_amount: Optional maximum deal_amount (inclusive)
+
+        Returns:
+            (deals, next_cursor) - next_cursor is None on the last page
+
+        Raises:
+            ValueError: If the cursor is malformed
+
+        Example:
+            >>> page, cursor = await DealStorage.list_deals(limit=20, jurisdiction='qatar_qfc')
+            >>> while cursor:
+            ...     page, cursor = await DealStorage.list_deals(
+            ...         limit=20, jurisdiction='qatar_qfc', cursor=cursor
+            ...     )
+        """
+        filters = {
+            field: value
+            for field, value in {
+                'status': status,
+                'shariah_structure': shariah_structure,
+                'jurisdiction': jurisdiction,
+                'accounting_standard': accounting_standard,
+                'impact_framework': impact_framework,
+                'originator': originator,
+            }.items()
+            if value is not None
+        }
+        after = decode_cursor(cursor) if cursor else None
+
+        # Fetch one extra row to know whether another page exists
+        deals = await cls.get_backend().list(
+            filters=filters,
+            limit=limit + 1,
+            after=after,
+            min_amount=min_amount,
+            max_amount=max_amount
+        )
+
+        next_cursor = None
+        if len(deals) > limit:
+            deals = deals[:limit]
+            next_cursor = encode_cursor(deal_key(deals[-1]))
 
-        return deals
+        return deals, next_cursor
 
     @classmethod
-    def get_deal(cls, deal_id: str) -> Optional[Deal]:
+    async def get_deal(cls, deal_id: str) -> Optional[Deal]:
         """
         Get a specific deal by ID.
 
@@ -119,16 +336,16 @@ class DealStorage:
             Deal if found, None otherwise
 
         Example:
-            >>> deal = DealStorage.get_deal("deal-550e8400-e29b-41d4-a716-446655440000")
+            >>> deal = await DealStorage.get_deal("deal-550e8400-e29b-41d4-a716-446655440000")
             >>> if deal:
             ...     print(f"Found: {deal.deal_name}")
             ... else:
             ...     print("Deal not found")
         """
-        return cls._deals.get(deal_id)
+        return await cls.get_backend().get(deal_id)
 
     @classmethod
-    def update_deal(cls, deal_id: str, updates: dict) -> Optional[Deal]:
+    async def update_deal(cls, deal_id: str, updates: dict) -> Optional[Deal]:
         """
         Update a deal's fields.
 
@@ -139,16 +356,27 @@ class DealStorage:
         Returns:
             Updated deal if found, None otherwise
 
+        Raises:
+            ValueError: If updates change deal_id or created_at (the deal's
+                identity and sort key)
+
         Example:
-            >>> deal = DealStorage.update_deal(
+            >>> deal = await DealStorage.update_deal(
             ...     "deal-123",
             ...     {"status": "completed", "overall_completion": 100.0}
             ... )
         """
-        deal = cls._deals.get(deal_id)
+        immutable = sorted(IMMUTABLE_FIELDS.intersection(updates))
+        if immutable:
+            raise ValueError(f"Cannot update {', '.join(immutable)}")
+
+        backend = cls.get_backend()
+        deal = await backend.get(deal_id)
         if not deal:
             return None
 
+        before = DealAggregates.snapshot(deal)
+
         # Update fields
         for key, value in updates.items():
             if hasattr(deal, key):
@@ -157,10 +385,18 @@ class DealStorage:
         # Update timestamp
         deal.updated_at = datetime.now()
 
+        await backend.save(deal)
+
+        after = DealAggregates.snapshot(deal)
+        if after != before:
+            cls._aggregates.apply(before, -1)
+            cls._aggregates.apply(after, 1)
+        cls._notify(deal_id)
+
         return deal
 
     @classmethod
-    def delete_deal(cls, deal_id: str) -> bool:
+    async def delete_deal(cls, deal_id: str) -> bool:
         """
         Delete a deal from storage.
 
@@ -171,17 +407,23 @@ class DealStorage:
             True if deleted, False if not found
 
         Example:
-            >>> deleted = DealStorage.delete_deal("deal-123")
+            >>> deleted = await DealStorage.delete_deal("deal-123")
             >>> if deleted:
             ...     print("Deal deleted successfully")
         """
-        if deal_id in cls._deals:
-            del cls._deals[deal_id]
-            return True
-        return False
+        backend = cls.get_backend()
+        deal = await backend.get(deal_id)
+        if not deal:
+            return False
+
+        deleted = await backend.delete(deal_id)
+        if deleted:
+            cls._aggregates.apply(DealAggregates.snapshot(deal), -1)
+            cls._notify(deal_id)
+        return deleted
 
     @classmethod
-    def count_deals(cls, status: Optional[str] = None) -> int:
+    async def count_deals(cls, status: Optional[str] = None) -> int:
         """
         Count deals, optionally filtered by status.
 
@@ -192,50 +434,120 @@ class DealStorage:
             Number of deals matching criteria
 
         Example:
-            >>> total = DealStorage.count_deals()
-            >>> active = DealStorage.count_deals(status='active')
+            >>> total = await DealStorage.count_deals()
+            >>> active = await DealStorage.count_deals(status='active')
+        """
+        filters = {'status': status} if status else None
+        return await cls.get_backend().count(filters=filters)
+
+    @classmethod
+    async def store_version(cls) -> Optional[Tuple[Any, ...]]:
+        """
+        Fingerprint of the stored deals for caches that must notice writes
+        made by other processes (None = listeners see every write).
+
+        Example:
+            >>> version = await DealStorage.store_version()
         """
-        if status:
-            return len([d for d in cls._deals.values() if d.status == status])
-        return len(cls._deals)
+        return await cls.get_backend().version()
 
     @classmethod
-    def clear_all(cls) -> None:
+    async def clear_all(cls) -> None:
         """
         Clear all deals from storage.
 
-        WARNING: This is irreversible in the current in-memory implementation.
+        WARNING: This is irreversible (including for the SQL backend).
         Only use for testing/demo reset purposes.
 
         Example:
-            >>> DealStorage.clear_all()
-            >>> print(DealStorage.count_deals())
+            >>> await DealStorage.clear_all()
+            >>> print(await DealStorage.count_deals())
             0
         """
-        cls._deals.clear()
+        await cls.get_backend().clear()
+        cls._aggregates = DealAggregates()
+        cls._notify(None)
 
     @classmethod
-    def get_storage_stats(cls) -> dict:
+    async def get_storage_stats(cls) -> dict:
         """
         Get statistics about the deal storage.
 
+        Served from incrementally maintained counters - O(1) in the
+        number of deals - unless the backend computes them from the store
+        (SQL backend: grouped counts, consistent across worker processes).
+
         Returns:
             Dictionary with storage statistics
 
         Example:
-            >>> stats = DealStorage.get_storage_stats()
+            >>> stats = await DealStorage.get_storage_stats()
             >>> print(f"Total deals: {stats['total_deals']}")
             >>> print(f"Active deals: {stats['active_deals']}")
         """
-        all_deals = list(cls._deals.values())
+        counters = await cls.get_backend().aggregate()
+        agg = DealAggregates.from_dict(counters) if counters is not None else cls._aggregates
+
+        return {
+            'total_deals': agg.total,
+            'active_deals': agg.by_status.get('active', 0),
+            'completed_deals': agg.by_status.get('completed', 0),
+            'draft_deals': agg.by_status.get('draft', 0),
+            'archived_deals': agg.by_status.get('archived', 0),
+            'average_completion': agg.completion_sum / agg.total if agg.total else 0.0,
+            'deals_by_status': dict(agg.by_status),
+            'deals_by_shariah_structure': dict(agg.by_shariah_structure),
+            'deals_by_jurisdiction': dict(agg.by_jurisdiction),
+            'certificates_issued': agg.certificates_issued,
+            'tokenized_deals': agg.tokenized_deals,
+        }
+
+    @classmethod
+    async def verify_aggregates(cls) -> dict:
+        """
+        Rebuild the stats counters from a full scan and report drift.
+
+        The rebuilt counters replace the incremental ones, so this also
+        repairs any drift (e.g. rows changed directly in the database).
+
+        Returns:
+            {
+                "consistent": bool,
+                "drift": {counter: {"incremental": ..., "rebuilt": ...}},
+                "checked_deals": int
+            }
+
+        Example:
+            >>> report = await DealStorage.verify_aggregates()
+            >>> if not report['consistent']:
+            ...     print(report['drift'])
+        """
+        deals = await cls.get_all_deals()
+        rebuilt = DealAggregates()
+        rebuilt.rebuild(deals)
+
+        current = cls._aggregates.to_dict()
+        expected = rebuilt.to_dict()
+
+        drift = {}
+        for name, value in expected.items():
+            if name == 'completion_sum':
+                # Float sums accumulate rounding error; only report real drift
+                if abs(current[name] - value) < 1e-6:
+                    continue
+            elif current[name] == value:
+                continue
+            drift[name] = {'incremental': current[name], 'rebuilt': value}
+
+        if drift:
+            logger.warning(f"⚠️ Deal stats drift detected and repaired: {sorted(drift)}")
+
+        cls._aggregates = rebuilt
 
         return {
-            'total_deals': len(all_deals),
-            'active_deals': len([d for d in all_deals if d.status == 'active']),
-            'completed_deals': len([d for d in all_deals if d.status == 'completed']),
-            'draft_deals': len([d for d in all_deals if d.status == 'draft']),
-            'archived_deals': len([d for d in all_deals if d.status == 'archived']),
-            'average_completion': sum(d.overall_completion or 0 for d in all_deals) / len(all_deals) if all_deals else 0.0
+            'consistent': not drift,
+            'drift': drift,
+            'checked_deals': len(deals),
         }
 
 
@@ -243,7 +555,7 @@ class DealStorage:
 # MOCK DATA FOR DEVELOPMENT
 # =============================================================================
 
-def seed_mock_deals():
+async def seed_mock_deals():
     """
     Seed storage with mock deals for testing/demo purposes.
 
@@ -252,16 +564,16 @@ def seed_mock_deals():
 
     Example:
         >>> from app.services.deal_storage import seed_mock_deals
-        >>> seed_mock_deals()
-        >>> deals = DealStorage.get_all_deals()
+        >>> await seed_mock_deals()
+        >>> deals = await DealStorage.get_all_deals()
         >>> print(f"Seeded {len(deals)} mock deals")
     """
     # Clear existing data first
-    DealStorage.clear_all()
+    await DealStorage.clear_all()
 
     # Create deals with digital asset data
     # Deal 1: QIIB Oryx - Complete with certificate and token
-    deal1 = DealStorage.create_deal(DealCreate(
+    deal1 = await DealStorage.create_deal(DealCreate(
         deal_name="QIIB Oryx Fund - Phase 1 (Green Sukuk Ijara)",
         shariah_structure="wakala",
         jurisdiction="qatar_qfc",
@@ -273,7 +585,7 @@ def seed_mock_deals():
         guardian_policy_id="policy_qfc_wakala_v1",
         guardian_transaction_id="0.0.123456@1730707200.0"
     ))
-    DealStorage.update_deal(deal1.deal_id, {
+    await DealStorage.update_deal(deal1.deal_id, {
         "has_certificate": True,
         "certificate_id": "GC-2024-001-QIIB-ORYX",
         "certificate_status": "issued",
@@ -286,7 +598,7 @@ def seed_mock_deals():
     })
 
     # Deal 2: Dubai Islamic Bank - Complete with certificate and token
-    deal2 = DealStorage.create_deal(DealCreate(
+    deal2 = await DealStorage.create_deal(DealCreate(
         deal_name="Dubai Islamic Bank Murabaha Facility",
         shariah_structure="murabaha",
         jurisdiction="uae_difc",
@@ -298,7 +610,7 @@ def seed_mock_deals():
         guardian_policy_id="policy_difc_murabaha_v1",
         guardian_transaction_id="0.0.789012@1730793600.0"
     ))
-    DealStorage.update_deal(deal2.deal_id, {
+    await DealStorage.update_deal(deal2.deal_id, {
         "has_certificate": True,
         "certificate_id": "GC-2024-002-DIB-MURABAHA",
         "certificate_status": "issued",
@@ -311,7 +623,7 @@ def seed_mock_deals():
     })
 
     # Deal 3: Abu Dhabi Sovereign - Complete with certificate and token
-    deal3 = DealStorage.create_deal(DealCreate(
+    deal3 = await DealStorage.create_deal(DealCreate(
         deal_name="Abu Dhabi Sovereign Wakala (Infrastructure)",
         shariah_structure="wakala",
         jurisdiction="uae_adgm",
@@ -323,7 +635,7 @@ def seed_mock_deals():
         guardian_policy_id="policy_adgm_wakala_v1",
         guardian_transaction_id="0.0.234567@1730880000.0"
     ))
-    DealStorage.update_deal(deal3.deal_id, {
+    await DealStorage.update_deal(deal3.deal_id, {
         "has_certificate": True,
         "certificate_id": "GC-2024-003-ADGOV-WAKALA",
         "certificate_status": "issued",
@@ -336,7 +648,7 @@ def seed_mock_deals():
     })
 
     # Deal 4: Saudi Aramco - Certificate only (not tokenized yet)
-    deal4 = DealStorage.create_deal(DealCreate(
+    deal4 = await DealStorage.create_deal(DealCreate(
         deal_name="Saudi Aramco Green Sukuk Istisna",
         shariah_structure="istisna",
         jurisdiction="saudi_cma",
@@ -348,7 +660,7 @@ def seed_mock_deals():
         guardian_policy_id="policy_cma_istisna_v1",
         guardian_transaction_id="0.0.345678@1730966400.0"
     ))
-    DealStorage.update_deal(deal4.deal_id, {
+    await DealStorage.update_deal(deal4.deal_id, {
         "has_certificate": True,
         "certificate_id": "GC-2024-004-ARAMCO-ISTISNA",
         "certificate_status": "issued",
@@ -356,7 +668,7 @@ def seed_mock_deals():
     })
 
     # Deal 5: Malaysia - Complete with certificate and token
-    deal5 = DealStorage.create_deal(DealCreate(
+    deal5 = await DealStorage.create_deal(DealCreate(
         deal_name="Malaysia Sustainable Sukuk Musharaka",
         shariah_structure="musharaka",
         jurisdiction="malaysia_sc",
@@ -368,7 +680,7 @@ def seed_mock_deals():
         guardian_policy_id="policy_malaysia_musharaka_v1",
         guardian_transaction_id="0.0.456789@1731052800.0"
     ))
-    DealStorage.update_deal(deal5.deal_id, {
+    await DealStorage.update_deal(deal5.deal_id, {
         "has_certificate": True,
         "certificate_id": "GC-2024-005-MYS-MUSHARAKA",
         "certificate_status": "issued",
@@ -381,7 +693,7 @@ def seed_mock_deals():
     })
 
     # Deal 6: Kuwait - Pending (no certificate or token yet)
-    deal6 = DealStorage.create_deal(DealCreate(
+    deal6 = await DealStorage.create_deal(DealCreate(
         deal_name="Kuwait Finance House Hybrid Sukuk",
         shariah_structure="hybrid",
         jurisdiction="kuwait_cma",
@@ -393,7 +705,7 @@ def seed_mock_deals():
         guardian_policy_id=None,
         guardian_transaction_id=None
     ))
-    DealStorage.update_deal(deal6.deal_id, {
+    await DealStorage.update_deal(deal6.deal_id, {
         "status": "pending",
         "has_certificate": False,
         "has_token": False
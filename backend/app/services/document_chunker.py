@@ -0,0 +1,213 @@
+"""
+DOCUMENT CHUNKER
+================
+Splits parsed documents into stable, hash-identified chunks for Graphiti.
+
+WHY:
+- A whole AAOIFI standard sent as one add_episode body made a huge episode,
+  and any change to one page forced Graphiti to re-extract the entire
+  document
+- Re-ingest cost should be proportional to what changed
+
+CHUNKING:
+- Chunks never cross a page; within a page the text is split before AAOIFI
+  clause headings ("1. Scope", "2/2 The position of ...") and consecutive
+  sections are packed up to CHUNK_MAX_CHARS
+- Oversized sections are split at line breaks (hard split only for a single
+  line longer than CHUNK_MAX_CHARS)
+- A chunk's id is the SHA-1 of its text (the same hash as prov_text_sha1s),
+  so an edit changes only the chunks of the edited page/sections, and a
+  page inserted earlier in the document does not change later chunk ids
+
+MANIFEST:
+- CHUNK_MANIFEST_DIR/<group_id>/<document>.json maps chunk SHA-1 to the
+  Graphiti episode id (UUID when the MCP server returns one, else the
+  deterministic episode name) plus page and section, and keeps the
+  document's ingest metadata (file hash, provenance slots)
+- Ingestion sends only chunks missing from the manifest (see
+  GraphitiMCPService.ingest_chunks); chunks no longer in the document are
+  dropped from the manifest and their episodes deleted from the graph
+  ("superseded" keeps ids whose delete has not succeeded yet)
+
+CONFIGURATION:
+- CHUNK_MAX_CHARS (default 4000)
+- CHUNK_MANIFEST_DIR (default ./chunk_manifests)
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from app.services.parse_cache import ParsedDocument, text_sha1
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CHARS = int(os.getenv("CHUNK_MAX_CHARS", "4000"))
+DEFAULT_MANIFEST_DIR = os.getenv("CHUNK_MANIFEST_DIR", "./chunk_manifests")
+
+# Clause headings at line start: "3. Scope", "2/2 The position" (not "2/2/1 ...")
+SECTION_PATTERN = re.compile(r"^(\d{1,2}(?:/\d{1,2})?)\.?[ \t]+(?=[A-Z])", re.MULTILINE)
+
+
+class DocumentChunk(NamedTuple):
+    """One chunk of a document (page is 1-based, section is the clause number or "")"""
+    sha1: str
+    page: int
+    section: str
+    text: str
+
+    def episode_name(self, document_name: str, document_type: str) -> str:
+        """Deterministic Graphiti episode name"""
+        section = f" §{self.section}" if self.section else ""
+        return f"{document_type.upper()}: {document_name} p{self.page}{section} [{self.sha1[:12]}]"
+
+
+def _sections(text: str, section: str) -> List[Tuple[str, str]]:
+    """(section, text) pieces of a page, split before clause headings"""
+    pieces = []
+    start = 0
+    for match in SECTION_PATTERN.finditer(text):
+        if match.start() > start:
+            pieces.append((section, text[start:match.start()]))
+        section = match.group(1)
+        start = match.start()
+    pieces.append((section, text[start:]))
+    return pieces
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split text at line breaks into parts of at most max_chars"""
+    if len(text) <= max_chars:
+        return [text]
+    parts = []
+    current = ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) > max_chars:
+            parts.append(current)
+            current = ""
+        current += line
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_pages(pages: Iterable[Tuple[int, str]], max_chars: int = DEFAULT_MAX_CHARS) -> List[DocumentChunk]:
+    """
+    Chunks of (page number, text) pages in order.
+
+    Args:
+        pages: Page texts in page order
+        max_chars: Largest chunk
+
+    Returns:
+        Non-blank chunks in document order
+    """
+    chunks: List[DocumentChunk] = []
+    section = ""
+
+    for page, text in pages:
+        packed: List[Tuple[str, str]] = []  # (section of first piece, text)
+        for piece_section, piece in _sections(text, section):
+            section = piece_section
+            for part in _split_long(piece, max_chars):
+                if packed and len(packed[-1][1]) + len(part) <= max_chars:
+                    packed[-1] = (packed[-1][0], packed[-1][1] + part)
+                else:
+                    packed.append((piece_section, part))
+
+        for chunk_section, chunk_text in packed:
+            chunk_text = chunk_text.strip()
+            if chunk_text:
+                chunks.append(DocumentChunk(text_sha1(chunk_text), page, chunk_section, chunk_text))
+
+    return chunks
+
+
+def chunk_document(parsed: ParsedDocument, max_chars: int = DEFAULT_MAX_CHARS) -> List[DocumentChunk]:
+    """Chunks of a parsed document (see chunk_pages)"""
+    return chunk_pages(parsed.iter_pages(), max_chars)
+
+
+# ============================================================================
+# MANIFEST
+# ============================================================================
+
+class ChunkManifest:
+    """
+    Chunk SHA-1 -> episode id for one ingested document.
+
+    Usage:
+        manifest = ChunkManifest.load(group_id, document_name)
+        new = [chunk for chunk in chunks if chunk.sha1 not in manifest.episodes]
+        ...
+        manifest.record(chunk, episode_id)
+        manifest.save()
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        document: str,
+        group_id: str,
+        episodes: Optional[Dict[str, Dict[str, Any]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        superseded: Optional[List[str]] = None
+    ):
+        self.path = path
+        self.document = document
+        self.group_id = group_id
+        self.episodes: Dict[str, Dict[str, Any]] = episodes or {}
+        self.metadata: Dict[str, Any] = metadata or {}
+        # Episode ids of dropped chunks still to be deleted from the graph
+        self.superseded: List[str] = superseded or []
+
+    @classmethod
+    def load(cls, group_id: str, document_name: str, directory: str = DEFAULT_MANIFEST_DIR) -> "ChunkManifest":
+        """Manifest of a document (empty if never ingested)"""
+        path = Path(directory) / group_id / f"{Path(document_name).name}.json"
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            data = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Chunk manifest {path} unreadable ({e}), re-ingesting all chunks")
+            data = {}
+        return cls(path, document_name, group_id, data.get("episodes"), data.get("metadata"), data.get("superseded"))
+
+    def episode_id(self, sha1: str) -> Optional[str]:
+        entry = self.episodes.get(sha1)
+        return entry["episode"] if entry else None
+
+    def record(self, chunk: DocumentChunk, episode_id: str) -> None:
+        self.episodes[chunk.sha1] = {"episode": episode_id, "page": chunk.page, "section": chunk.section}
+
+    def prune(self, keep: Iterable[str]) -> List[str]:
+        """Drop chunks not in keep; returns the dropped episode ids"""
+        keep = set(keep)
+        stale = [sha1 for sha1 in self.episodes if sha1 not in keep]
+        return [self.episodes.pop(sha1)["episode"] for sha1 in stale]
+
+    def save(self) -> None:
+        """Write atomically (temp file + rename)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "document": self.document,
+            "group_id": self.group_id,
+            "updated_at": time.time(),
+            "metadata": self.metadata,
+            "episodes": self.episodes,
+            "superseded": self.superseded,
+        }
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.path)
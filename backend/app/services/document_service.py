@@ -4,8 +4,16 @@ DOCUMENT SERVICE
 Handles document parsing, ingestion, and generation.
 
 FEATURES:
-- PDF parsing with LlamaParse (intelligent) + PyPDF2 (fallback)
+- PDF parsing with LlamaParse (intelligent) + PyPDF2 (fallback, parallel
+  page extraction in a process pool - see pdf_extraction.py)
 - DOCX parsing with python-docx
+- Parse results cached by file SHA-256 and parser version (parse_cache.py);
+  re-ingesting an unchanged file skips parsing
+- Ingestion in page/section chunks; only new or changed chunks are sent to
+  Graphiti (document_chunker.py)
+- Uploads streamed to disk in UPLOAD_CHUNK_BYTES chunks and hashed on the
+  way (save_upload_stream); PyPDF2 reads the saved file through a memory
+  map, so memory per upload does not grow with file size
 - Document ingestion into Graphiti knowledge graph
 - PDF/DOCX/Markdown generation via Pandoc
 
@@ -16,9 +24,13 @@ WHY THIS APPROACH:
 - Pandoc for professional document generation
 """
 
+import asyncio
+import hashlib
 import logging
 import os
-from typing import Optional, List, Dict, Any
+import time
+import uuid
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple
 from pathlib import Path
 import aiofiles
 from datetime import datetime
@@ -31,20 +43,32 @@ except ImportError:
     LLAMAPARSE_AVAILABLE = False
     logging.warning("LlamaParse not available, will use PyPDF2 only")
 
-from PyPDF2 import PdfReader
+from PyPDF2 import __version__ as PYPDF2_VERSION
 
 # DOCX parsing
+import docx
 from docx import Document
 
 # Document generation
 import pypandoc
 
+from app.services.document_chunker import chunk_document
+from app.services.parse_cache import ParseCache, ParsedDocument, get_parse_cache, hash_file
+from app.services.pdf_extraction import PdfExtractor, PdfPage, get_pdf_extractor, page_marker
+
 # Graphiti integration via MCP
 from app.services.graphiti_mcp_service import get_graphiti_mcp_service  # NEW: Using MCP
 from app.models import UploadedDocument
 
 logger = logging.getLogger(__name__)
 
+# Parser versions (part of the parse cache key)
+LLAMAPARSE_PARSER = "llamaparse-markdown"
+PYPDF2_PARSER = f"pypdf2-{PYPDF2_VERSION}"
+DOCX_PARSER = f"python-docx-{getattr(docx, '__version__', 'unknown')}"
+
+DEFAULT_UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
 
 class DocumentService:
     """Service for document parsing, ingestion, and generation."""
@@ -53,7 +77,9 @@ class DocumentService:
         self,
         llamaparse_api_key: Optional[str] = None,
         upload_dir: str = "./uploads",
-        output_dir: str = "./outputs"
+        output_dir: str = "./outputs",
+        pdf_extractor: Optional[PdfExtractor] = None,
+        parse_cache: Optional[ParseCache] = None
     ):
         """
         Initialize DocumentService.
@@ -62,7 +88,11 @@ class DocumentService:
             llamaparse_api_key: LlamaParse API key (optional, falls back to PyPDF2)
             upload_dir: Directory for uploaded documents
             output_dir: Directory for generated documents
+            pdf_extractor: PyPDF2 extraction engine (defaults to the shared pool)
+            parse_cache: Cache of parsed documents (defaults to the shared cache)
         """
+        self.pdf_extractor = pdf_extractor or get_pdf_extractor()
+        self.parse_cache = parse_cache or get_parse_cache()
         self.upload_dir = Path(upload_dir)
         self.output_dir = Path(output_dir)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
@@ -84,6 +114,43 @@ class DocumentService:
         else:
             logger.info("ℹ️ LlamaParse not configured, using PyPDF2 for PDF parsing")
 
+    async def parse(self, file_path: Path, file_sha256: Optional[str] = None) -> ParsedDocument:
+        """
+        Parse a PDF or DOCX file, reusing the cached parse of identical content.
+
+        Args:
+            file_path: Path to document file
+            file_sha256: SHA-256 of the file if already known (hashed otherwise)
+
+        Returns:
+            ParsedDocument with text, page offsets and page text hashes
+        """
+        suffix = file_path.suffix.lower()
+        if suffix == ".pdf":
+            parser = LLAMAPARSE_PARSER if self.llamaparse else PYPDF2_PARSER
+        elif suffix in [".docx", ".doc"]:
+            parser = DOCX_PARSER
+        else:
+            raise ValueError(f"Unsupported file type: {suffix}")
+
+        if file_sha256 is None:
+            file_sha256 = await asyncio.to_thread(hash_file, file_path)
+
+        parsed = await self.parse_cache.get(file_sha256, parser)
+        if parsed is None:
+            started = time.perf_counter()
+            if suffix == ".pdf":
+                parsed = await self._parse_pdf(file_path, file_sha256)
+            else:
+                parsed = await self._parse_docx(file_path, file_sha256)
+            if not parsed.cached:
+                parsed.parse_seconds = time.perf_counter() - started
+                await self.parse_cache.put(parsed)
+
+        if parsed.cached:
+            logger.info(f"♻️ Parse cache hit: {file_path.name} ({parsed.parser}, {len(parsed.text)} characters)")
+        return parsed
+
     async def parse_pdf(self, file_path: Path) -> str:
         """
         Parse PDF file using LlamaParse (preferred) or PyPDF2 (fallback).
@@ -94,35 +161,59 @@ class DocumentService:
         Returns:
             Extracted text content
         """
+        return (await self.parse(file_path)).text
+
+    async def _parse_pdf(self, file_path: Path, file_sha256: str) -> ParsedDocument:
         # Try LlamaParse first (better for complex AAOIFI documents)
         if self.llamaparse:
             try:
                 logger.info(f"📄 Parsing PDF with LlamaParse: {file_path.name}")
                 documents = await self.llamaparse.aload_data(str(file_path))
 
-                # Combine all document chunks
-                text = "\n\n".join([doc.text for doc in documents])
-                logger.info(f"✅ LlamaParse extracted {len(text)} characters from {file_path.name}")
-                return text
+                # Combine all document chunks (one per page)
+                parsed = ParsedDocument.from_pages(
+                    file_sha256,
+                    LLAMAPARSE_PARSER,
+                    enumerate((doc.text for doc in documents), start=1),
+                    separator="\n\n"
+                )
+                logger.info(f"✅ LlamaParse extracted {len(parsed.text)} characters from {file_path.name}")
+                return parsed
             except Exception as e:
                 logger.warning(f"⚠️ LlamaParse failed for {file_path.name}: {e}, falling back to PyPDF2")
 
-        # Fallback to PyPDF2
+            cached = await self.parse_cache.get(file_sha256, PYPDF2_PARSER)
+            if cached is not None:
+                return cached
+
+        # Fallback to PyPDF2 (pages extracted in parallel, off the event loop)
         try:
             logger.info(f"📄 Parsing PDF with PyPDF2: {file_path.name}")
-            reader = PdfReader(str(file_path))
-            text = ""
-
-            for page_num, page in enumerate(reader.pages):
-                page_text = page.extract_text()
-                text += f"\n\n--- Page {page_num + 1} ---\n\n{page_text}"
+            pages = [page async for page in self.iter_pdf_pages(file_path)]
+            parsed = ParsedDocument.from_pages(file_sha256, PYPDF2_PARSER, pages, marker=page_marker)
 
-            logger.info(f"✅ PyPDF2 extracted {len(text)} characters from {file_path.name}")
-            return text
+            logger.info(f"✅ PyPDF2 extracted {len(parsed.text)} characters from {file_path.name}")
+            return parsed
         except Exception as e:
             logger.error(f"❌ PDF parsing failed for {file_path.name}: {e}")
             raise
 
+    async def iter_pdf_pages(self, file_path: Path) -> AsyncIterator[PdfPage]:
+        """
+        Stream PDF pages (PyPDF2) in order as they are extracted.
+
+        Lets chunking/ingestion start on the first pages while later pages
+        are still being extracted by the process pool.
+
+        Args:
+            file_path: Path to PDF file
+
+        Yields:
+            PdfPage(number, text) in page order
+        """
+        async for page in self.pdf_extractor.iter_pages(file_path):
+            yield page
+
     async def parse_docx(self, file_path: Path) -> str:
         """
         Parse DOCX file using python-docx.
@@ -133,6 +224,9 @@ class DocumentService:
         Returns:
             Extracted text content
         """
+        return (await self.parse(file_path)).text
+
+    async def _parse_docx(self, file_path: Path, file_sha256: str) -> ParsedDocument:
         try:
             logger.info(f"📄 Parsing DOCX: {file_path.name}")
             doc = Document(str(file_path))
@@ -141,7 +235,7 @@ class DocumentService:
             text = "\n\n".join([paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip()])
 
             logger.info(f"✅ Extracted {len(text)} characters from {file_path.name}")
-            return text
+            return ParsedDocument(file_sha256, DOCX_PARSER, text, [])
         except Exception as e:
             logger.error(f"❌ DOCX parsing failed for {file_path.name}: {e}")
             raise
@@ -150,7 +244,8 @@ class DocumentService:
         self,
         file_path: Path,
         document_type: str = "aaoifi",
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        file_sha256: Optional[str] = None
     ) -> UploadedDocument:
         """
         Parse document and ingest into Graphiti knowledge graph.
@@ -159,39 +254,42 @@ class DocumentService:
             file_path: Path to document file
             document_type: Type of document (aaoifi, context, etc.)
             metadata: Additional metadata to store
+            file_sha256: SHA-256 of the file if already known
 
         Returns:
             UploadedDocument with ingestion details
         """
         try:
-            # Determine file type and parse
+            # Parse (or reuse the cached parse of identical content)
             suffix = file_path.suffix.lower()
+            parsed = await self.parse(file_path, file_sha256)
+            text = parsed.text
 
-            if suffix == ".pdf":
-                text = await self.parse_pdf(file_path)
-            elif suffix in [".docx", ".doc"]:
-                text = await self.parse_docx(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {suffix}")
-
-            # Prepare metadata
+            # Prepare metadata (provenance slots as in ProvenanceFields)
             doc_metadata = {
                 "filename": file_path.name,
                 "file_type": suffix,
                 "document_type": document_type,
                 "uploaded_at": datetime.now().isoformat(),
                 "file_size": file_path.stat().st_size,
+                "file_sha256": parsed.file_sha256,
+                "parser": parsed.parser,
+                "parse_cached": parsed.cached,
+                "prov_file_ids": [file_path.name],
+                **parsed.provenance(),
                 **(metadata or {})
             }
 
-            # Ingest into Graphiti via MCP
+            # Ingest new/changed chunks into Graphiti via MCP
+            chunks = chunk_document(parsed)
             graphiti_mcp_service = get_graphiti_mcp_service()
-            episode_id = await graphiti_mcp_service.ingest_document(
-                content=text,
+            result = await graphiti_mcp_service.ingest_chunks(
+                chunks,
                 document_name=file_path.name,
                 document_type=document_type,
                 metadata=doc_metadata
             )
+            episode_id = result["episode_ids"][0] if result["episode_ids"] else file_path.name
 
             # Create UploadedDocument response
             uploaded_doc = UploadedDocument(
@@ -202,7 +300,9 @@ class DocumentService:
                 uploaded_at=datetime.now(),
                 parsed=True,
                 episode_id=episode_id,
-                content_preview=text[:500] + "..." if len(text) > 500 else text  # Preview
+                content_preview=text[:500] + "..." if len(text) > 500 else text,  # Preview
+                chunk_count=result["chunks"],
+                chunks_added=result["added"]
             )
 
             logger.info(f"✅ Document ingested: {file_path.name} → Episode {episode_id}")
@@ -231,6 +331,49 @@ class DocumentService:
         logger.info(f"💾 Saved upload: {filename} ({len(file_content)} bytes)")
         return file_path
 
+    async def save_upload_stream(
+        self,
+        upload: Any,
+        filename: str,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_BYTES
+    ) -> Tuple[Path, str, int]:
+        """
+        Stream an upload to disk in fixed-size chunks, hashing it on the way.
+
+        Only one chunk is held in memory whatever the file size; the file is
+        written under a temporary name and renamed once complete, so a
+        failed upload never leaves a truncated file behind.
+
+        Args:
+            upload: Async file object with read(size), e.g. FastAPI UploadFile
+            filename: Original filename
+            chunk_size: Bytes read and written per step
+
+        Returns:
+            (path to saved file, SHA-256 hex digest, size in bytes)
+        """
+        file_path = self.upload_dir / Path(filename).name
+        tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+
+        try:
+            async with aiofiles.open(tmp_path, "wb") as f:
+                while True:
+                    block = await upload.read(chunk_size)
+                    if not block:
+                        break
+                    digest.update(block)
+                    size += len(block)
+                    await f.write(block)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+        logger.info(f"💾 Saved upload: {file_path.name} ({size} bytes, streamed)")
+        return file_path, digest.hexdigest(), size
+
     async def generate_document(
         self,
         content: str,
@@ -0,0 +1,289 @@
+"""
+EXECUTION RUNNER
+================
+Background worker pool for workflow executions.
+
+WHY:
+- Executions used to run only while a client held GET /workflows/{id}/stream
+  open: no headless or batch runs (e.g. screening 500 sukuk), no queueing,
+  no cap on concurrent Claude streams
+- One tenant's batch must not starve interactive executions of others
+
+DESIGN:
+- POST /workflows/execute submits the execution; a fixed pool of asyncio
+  workers (EXECUTION_WORKERS) runs it to completion whether or not anyone
+  is watching
+- Each job is a StreamHub live stream created at submit time, so stream
+  subscribers attach while it is queued and follow it once it runs
+- Queue order: priority (critical, high, medium, low - same ranks as
+  tasks), then submission order
+- A worker takes the first queued job whose tenant is below its concurrency
+  limit; jobs of saturated tenants wait without blocking other tenants
+- Submissions beyond EXECUTION_QUEUE_LIMIT are rejected (QueueFullError,
+  HTTP 429) instead of growing the queue without bound
+- stop() returns the keys of queued and running jobs it abandoned, so the
+  caller can mark them finished in shared state (nothing resumes them)
+
+CONFIGURATION:
+- EXECUTION_WORKERS (default 8 concurrent executions)
+- EXECUTION_TENANT_LIMIT (default 4 concurrent executions per tenant)
+- EXECUTION_TENANT_LIMITS per-tenant overrides, e.g. "acme=16,demo=1"
+- EXECUTION_QUEUE_LIMIT (default 1000 queued executions)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.services.stream_hub import LiveStream, StreamHub, get_stream_hub
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+DEFAULT_WORKERS = int(os.getenv("EXECUTION_WORKERS", "8"))
+DEFAULT_TENANT_LIMIT = int(os.getenv("EXECUTION_TENANT_LIMIT", "4"))
+DEFAULT_QUEUE_LIMIT = int(os.getenv("EXECUTION_QUEUE_LIMIT", "1000"))
+
+# Recent queue waits kept for get_stats()
+WAIT_WINDOW = 256
+
+
+def parse_tenant_limits(value: Optional[str]) -> Dict[str, int]:
+    """Per-tenant limits from "tenant=limit,tenant=limit" """
+    limits = {}
+    for item in (value or "").split(","):
+        tenant, _, limit = item.partition("=")
+        if tenant.strip() and limit.strip().isdigit():
+            limits[tenant.strip()] = int(limit)
+    return limits
+
+
+class QueueFullError(Exception):
+    """Raised when the execution queue is at EXECUTION_QUEUE_LIMIT"""
+
+
+class _Job:
+    __slots__ = ("live", "produce", "tenant_id", "priority", "queued_at")
+
+    def __init__(self, live: LiveStream, produce, tenant_id: str, priority: str):
+        self.live = live
+        self.produce = produce
+        self.tenant_id = tenant_id
+        self.priority = priority
+        self.queued_at = time.monotonic()
+
+
+class ExecutionRunner:
+    """
+    Bounded worker pool with priority queue and per-tenant limits.
+
+    Usage:
+        runner = get_execution_runner()
+        live = runner.submit(execution_id, produce, tenant_id="acme", priority="high")
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        tenant_limit: int = DEFAULT_TENANT_LIMIT,
+        tenant_limits: Optional[Dict[str, int]] = None,
+        queue_limit: int = DEFAULT_QUEUE_LIMIT,
+        hub: Optional[StreamHub] = None
+    ):
+        """
+        Initialize execution runner (workers start on start() or first submit).
+
+        Args:
+            workers: Concurrent executions across all tenants
+            tenant_limit: Concurrent executions per tenant
+            tenant_limits: Per-tenant overrides of tenant_limit
+            queue_limit: Maximum queued (not yet running) executions
+            hub: Stream hub the executions publish to
+        """
+        self.workers = workers
+        self.tenant_limit = tenant_limit
+        self.tenant_limits = tenant_limits if tenant_limits is not None else parse_tenant_limits(
+            os.getenv("EXECUTION_TENANT_LIMITS")
+        )
+        self.queue_limit = queue_limit
+        self.hub = hub or get_stream_hub()
+
+        self._queue: List[Tuple[int, int, _Job]] = []  # heap of (rank, seq, job)
+        self._seq = itertools.count()
+        self._changed = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.running: Dict[str, int] = defaultdict(int)
+        self._running_keys: Set[str] = set()
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_ms: deque = deque(maxlen=WAIT_WINDOW)
+
+    def limit_for(self, tenant_id: str) -> int:
+        return self.tenant_limits.get(tenant_id, self.tenant_limit)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start the worker pool (called from app lifespan)"""
+        self._start_workers()
+
+    def _start_workers(self) -> None:
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(
+            f"✅ Execution runner started: {self.workers} workers, "
+            f"{self.tenant_limit} per tenant, queue limit {self.queue_limit}"
+        )
+
+    async def stop(self) -> List[str]:
+        """
+        Cancel workers (running executions end with an error event) and drop
+        the queue.
+
+        Returns:
+            Keys of the running and queued jobs that will never finish
+        """
+        abandoned = list(self._running_keys) + [job.live.key for _, _, job in sorted(self._queue)]
+        self._queue.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if abandoned:
+            logger.warning(f"⚠️ Execution runner stopped with {len(abandoned)} unfinished executions")
+        return abandoned
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def submit(
+        self,
+        key: str,
+        produce: Callable[[LiveStream], Awaitable[None]],
+        tenant_id: str = "default",
+        priority: str = "medium",
+        base_offset: int = 0
+    ) -> LiveStream:
+        """
+        Queue an execution.
+
+        Args:
+            key: Execution ID (stream hub key)
+            produce: Coroutine that runs the execution into its LiveStream
+            tenant_id: Tenant whose concurrency limit applies
+            priority: low, medium, high or critical
+            base_offset: Offset of the first character produced
+
+        Returns:
+            LiveStream viewers can attach to right away
+
+        Raises:
+            QueueFullError: If EXECUTION_QUEUE_LIMIT executions are queued
+            ValueError: If priority is unknown
+            RuntimeError: If the execution is already queued or running
+        """
+        if priority not in PRIORITY_ORDER:
+            raise ValueError(f"Unknown priority: {priority}. Must be one of {list(PRIORITY_ORDER)}")
+        if len(self._queue) >= self.queue_limit:
+            self.rejected += 1
+            raise QueueFullError(f"Execution queue full ({self.queue_limit} queued)")
+
+        live = self.hub.create(key, base_offset)
+        heapq.heappush(self._queue, (PRIORITY_ORDER[priority], next(self._seq), _Job(live, produce, tenant_id, priority)))
+        self.submitted += 1
+        self._start_workers()
+        self._changed.set()
+        logger.info(f"➕ Execution {key} queued (tenant {tenant_id}, priority {priority}, {len(self._queue)} queued)")
+        return live
+
+    def _pop_eligible(self) -> Optional[_Job]:
+        """Highest-priority queued job whose tenant has a free slot"""
+        skipped = []
+        job = None
+        while self._queue:
+            entry = heapq.heappop(self._queue)
+            if self.running[entry[2].tenant_id] < self.limit_for(entry[2].tenant_id):
+                job = entry[2]
+                break
+            skipped.append(entry)
+        for entry in skipped:
+            heapq.heappush(self._queue, entry)
+        return job
+
+    async def _next_job(self) -> _Job:
+        while True:
+            self._changed.clear()
+            job = self._pop_eligible()
+            if job is not None:
+                return job
+            await self._changed.wait()
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            job = await self._next_job()
+            self.running[job.tenant_id] += 1
+            self._running_keys.add(job.live.key)
+            self.wait_ms.append((time.monotonic() - job.queued_at) * 1000)
+            try:
+                await self.hub.run(job.live, job.produce)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # hub.run already turned producer errors into error events
+                logger.error(f"❌ Execution worker {number} failed on {job.live.key}: {e}")
+            finally:
+                self._running_keys.discard(job.live.key)
+                self.running[job.tenant_id] -= 1
+                if not self.running[job.tenant_id]:
+                    del self.running[job.tenant_id]
+                self.completed += 1
+                # A tenant slot is free - queued jobs of that tenant may run now
+                self._changed.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue, concurrency and wait metrics for monitoring"""
+        queued: Dict[str, int] = defaultdict(int)
+        for _, _, job in self._queue:
+            queued[job.priority] += 1
+        waits = sorted(self.wait_ms)
+        return {
+            "workers": self.workers,
+            "tenant_limit": self.tenant_limit,
+            "queued": len(self._queue),
+            "queued_by_priority": dict(queued),
+            "running": sum(self.running.values()),
+            "running_by_tenant": dict(self.running),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_p50_ms": round(waits[len(waits) // 2], 1) if waits else None,
+            "wait_max_ms": round(waits[-1], 1) if waits else None,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_execution_runner: Optional[ExecutionRunner] = None
+
+
+def get_execution_runner() -> ExecutionRunner:
+    """Get or create execution runner singleton"""
+    global _execution_runner
+    if _execution_runner is None:
+        _execution_runner = ExecutionRunner()
+    return _execution_runner
@@ -0,0 +1,234 @@
+"""
+GRAPHITI CONTEXT BUILDER
+========================
+Turns knowledge-graph search results into the markdown context block sent
+to Claude, memoizing the formatted output.
+
+WHY:
+- Every workflow execution and session stream formats the same kind of
+  block: high-relevance facts, the template's required standards, top
+  related entities and a quality footer
+- Executions of the same template with the same search results produce
+  identical blocks, so they are built once and reused (across executions
+  and sessions)
+
+KEYING:
+- Fingerprint of the search-result fields the block uses (facts, relevance,
+  top entities, confidence) + the template's required_standards
+
+USAGE:
+    context = await get_graphiti_context(
+        context_text=execution.context_text,
+        user_notes=execution.user_notes,
+        required_standards=template.required_standards
+    )
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from app.services.graphiti_mcp_service import get_graphiti_mcp_service
+
+logger = logging.getLogger(__name__)
+
+# Searched when neither context text nor notes are provided
+DEFAULT_CONTEXT_QUERY = "Islamic finance compliance requirements"
+
+# Knowledge-graph namespaces searched for workflow context
+CONTEXT_GROUP_IDS = ["aaoifi-documents", "context-documents"]
+CONTEXT_NUM_RESULTS = 10
+
+# Facts at or above this relevance are included (top 5)
+HIGH_RELEVANCE = 0.7
+MAX_FACTS = 5
+MAX_ENTITIES = 3
+
+MAX_CACHED_BLOCKS = 128
+
+
+def build_search_query(context_text: Optional[str], user_notes: Optional[Dict[str, str]]) -> str:
+    """Build the knowledge-graph query from context text and user notes"""
+    search_parts = []
+    if context_text:
+        search_parts.append(context_text[:300])
+    if user_notes:
+        search_parts.extend(user_notes.values())
+
+    search_query = " ".join(search_parts)
+    if not search_query.strip():
+        search_query = DEFAULT_CONTEXT_QUERY
+    return search_query
+
+
+def fingerprint_results(results: Dict[str, Any]) -> str:
+    """Hash of the search-result fields that affect the formatted block"""
+    facts = results.get('facts') or []
+    entities = (results.get('entities') or [])[:MAX_ENTITIES]
+    material = {
+        'facts': [(f.get('fact', ''), f.get('relevance', 0)) for f in facts],
+        'entities': [(e.get('name', ''), e.get('summary', '')) for e in entities],
+        'confidence': results.get('confidence', 'low'),
+    }
+    return hashlib.sha1(
+        json.dumps(material, separators=(',', ':'), default=str).encode()
+    ).hexdigest()
+
+
+def format_graphiti_context(
+    results: Dict[str, Any],
+    required_standards: Optional[List[str]] = None
+) -> str:
+    """
+    Format search results into the markdown context block (uncached).
+
+    Args:
+        results: Graphiti search response (facts, entities, confidence)
+        required_standards: Template's required AAOIFI standards
+
+    Returns:
+        Markdown context string
+    """
+    context_parts = []
+
+    # Section 1: Key Facts (from enhanced search)
+    if results.get('facts'):
+        context_parts.append("## AAOIFI Standards and Compliance Requirements\n")
+
+        # Group facts by relevance
+        high_relevance = [f for f in results['facts'] if f.get('relevance', 0) >= HIGH_RELEVANCE]
+
+        if high_relevance:
+            for i, fact_data in enumerate(high_relevance[:MAX_FACTS], 1):
+                fact_text = fact_data.get('fact', '')
+                relevance = fact_data.get('relevance', 0)
+                context_parts.append(
+                    f"{i}. [{relevance*100:.0f}% relevant] {fact_text}"
+                )
+            context_parts.append("")  # Blank line
+
+    # Section 2: Required Standards (if specified by template)
+    if required_standards:
+        context_parts.append("## Required Standards for This Workflow\n")
+        context_parts.append(f"You must reference and apply: {', '.join(required_standards)}")
+        context_parts.append("")
+
+    # Section 3: Related Entities (if available)
+    if results.get('entities') and len(results['entities']) > 0:
+        context_parts.append("## Related Entities\n")
+        for entity in results['entities'][:MAX_ENTITIES]:  # Top 3 entities
+            entity_name = entity.get('name', '')
+            entity_summary = entity.get('summary', '')
+            if entity_name:
+                context_parts.append(f"- **{entity_name}**: {entity_summary}")
+        context_parts.append("")
+
+    # Section 4: Context Quality Indicator
+    confidence = results.get('confidence', 'low')
+    fact_count = len(results.get('facts', []))
+
+    context_parts.append(f"---")
+    context_parts.append(
+        f"*Context quality: {confidence} ({fact_count} facts retrieved)*\n"
+    )
+
+    return "\n".join(context_parts)
+
+
+class GraphitiContextBuilder:
+    """LRU-memoized format_graphiti_context()"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_BLOCKS):
+        self.max_entries = max_entries
+        self._blocks: "OrderedDict[tuple[str, tuple[str, ...]], str]" = OrderedDict()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+
+    def build(
+        self,
+        results: Dict[str, Any],
+        required_standards: Optional[List[str]] = None
+    ) -> str:
+        """Formatted context block for these results and standards"""
+        key = (fingerprint_results(results), tuple(required_standards or ()))
+
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self.hits += 1
+            return block
+
+        self.misses += 1
+        block = format_graphiti_context(results, required_standards)
+        self._blocks[key] = block
+        if len(self._blocks) > self.max_entries:
+            self._blocks.popitem(last=False)
+        return block
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for monitoring"""
+        return {
+            "entries": len(self._blocks),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+async def get_graphiti_context(
+    context_text: Optional[str] = None,
+    user_notes: Optional[Dict[str, str]] = None,
+    required_standards: Optional[List[str]] = None
+) -> str:
+    """
+    Search the knowledge graph and return the formatted context block.
+
+    Shared by WorkflowEngine executions and session streams. Search results
+    and formatted blocks are both cached.
+
+    Returns:
+        Markdown context string ("" on failure - never breaks the workflow)
+    """
+    try:
+        search_query = build_search_query(context_text, user_notes)
+        logger.info(f"🔍 Searching Graphiti via MCP for context: '{search_query[:100]}...'")
+
+        results = await get_graphiti_mcp_service().search(
+            query_text=search_query,
+            group_ids=CONTEXT_GROUP_IDS,  # Match MCP group_id naming
+            num_results=CONTEXT_NUM_RESULTS
+        )
+
+        formatted_context = get_graphiti_context_builder().build(results, required_standards)
+
+        logger.info(
+            f"✅ Retrieved Graphiti context: {len(results.get('facts', []))} facts, "
+            f"{len(results.get('entities', []))} entities, "
+            f"confidence={results.get('confidence', 'low')}"
+        )
+
+        return formatted_context
+
+    except Exception as e:
+        logger.error(f"❌ Failed to retrieve Graphiti context: {e}")
+        # Return empty string on error - don't break the workflow
+        return ""
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_graphiti_context_builder: Optional[GraphitiContextBuilder] = None
+
+
+def get_graphiti_context_builder() -> GraphitiContextBuilder:
+    """Get or create context builder singleton"""
+    global _graphiti_context_builder
+    if _graphiti_context_builder is None:
+        _graphiti_context_builder = GraphitiContextBuilder()
+    return _graphiti_context_builder
@@ -12,34 +12,50 @@ MCP ARCHITECTURE:
 - blade-graphiti MCP server (uvx mcp-server-graphiti)
   ↓ Neo4j driver
 - Neo4j AuraDB database
+
+TOOL NAMES:
+- A direct session calls the server's own tool names (search, add_episode,
+  ...). The mcp__blade-graphiti__ prefix only exists inside Claude Agent SDK,
+  which namespaces tools per configured server.
+
+Used by GraphitiMCPService in direct mode (GRAPHITI_MCP_MODE=direct).
 """
 
 import os
 import json
 import logging
-from typing import List, Dict, Optional, Any, AsyncContextManager
-from contextlib import AsyncExitStack
+from typing import List, Dict, Optional, Any
 
 # MCP SDK for direct stdio communication
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+from mcp import StdioServerParameters
+
+from app.services.graphiti_mcp_pool import GraphitiMCPSessionPool
 
 logger = logging.getLogger(__name__)
 
+# blade-graphiti MCP server tool names
+TOOL_SEARCH = "search"
+TOOL_ADD_EPISODE = "add_episode"
+TOOL_ADD_EPISODES_BULK = "add_episodes_bulk"
+TOOL_GET_RECENT_NODES = "get_recent_nodes"
+TOOL_DELETE_EPISODE = "delete_episode"
+
 
 class GraphitiMCPClient:
     """
     Direct MCP client for blade-graphiti server.
 
     Uses mcp SDK stdio_client to communicate directly with the MCP server
-    via subprocess and JSON-RPC protocol.
+    via subprocess and JSON-RPC protocol. Tool calls are spread across a
+    pool of warm server processes (see graphiti_mcp_pool.py).
     """
 
     def __init__(
         self,
         neo4j_uri: Optional[str] = None,
         neo4j_user: Optional[str] = None,
-        neo4j_password: Optional[str] = None
+        neo4j_password: Optional[str] = None,
+        pool_size: Optional[int] = None
     ):
         """
         Initialize Graphiti MCP client.
@@ -48,6 +64,8 @@ class GraphitiMCPClient:
             neo4j_uri: Neo4j database URI
             neo4j_user: Neo4j username
             neo4j_password: Neo4j password
+            pool_size: MCP server processes to keep warm
+                (defaults to GRAPHITI_MCP_POOL_SIZE)
         """
         # Get Neo4j credentials from env if not provided
         self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI")
@@ -57,64 +75,50 @@ class GraphitiMCPClient:
         if not all([self.neo4j_uri, self.neo4j_user, self.neo4j_password]):
             raise ValueError("Neo4j credentials not configured")
 
-        # MCP session management
-        self.exit_stack = AsyncExitStack()
-        self.session: Optional[ClientSession] = None
+        # MCP session management (processes start on connect() / first call)
+        server_params = StdioServerParameters(
+            command="uvx",
+            args=["mcp-server-graphiti"],
+            env={
+                "NEO4J_URI": self.neo4j_uri,
+                "NEO4J_USER": self.neo4j_user,
+                "NEO4J_PASSWORD": self.neo4j_password
+            }
+        )
+        pool_kwargs = {"size": pool_size} if pool_size else {}
+        self.pool = GraphitiMCPSessionPool(server_params, **pool_kwargs)
 
         logger.info(f"✅ Graphiti MCP client initialized: {self.neo4j_uri}")
 
     async def connect(self):
-        """Connect to blade-graphiti MCP server via stdio"""
-        if self.session:
-            logger.warning("Already connected to MCP server")
-            return
-
+        """Start the pool of blade-graphiti MCP server processes"""
         try:
-            # Create server parameters
-            server_params = StdioServerParameters(
-                command="uvx",
-                args=["mcp-server-graphiti"],
-                env={
-                    "NEO4J_URI": self.neo4j_uri,
-                    "NEO4J_USER": self.neo4j_user,
-                    "NEO4J_PASSWORD": self.neo4j_password
-                }
-            )
-
-            # Connect via stdio
-            logger.info("🔌 Connecting to blade-graphiti MCP server...")
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(server_params)
-            )
-
-            stdio, write = stdio_transport
-
-            # Create client session
-            self.session = await self.exit_stack.enter_async_context(
-                ClientSession(stdio, write)
-            )
-
-            # Initialize session
-            await self.session.initialize()
-
-            # List available tools
-            response = await self.session.list_tools()
-            tool_names = [tool.name for tool in response.tools]
-
-            logger.info(f"✅ Connected to blade-graphiti MCP server")
-            logger.info(f"📦 Available tools: {', '.join(tool_names)}")
-
+            await self.pool.start()
         except Exception as e:
             logger.error(f"❌ Failed to connect to MCP server: {e}", exc_info=True)
             raise
 
     async def disconnect(self):
-        """Disconnect from MCP server"""
-        if self.session:
-            await self.exit_stack.aclose()
-            self.session = None
+        """Stop all MCP server processes"""
+        if self.pool.started:
+            await self.pool.stop()
             logger.info("👋 Disconnected from blade-graphiti MCP server")
 
+    async def _call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Call an MCP tool on a pooled session and parse its JSON result.
+
+        Returns:
+            Parsed response dict, or None if the server returned no text content
+        """
+        result = await self.pool.call_tool(tool_name, arguments)
+
+        if hasattr(result, 'content') and len(result.content) > 0:
+            content_item = result.content[0]
+            if hasattr(content_item, 'text'):
+                return json.loads(content_item.text)
+        return None
+
     async def search(
         self,
         query_text: str,
@@ -138,9 +142,6 @@ class GraphitiMCPClient:
                 "context": {...}
             }
         """
-        if not self.session:
-            await self.connect()
-
         try:
             # Build tool arguments
             arguments = {
@@ -153,18 +154,10 @@ class GraphitiMCPClient:
             logger.info(f"🔍 MCP Search: {query_text}")
 
             # Call MCP tool
-            result = await self.session.call_tool(
-                "mcp__blade-graphiti__search",
-                arguments=arguments
-            )
-
-            # Parse response
-            if hasattr(result, 'content') and len(result.content) > 0:
-                content_item = result.content[0]
-                if hasattr(content_item, 'text'):
-                    response_data = json.loads(content_item.text)
-                    logger.info(f"✅ MCP Search complete: {response_data.get('status', 'unknown')}")
-                    return response_data
+            response_data = await self._call_tool(TOOL_SEARCH, arguments)
+            if response_data is not None:
+                logger.info(f"✅ MCP Search complete: {response_data.get('status', 'unknown')}")
+                return response_data
 
             # Fallback
             return {
@@ -213,9 +206,6 @@ class GraphitiMCPClient:
                 "uuid": str
             }
         """
-        if not self.session:
-            await self.connect()
-
         try:
             # Build tool arguments
             arguments = {
@@ -232,18 +222,10 @@ class GraphitiMCPClient:
             logger.info(f"📝 MCP Add Episode: {name}")
 
             # Call MCP tool
-            result = await self.session.call_tool(
-                "mcp__blade-graphiti__add_episode",
-                arguments=arguments
-            )
-
-            # Parse response
-            if hasattr(result, 'content') and len(result.content) > 0:
-                content_item = result.content[0]
-                if hasattr(content_item, 'text'):
-                    response_data = json.loads(content_item.text)
-                    logger.info(f"✅ MCP Episode added: {name}")
-                    return response_data
+            response_data = await self._call_tool(TOOL_ADD_EPISODE, arguments)
+            if response_data is not None:
+                logger.info(f"✅ MCP Episode added: {name}")
+                return response_data
 
             # Fallback
             return {
@@ -262,6 +244,57 @@ class GraphitiMCPClient:
                 "uuid": None
             }
 
+    async def add_episodes_bulk(
+        self,
+        episodes: List[Dict[str, Any]],
+        group_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add multiple episodes in bulk via MCP.
+
+        Args:
+            episodes: List of episode dicts with name, episode_body, etc.
+            group_id: Optional namespace for all episodes
+
+        Returns:
+            {
+                "success": bool,
+                "message": str,
+                "processed_count": int,
+                "group_id": str
+            }
+        """
+        try:
+            # Episodes are passed as a JSON string (required by MCP tool)
+            arguments = {"episodes": json.dumps(episodes)}
+            if group_id:
+                arguments["group_id"] = group_id
+
+            logger.info(f"📚 MCP Bulk Ingest: {len(episodes)} episodes")
+
+            # Call MCP tool
+            response_data = await self._call_tool(TOOL_ADD_EPISODES_BULK, arguments)
+            if response_data is not None:
+                logger.info(f"✅ MCP Bulk ingest complete")
+                return response_data
+
+            # Fallback
+            return {
+                "success": True,
+                "message": "Bulk ingest submitted (no details returned)",
+                "processed_count": len(episodes),
+                "group_id": group_id
+            }
+
+        except Exception as e:
+            logger.error(f"❌ MCP Bulk ingest failed: {e}", exc_info=True)
+            return {
+                "success": False,
+                "message": str(e),
+                "processed_count": 0,
+                "group_id": group_id
+            }
+
     async def get_recent_nodes(
         self,
         limit: int = 10,
@@ -282,9 +315,6 @@ class GraphitiMCPClient:
                 "nodes": [...]
             }
         """
-        if not self.session:
-            await self.connect()
-
         try:
             # Build tool arguments
             arguments = {"limit": limit}
@@ -296,18 +326,10 @@ class GraphitiMCPClient:
             logger.info(f"📊 MCP Get Recent Nodes: limit={limit}")
 
             # Call MCP tool
-            result = await self.session.call_tool(
-                "mcp__blade-graphiti__get_recent_nodes",
-                arguments=arguments
-            )
-
-            # Parse response
-            if hasattr(result, 'content') and len(result.content) > 0:
-                content_item = result.content[0]
-                if hasattr(content_item, 'text'):
-                    response_data = json.loads(content_item.text)
-                    logger.info(f"✅ MCP Recent nodes retrieved: {response_data.get('count', 0)}")
-                    return response_data
+            response_data = await self._call_tool(TOOL_GET_RECENT_NODES, arguments)
+            if response_data is not None:
+                logger.info(f"✅ MCP Recent nodes retrieved: {response_data.get('count', 0)}")
+                return response_data
 
             # Fallback
             return {"count": 0, "nodes": []}
@@ -316,6 +338,37 @@ class GraphitiMCPClient:
             logger.error(f"❌ MCP Get recent nodes failed: {e}", exc_info=True)
             return {"count": 0, "nodes": []}
 
+    async def delete_episode(self, uuid: str) -> Dict[str, Any]:
+        """
+        Delete an episode from the knowledge graph via MCP.
+
+        Args:
+            uuid: Episode UUID
+
+        Returns:
+            {
+                "status": "success" | "error",
+                "message": str
+            }
+        """
+        try:
+            logger.info(f"🗑️ MCP Delete Episode: {uuid}")
+
+            # Call MCP tool
+            response_data = await self._call_tool(TOOL_DELETE_EPISODE, {"uuid": uuid})
+            if response_data is not None:
+                if "error" in response_data:
+                    return {"status": "error", "message": str(response_data["error"])}
+                logger.info(f"✅ MCP Episode deleted: {uuid}")
+                return {"status": "success", **response_data}
+
+            # Fallback
+            return {"status": "success", "message": "Episode deleted (no details returned)"}
+
+        except Exception as e:
+            logger.error(f"❌ MCP Delete Episode failed: {e}", exc_info=True)
+            return {"status": "error", "message": str(e)}
+
     async def ingest_document(
         self,
         content: str,
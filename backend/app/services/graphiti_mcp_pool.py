@@ -0,0 +1,341 @@
+"""
+GRAPHITI MCP SESSION POOL
+=========================
+Keeps N warm blade-graphiti MCP server processes and spreads tool calls
+across them.
+
+WHY:
+- One stdio session serializes every concurrent FastAPI request behind a
+  single subprocess
+- Spawning `uvx mcp-server-graphiti` takes seconds, so sessions are started
+  once (app lifespan) and reused
+- A crashed server process used to break every later call until restart
+
+DESIGN:
+- Each pooled session is owned by a dedicated asyncio task that enters the
+  stdio_client / ClientSession contexts and holds them until stopped
+  (anyio requires contexts to be exited by the task that entered them, so
+  respawning from another task must not touch them directly)
+- call_tool() picks the live session with the fewest in-flight calls
+  (ClientSession multiplexes concurrent requests by JSON-RPC id)
+- A health loop pings every session; dead ones are respawned in place
+- A call that fails on a broken transport (including a session that died
+  between being picked and being called) is retried once on another session
+- If every session is down, all dead slots are respawned inline
+
+CONFIGURATION:
+- GRAPHITI_MCP_POOL_SIZE (default 2)
+- GRAPHITI_MCP_HEALTH_INTERVAL seconds between pings (default 30)
+- GRAPHITI_MCP_CALL_TIMEOUT seconds per tool call (default 120)
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set
+
+import anyio
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = int(os.getenv("GRAPHITI_MCP_POOL_SIZE", "2"))
+DEFAULT_HEALTH_INTERVAL = float(os.getenv("GRAPHITI_MCP_HEALTH_INTERVAL", "30"))
+DEFAULT_CALL_TIMEOUT = float(os.getenv("GRAPHITI_MCP_CALL_TIMEOUT", "120"))
+
+# Seconds to wait for a new server process to initialize / answer a ping
+STARTUP_TIMEOUT = 60.0
+PING_TIMEOUT = 10.0
+
+# Errors that mean the session's transport is gone (vs. a tool-level error).
+# Timeouts are deliberately excluded: retrying a slow add_episode elsewhere
+# could ingest it twice.
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    EOFError,
+)
+
+# JSON-RPC error code the MCP SDK raises for requests on a closed connection
+CONNECTION_CLOSED = -32000
+
+
+def _is_transport_error(error: BaseException) -> bool:
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    # McpError / MCPError carry ErrorData in .error
+    error_data = getattr(error, 'error', None)
+    return getattr(error_data, 'code', None) == CONNECTION_CLOSED
+
+
+class PooledSession:
+    """One MCP server process and its ClientSession, owned by a background task"""
+
+    def __init__(self, slot: int, server_params: StdioServerParameters):
+        self.slot = slot
+        self.server_params = server_params
+
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.calls = 0
+        self.error: Optional[BaseException] = None
+
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Spawn the server process and wait until the session is initialized"""
+        self._task = asyncio.create_task(self._run(), name=f"graphiti-mcp-session-{self.slot}")
+        await asyncio.wait_for(self._ready.wait(), timeout=STARTUP_TIMEOUT)
+        if self.session is None:
+            raise ConnectionError(f"MCP session {self.slot} failed to start: {self.error}")
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stop.wait()
+        except Exception as e:
+            self.error = e
+            logger.error(f"❌ MCP session {self.slot} exited: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def stop(self) -> None:
+        """Close the session and terminate the server process"""
+        self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._task.cancel()
+        self.session = None
+
+    async def ping(self) -> bool:
+        """True if the server answers a ping in time"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+
+class GraphitiMCPSessionPool:
+    """
+    Pool of warm blade-graphiti MCP sessions.
+
+    Usage:
+        pool = GraphitiMCPSessionPool(server_params, size=4)
+        await pool.start()
+        result = await pool.call_tool("search", {"query": "..."})
+        await pool.stop()
+    """
+
+    def __init__(
+        self,
+        server_params: StdioServerParameters,
+        size: int = DEFAULT_POOL_SIZE,
+        health_interval: float = DEFAULT_HEALTH_INTERVAL,
+        call_timeout: float = DEFAULT_CALL_TIMEOUT
+    ):
+        """
+        Initialize session pool (no processes are started until start()).
+
+        Args:
+            server_params: How to launch the MCP server
+            size: Number of server processes to keep warm
+            health_interval: Seconds between health-check pings
+            call_timeout: Seconds before a tool call is abandoned
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.server_params = server_params
+        self.size = size
+        self.health_interval = health_interval
+        self.call_timeout = call_timeout
+
+        self._sessions: List[PooledSession] = []
+        self._respawn_locks: List[asyncio.Lock] = []
+        self._health_task: Optional[asyncio.Task] = None
+        # Background respawns started by failed calls (kept so they are not
+        # garbage-collected mid-flight and can be cancelled on stop)
+        self._respawn_tasks: Set[asyncio.Task] = set()
+        self._start_lock = asyncio.Lock()
+
+        # Metrics
+        self.respawns = 0
+        self.retries = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._sessions)
+
+    async def start(self) -> None:
+        """Spawn all server processes concurrently and start health checks"""
+        async with self._start_lock:
+            if self._sessions:
+                return
+
+            logger.info(f"🔌 Starting {self.size} blade-graphiti MCP sessions...")
+            sessions = [PooledSession(slot, self.server_params) for slot in range(self.size)]
+            results = await asyncio.gather(*(s.start() for s in sessions), return_exceptions=True)
+
+            failures = [r for r in results if isinstance(r, BaseException)]
+            if len(failures) == len(sessions):
+                await asyncio.gather(*(s.stop() for s in sessions))
+                raise ConnectionError(f"Failed to start any MCP session: {failures[0]}")
+            if failures:
+                logger.warning(f"⚠️ {len(failures)}/{self.size} MCP sessions failed to start; will retry")
+
+            self._sessions = sessions
+            self._respawn_locks = [asyncio.Lock() for _ in sessions]
+            self._health_task = asyncio.create_task(self._health_loop(), name="graphiti-mcp-health")
+
+            logger.info(f"✅ MCP session pool ready ({self.size - len(failures)}/{self.size} live)")
+
+    async def stop(self) -> None:
+        """Stop health checks and terminate all server processes"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        respawns = list(self._respawn_tasks)
+        for task in respawns:
+            task.cancel()
+        await asyncio.gather(*respawns, return_exceptions=True)
+
+        sessions, self._sessions = self._sessions, []
+        await asyncio.gather(*(s.stop() for s in sessions), return_exceptions=True)
+        logger.info("👋 MCP session pool stopped")
+
+    # ------------------------------------------------------------------
+    # Health checks and respawn
+    # ------------------------------------------------------------------
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for slot, session in enumerate(list(self._sessions)):
+                if not await session.ping():
+                    logger.warning(f"⚠️ MCP session {slot} unhealthy, respawning")
+                    await self._respawn(slot, session)
+
+    async def _respawn(self, slot: int, dead: PooledSession) -> None:
+        """Replace a dead session (no-op if another caller already did)"""
+        async with self._respawn_locks[slot]:
+            if self._sessions[slot] is not dead:
+                return
+            await dead.stop()
+            replacement = PooledSession(slot, self.server_params)
+            try:
+                await replacement.start()
+            except Exception as e:
+                logger.error(f"❌ MCP session {slot} respawn failed: {e}")
+                await replacement.stop()
+            # Install even if it failed so the next health check retries it
+            self._sessions[slot] = replacement
+            self.respawns += 1
+
+    def _respawn_in_background(self, slot: int, dead: PooledSession) -> None:
+        task = asyncio.create_task(self._respawn(slot, dead), name=f"graphiti-mcp-respawn-{slot}")
+        self._respawn_tasks.add(task)
+        task.add_done_callback(self._respawn_done)
+
+    def _respawn_done(self, task: asyncio.Task) -> None:
+        self._respawn_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"❌ MCP session respawn failed: {task.exception()}")
+
+    # ------------------------------------------------------------------
+    # Tool calls
+    # ------------------------------------------------------------------
+
+    def _pick(self, exclude: Optional[PooledSession] = None) -> Optional[PooledSession]:
+        live = [s for s in self._sessions if s.alive and s is not exclude]
+        return min(live, key=lambda s: s.in_flight) if live else None
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """
+        Call an MCP tool on the least-busy live session.
+
+        Retries once on a different session if the transport breaks.
+
+        Returns:
+            mcp CallToolResult
+        """
+        if not self.started:
+            await self.start()
+
+        session = self._pick()
+        if session is None:
+            # Every session is down - respawn them all inline rather than fail
+            await asyncio.gather(*(
+                self._respawn(slot, dead)
+                for slot, dead in enumerate(list(self._sessions))
+                if not dead.alive
+            ))
+            session = self._pick()
+            if session is None:
+                raise ConnectionError("No live MCP sessions available")
+
+        try:
+            return await self._call_on(session, tool_name, arguments)
+        except Exception as e:
+            if not _is_transport_error(e):
+                raise
+            logger.warning(f"⚠️ MCP session {session.slot} failed ({type(e).__name__}), retrying")
+            self._respawn_in_background(session.slot, session)
+
+            fallback = self._pick(exclude=session)
+            if fallback is None:
+                raise
+            self.retries += 1
+            return await self._call_on(fallback, tool_name, arguments)
+
+    async def _call_on(self, session: PooledSession, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        client = session.session
+        if client is None:
+            # Exited after _pick() - a transport failure, so call_tool retries
+            raise ConnectionError(f"MCP session {session.slot} is not connected")
+
+        session.in_flight += 1
+        session.calls += 1
+        try:
+            return await asyncio.wait_for(
+                client.call_tool(tool_name, arguments=arguments),
+                timeout=self.call_timeout
+            )
+        finally:
+            session.in_flight -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool metrics for monitoring"""
+        return {
+            "size": self.size,
+            "live": sum(1 for s in self._sessions if s.alive),
+            "respawns": self.respawns,
+            "retries": self.retries,
+            "sessions": [
+                {"slot": s.slot, "alive": s.alive, "in_flight": s.in_flight, "calls": s.calls}
+                for s in self._sessions
+            ],
+        }
@@ -20,11 +20,34 @@ MCP TOOLS USED:
 - mcp__blade-graphiti__add_episodes_bulk - Bulk episode ingestion
 - mcp__blade-graphiti__get_recent_nodes - Get recent nodes
 - mcp__blade-graphiti__delete_episode - Delete episode
+
+MODES (GRAPHITI_MCP_MODE):
+- direct (default): search, add_episode, add_episodes_bulk,
+  get_recent_nodes and delete_episode call the MCP tools on a persistent session
+  (GraphitiMCPClient) - one JSON-RPC round-trip, no LLM tokens
+- agent: each call runs a Claude Agent SDK query() that asks the model to
+  invoke the tool (original behaviour; adds a full LLM round-trip)
+
+CACHING:
+- search() results are cached (graphiti_search_cache.py); add_episode,
+  add_episodes_bulk, delete_episode and ingest_document invalidate the
+  groups they write
+
+DOCUMENT INGESTION:
+- Documents are sent as page/section chunks (document_chunker.py) in
+  add_episodes_bulk batches of GRAPHITI_BULK_BATCH_SIZE; a per-document
+  manifest of chunk hash -> episode id means only new or changed chunks are
+  sent on re-ingest
+- Episodes of chunks that changed or left the document are deleted from the
+  graph once the new batches are in; failed deletes are retried on the next
+  ingest of the document
 """
 
+import asyncio
 import os
 import json
 import logging
+import uuid
 from typing import List, Dict, Optional, Any, AsyncGenerator
 from datetime import datetime
 
@@ -32,22 +55,44 @@ from datetime import datetime
 from claude_agent_sdk import query
 from claude_agent_sdk.types import ClaudeAgentOptions
 
+from app.services.document_chunker import ChunkManifest, DocumentChunk, chunk_pages
+from app.services.graphiti_mcp_client import GraphitiMCPClient, get_graphiti_mcp_client
+from app.services.graphiti_search_cache import get_graphiti_search_cache
+
 logger = logging.getLogger(__name__)
 
+MODE_DIRECT = "direct"
+MODE_AGENT = "agent"
+
+DEFAULT_BULK_BATCH_SIZE = int(os.getenv("GRAPHITI_BULK_BATCH_SIZE", "20"))
+
+
+def _bulk_episode_ids(result: Dict[str, Any], names: List[str]) -> List[str]:
+    """Episode UUIDs from an add_episodes_bulk response, else the episode names"""
+    episodes = result.get("episodes")
+    if isinstance(episodes, list) and len(episodes) == len(names):
+        uuids = [episode.get("uuid") if isinstance(episode, dict) else None for episode in episodes]
+        return [uuid or name for uuid, name in zip(uuids, names)]
+    uuids = result.get("uuids")
+    if isinstance(uuids, list) and len(uuids) == len(names):
+        return [uuid or name for uuid, name in zip(uuids, names)]
+    return list(names)
+
 
 class GraphitiMCPService:
     """
     MCP-based Graphiti service using blade-graphiti MCP server.
 
-    Replaces direct Graphiti client with MCP tool calls orchestrated
-    by Claude Agent SDK.
+    Calls blade-graphiti MCP tools either directly on a persistent MCP
+    session or orchestrated by Claude Agent SDK (see MODES above).
     """
 
     def __init__(
         self,
         neo4j_uri: Optional[str] = None,
         neo4j_user: Optional[str] = None,
-        neo4j_password: Optional[str] = None
+        neo4j_password: Optional[str] = None,
+        mode: Optional[str] = None
     ):
         """
         Initialize Graphiti MCP service.
@@ -56,6 +101,7 @@ class GraphitiMCPService:
             neo4j_uri: Neo4j database URI
             neo4j_user: Neo4j username
             neo4j_password: Neo4j password
+            mode: "direct" or "agent" (defaults to GRAPHITI_MCP_MODE env)
         """
         # Get Neo4j credentials from env if not provided
         self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI")
@@ -65,6 +111,10 @@ class GraphitiMCPService:
         if not all([self.neo4j_uri, self.neo4j_user, self.neo4j_password]):
             raise ValueError("Neo4j credentials not configured")
 
+        self.mode = (mode or os.getenv("GRAPHITI_MCP_MODE", MODE_DIRECT)).lower()
+        if self.mode not in (MODE_DIRECT, MODE_AGENT):
+            raise ValueError(f"Invalid GRAPHITI_MCP_MODE: {self.mode} (use 'direct' or 'agent')")
+
         # Create MCP configuration using ClaudeAgentOptions
         self.agent_options = ClaudeAgentOptions(
             mcp_servers={
@@ -87,7 +137,14 @@ class GraphitiMCPService:
             ]
         )
 
-        logger.info(f"✅ Graphiti MCP service initialized: {self.neo4j_uri}")
+        # One ingestion per document at a time (shared manifest file)
+        self._document_locks: Dict[str, asyncio.Lock] = {}
+
+        logger.info(f"✅ Graphiti MCP service initialized: {self.neo4j_uri} (mode={self.mode})")
+
+    def _direct_client(self) -> GraphitiMCPClient:
+        """Persistent-session MCP client used in direct mode"""
+        return get_graphiti_mcp_client()
 
     async def search(
         self,
@@ -96,7 +153,36 @@ class GraphitiMCPService:
         num_results: int = 20
     ) -> Dict[str, Any]:
         """
-        Search knowledge graph via MCP.
+        Search knowledge graph via MCP, serving repeat queries from cache.
+
+        Args:
+            query_text: Natural language search query
+            group_ids: Optional namespace filtering
+            num_results: Maximum results to return
+
+        Returns:
+            Search response (see _search)
+        """
+        cache = get_graphiti_search_cache()
+        cached = cache.get(query_text, group_ids, num_results)
+        if cached is not None:
+            logger.info(f"⚡ MCP Search cache hit: {query_text[:100]}")
+            return cached
+
+        # A write to these groups while the search is in flight makes the result stale
+        generation = cache.generation(group_ids)
+        results = await self._search(query_text, group_ids, num_results)
+        cache.put(query_text, group_ids, num_results, results, generation)
+        return results
+
+    async def _search(
+        self,
+        query_text: str,
+        group_ids: Optional[List[str]] = None,
+        num_results: int = 20
+    ) -> Dict[str, Any]:
+        """
+        Search knowledge graph via MCP (uncached).
 
         Replaces: graphiti_service.search()
 
@@ -124,6 +210,9 @@ class GraphitiMCPService:
                 }
             }
         """
+        if self.mode == MODE_DIRECT:
+            return await self._direct_client().search(query_text, group_ids, num_results)
+
         try:
             # Build MCP tool call prompt for Claude
             tool_params = {
@@ -195,6 +284,32 @@ Call the tool and return the complete JSON response from the search.
         source_description: str = "AAOIFI Document",
         group_id: Optional[str] = None,
         reference_time: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add episode to knowledge graph and invalidate cached searches of its group.
+
+        See _add_episode for arguments and response.
+        """
+        result = await self._add_episode(
+            name=name,
+            episode_body=episode_body,
+            episode_type=episode_type,
+            source_description=source_description,
+            group_id=group_id,
+            reference_time=reference_time
+        )
+        if result.get("status") != "error":
+            get_graphiti_search_cache().invalidate_group(group_id)
+        return result
+
+    async def _add_episode(
+        self,
+        name: str,
+        episode_body: str,
+        episode_type: str = "text",
+        source_description: str = "AAOIFI Document",
+        group_id: Optional[str] = None,
+        reference_time: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Add episode to knowledge graph via MCP.
@@ -217,6 +332,16 @@ Call the tool and return the complete JSON response from the search.
                 "uuid": str  # for deletion or linking
             }
         """
+        if self.mode == MODE_DIRECT:
+            return await self._direct_client().add_episode(
+                name=name,
+                episode_body=episode_body,
+                episode_type=episode_type,
+                source_description=source_description,
+                group_id=group_id,
+                reference_time=reference_time
+            )
+
         try:
             # Build MCP tool call prompt
             tool_params = {
@@ -284,6 +409,24 @@ Call the tool and return the complete JSON response.
         self,
         episodes: List[Dict[str, Any]],
         group_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add episodes in bulk and invalidate cached searches of the written groups.
+
+        See _add_episodes_bulk for arguments and response.
+        """
+        result = await self._add_episodes_bulk(episodes, group_id)
+        if result.get("success", True):
+            cache = get_graphiti_search_cache()
+            written = {episode.get("group_id", group_id) for episode in episodes} or {group_id}
+            for written_group in written:
+                cache.invalidate_group(written_group)
+        return result
+
+    async def _add_episodes_bulk(
+        self,
+        episodes: List[Dict[str, Any]],
+        group_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Add multiple episodes in bulk via MCP.
@@ -302,6 +445,9 @@ Call the tool and return the complete JSON response.
                 "group_id": str
             }
         """
+        if self.mode == MODE_DIRECT:
+            return await self._direct_client().add_episodes_bulk(episodes, group_id)
+
         try:
             # Convert episodes list to JSON string (required by MCP tool)
             episodes_json = json.dumps(episodes)
@@ -376,6 +522,9 @@ Call the tool and return the complete JSON response.
                 ]
             }
         """
+        if self.mode == MODE_DIRECT:
+            return await self._direct_client().get_recent_nodes(limit, node_labels, group_id)
+
         try:
             tool_params = {"limit": limit}
             if node_labels:
@@ -420,6 +569,90 @@ Call the tool and return the complete JSON response.
                 "nodes": []
             }
 
+    async def delete_episode(self, uuid: str, group_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Delete an episode and invalidate cached searches of its group.
+
+        See _delete_episode for arguments and response.
+        """
+        result = await self._delete_episode(uuid)
+        if result.get("status") != "error":
+            get_graphiti_search_cache().invalidate_group(group_id)
+        return result
+
+    async def _delete_episode(self, uuid: str) -> Dict[str, Any]:
+        """
+        Delete an episode from the knowledge graph via MCP.
+
+        Args:
+            uuid: Episode UUID
+
+        Returns:
+            {
+                "status": "success" | "error",
+                "message": str
+            }
+        """
+        if self.mode == MODE_DIRECT:
+            return await self._direct_client().delete_episode(uuid)
+
+        try:
+            prompt = f"""
+Use the mcp__blade-graphiti__delete_episode tool to delete an episode.
+
+Episode UUID: {uuid}
+
+Call the tool and return the complete JSON response.
+"""
+
+            logger.info(f"🗑️ MCP Delete Episode: {uuid}")
+
+            full_response = ""
+            async for message in query(
+                prompt=prompt,
+                options=self.agent_options
+            ):
+                full_response += str(message)
+
+            logger.info(f"✅ MCP Episode deleted: {uuid}")
+
+            try:
+                return {"status": "success", **json.loads(full_response)}
+            except (json.JSONDecodeError, TypeError):
+                return {"status": "success", "message": full_response}
+
+        except Exception as e:
+            logger.error(f"❌ MCP Delete Episode failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def _delete_superseded(self, episode_ids: List[str], group_id: str) -> List[str]:
+        """
+        Delete episodes no longer backed by a chunk of their document.
+
+        Ids that are episode names (the server returned no UUID) cannot be
+        deleted and are dropped with a warning.
+
+        Returns:
+            Ids whose delete failed (to retry on the next ingest)
+        """
+        failed = []
+        deleted = 0
+        for episode_id in episode_ids:
+            try:
+                uuid.UUID(episode_id)
+            except ValueError:
+                logger.warning(f"⚠️ Superseded episode has no UUID, cannot delete: {episode_id}")
+                continue
+            result = await self._delete_episode(episode_id)
+            if result.get("status") == "error":
+                failed.append(episode_id)
+            else:
+                deleted += 1
+
+        if deleted:
+            get_graphiti_search_cache().invalidate_group(group_id)
+        return failed
+
     async def ingest_document(
         self,
         content: str,
@@ -430,7 +663,8 @@ Call the tool and return the complete JSON response.
         """
         Ingest document into knowledge graph via MCP.
 
-        This method wraps add_episode for document ingestion compatibility.
+        The text is chunked by section (as a single page) and sent through
+        ingest_chunks; use ingest_chunks directly to keep page numbers.
 
         Args:
             content: Document text content
@@ -439,31 +673,111 @@ Call the tool and return the complete JSON response.
             metadata: Optional metadata dict
 
         Returns:
-            Episode UUID/ID for the ingested document
+            Episode UUID/ID of the document's first chunk
         """
-        try:
-            # Determine group_id based on document type
-            group_id = f"{document_type}-documents"
-
-            # Add episode for document
-            result = await self.add_episode(
-                name=f"{document_type.upper()}: {document_name}",
-                episode_body=content,
-                episode_type="text",
-                source_description=f"{document_type} Document Upload",
-                group_id=group_id
-            )
+        result = await self.ingest_chunks(chunk_pages([(1, content)]), document_name, document_type, metadata)
+        return result["episode_ids"][0] if result["episode_ids"] else document_name
+
+    async def ingest_chunks(
+        self,
+        chunks: List[DocumentChunk],
+        document_name: str,
+        document_type: str = "aaoifi",
+        metadata: Optional[Dict[str, Any]] = None,
+        batch_size: int = DEFAULT_BULK_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Ingest the new or changed chunks of a document via add_episodes_bulk.
+
+        Chunks already in the document's manifest are not sent again; the
+        manifest is saved after every batch, so a failed ingestion resumes
+        with the batches that did not complete. Once every batch is in, the
+        episodes of chunks no longer in the document are deleted.
 
-            # Extract UUID from result
-            episode_id = result.get("uuid", result.get("episode_name", document_name))
+        Args:
+            chunks: Chunks of the document (see document_chunker)
+            document_name: Name of the document
+            document_type: Type of document (aaoifi, context, etc.)
+            metadata: Document metadata kept in the manifest
+            batch_size: Episodes per add_episodes_bulk call
+
+        Returns:
+            {
+                "episode_ids": [str],  # per chunk, in document order
+                "chunks": int,
+                "added": int,
+                "unchanged": int,
+                "removed": int,  # superseded episodes deleted
+                "group_id": str
+            }
 
-            logger.info(f"✅ MCP Document ingested: {document_name} → {episode_id}")
+        Raises:
+            RuntimeError: If an add_episodes_bulk call fails
+        """
+        group_id = f"{document_type}-documents"
+        lock = self._document_locks.setdefault(f"{group_id}/{document_name}", asyncio.Lock())
+
+        async with lock:
+            manifest = ChunkManifest.load(group_id, document_name)
+            if metadata is not None:
+                manifest.metadata = metadata
+
+            new: Dict[str, DocumentChunk] = {}
+            for chunk in chunks:
+                if manifest.episode_id(chunk.sha1) is None:
+                    new.setdefault(chunk.sha1, chunk)
+            pending = list(new.values())
+
+            for start in range(0, len(pending), max(1, batch_size)):
+                batch = pending[start:start + batch_size]
+                names = [chunk.episode_name(document_name, document_type) for chunk in batch]
+                episodes = [
+                    {
+                        "name": name,
+                        "episode_body": chunk.text,
+                        "episode_type": "text",
+                        "source_description": f"{document_type} Document Upload (page {chunk.page})"
+                    }
+                    for name, chunk in zip(names, batch)
+                ]
 
-            return episode_id
+                result = await self.add_episodes_bulk(episodes, group_id)
+                if not result.get("success", True):
+                    raise RuntimeError(f"add_episodes_bulk failed: {result.get('message')}")
+
+                for chunk, episode_id in zip(batch, _bulk_episode_ids(result, names)):
+                    manifest.record(chunk, episode_id)
+                manifest.save()
+
+            # Superseded episodes go only after the new ones are in; the manifest
+            # keeps ids whose delete failed so the next ingest retries them
+            superseded = manifest.superseded + manifest.prune(chunk.sha1 for chunk in chunks)
+            if superseded:
+                manifest.superseded = superseded
+                manifest.save()
+                manifest.superseded = await self._delete_superseded(superseded, group_id)
+            if superseded or (metadata is not None and not pending):
+                manifest.save()
+            removed = len(superseded) - len(manifest.superseded)
+
+        unchanged = len({chunk.sha1 for chunk in chunks}) - len(pending)
+        if removed:
+            logger.info(f"🧹 {document_name}: {removed} superseded episodes removed from the graph")
+        if manifest.superseded:
+            logger.warning(f"⚠️ {document_name}: {len(manifest.superseded)} superseded episodes not deleted, will retry")
+        logger.info(
+            f"✅ MCP Document ingested: {document_name} → {len(chunks)} chunks "
+            f"({len(pending)} sent, {unchanged} unchanged)"
+        )
 
-        except Exception as e:
-            logger.error(f"❌ MCP Document ingestion failed: {e}")
-            raise
+        return {
+            "episode_ids": [manifest.episode_id(chunk.sha1) for chunk in chunks],
+            "chunks": len(chunks),
+            "added": len(pending),
+            "unchanged": unchanged,
+            "removed": removed,
+            "group_id": group_id,
+        }
 
 
 # ============================================================================
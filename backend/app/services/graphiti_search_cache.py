@@ -0,0 +1,249 @@
+"""
+GRAPHITI SEARCH CACHE
+=====================
+LRU + TTL cache for knowledge-graph search results.
+
+WHY:
+- Workflow executions and session streams search Graphiti on every start,
+  usually with near-identical queries (the default "Islamic finance
+  compliance requirements", or the same template's user notes)
+- Each search is an MCP round-trip plus embedding + graph queries
+
+KEYING:
+- Normalized query (case-folded, whitespace collapsed), sorted group_ids,
+  num_results
+
+INVALIDATION:
+- Entries expire after GRAPHITI_SEARCH_CACHE_TTL seconds
+- Least recently used entries are evicted past GRAPHITI_SEARCH_CACHE_SIZE
+- Writes (add_episode, add_episodes_bulk, ingest_document) drop every entry
+  that searched the written group_id; writes without a group drop everything
+- Each invalidation bumps a generation counter; a search still in flight
+  when its groups are invalidated is not stored (put() compares the
+  generation captured before the search)
+
+USAGE:
+    cache = get_graphiti_search_cache()
+    results = cache.get(query, group_ids, num_results)
+    if results is None:
+        generation = cache.generation(group_ids)
+        results = await mcp.search(...)
+        cache.put(query, group_ids, num_results, results, generation)
+"""
+
+import copy
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("GRAPHITI_SEARCH_CACHE_SIZE", "256"))
+DEFAULT_TTL_SECONDS = float(os.getenv("GRAPHITI_SEARCH_CACHE_TTL", "300"))
+
+SearchKey = Tuple[str, Tuple[str, ...], int]
+
+
+def normalize_query(query_text: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key"""
+    return " ".join(query_text.casefold().split())
+
+
+def make_key(query_text: str, group_ids: Optional[List[str]], num_results: int) -> SearchKey:
+    """Cache key for a search request"""
+    return (normalize_query(query_text), tuple(sorted(set(group_ids or []))), num_results)
+
+
+class GraphitiSearchCache:
+    """In-process LRU + TTL cache of search responses with per-group invalidation"""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS
+    ):
+        """
+        Initialize search cache.
+
+        Args:
+            max_entries: Maximum cached searches (0 disables caching)
+            ttl_seconds: Seconds before an entry expires
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # key -> (stored_at, results); ordered oldest -> most recently used
+        self._entries: "OrderedDict[SearchKey, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        # group_id -> keys whose search covered that group
+        self._by_group: Dict[str, Set[SearchKey]] = {}
+
+        # Invalidation generations: every invalidation, whole-cache clears,
+        # and per group
+        self._invalidation_count = 0
+        self._clear_count = 0
+        self._group_generations: Dict[str, int] = {}
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(
+        self,
+        query_text: str,
+        group_ids: Optional[List[str]],
+        num_results: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Look up cached results.
+
+        Returns:
+            A copy of the cached response, or None on miss/expiry
+        """
+        if not self.enabled:
+            return None
+
+        key = make_key(query_text, group_ids, num_results)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        stored_at, results = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(results)
+
+    def generation(self, group_ids: Optional[List[str]]) -> Tuple[int, ...]:
+        """Invalidation state of the groups a search covers (capture before searching)"""
+        groups = make_key("", group_ids, 0)[1]
+        if not groups:
+            # Unfiltered searches are affected by a write to any group
+            return (self._invalidation_count,)
+        return (self._clear_count, *(self._group_generations.get(group_id, 0) for group_id in groups))
+
+    def put(
+        self,
+        query_text: str,
+        group_ids: Optional[List[str]],
+        num_results: int,
+        results: Dict[str, Any],
+        generation: Optional[Tuple[int, ...]] = None
+    ) -> None:
+        """
+        Store a successful search response.
+
+        Args:
+            generation: generation(group_ids) from before the search; if its
+                groups were invalidated since, the results may predate the
+                write and are not stored
+        """
+        if not self.enabled or results.get("status") == "error":
+            return
+        if generation is not None and generation != self.generation(group_ids):
+            self.stale_puts += 1
+            return
+
+        key = make_key(query_text, group_ids, num_results)
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic(), copy.deepcopy(results))
+        for group_id in key[1]:
+            self._by_group.setdefault(group_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate_group(self, group_id: Optional[str]) -> int:
+        """
+        Drop cached searches affected by a write to group_id.
+
+        Searches without group filtering cover every group, so they are
+        always dropped. A write with no group_id clears the whole cache.
+
+        Returns:
+            Number of entries removed
+        """
+        self._invalidation_count += 1
+        if group_id is None:
+            removed = len(self._entries)
+            self.clear()
+        else:
+            self._group_generations[group_id] = self._group_generations.get(group_id, 0) + 1
+            keys = self._by_group.pop(group_id, set())
+            keys |= {key for key in self._entries if not key[1]}
+            for key in keys:
+                self._remove(key)
+            removed = len(keys)
+
+        if removed:
+            self.invalidations += removed
+            logger.info(f"🧹 Search cache invalidated {removed} entries (group={group_id or 'all'})")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        self._invalidation_count += 1
+        self._clear_count += 1
+        self._entries.clear()
+        self._by_group.clear()
+
+    def _remove(self, key: SearchKey) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        for group_id in key[1]:
+            keys = self._by_group.get(group_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_group[group_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "stale_puts": self.stale_puts,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_graphiti_search_cache: Optional[GraphitiSearchCache] = None
+
+
+def get_graphiti_search_cache() -> GraphitiSearchCache:
+    """Get or create search cache singleton"""
+    global _graphiti_search_cache
+    if _graphiti_search_cache is None:
+        _graphiti_search_cache = GraphitiSearchCache()
+    return _graphiti_search_cache
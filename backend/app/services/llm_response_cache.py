@@ -0,0 +1,289 @@
+"""
+LLM RESPONSE CACHE
+==================
+Content-addressed SQLite cache of Claude responses for deterministic reruns.
+
+WHY:
+- Demo reruns, regression suites and idempotent re-executions of a template
+  (e.g. sukuk_compliance_review) send byte-identical requests and wait tens
+  of seconds for a fresh generation
+- With the cache enabled, a repeat request is answered from local disk in
+  milliseconds
+
+KEYING:
+- SHA-256 of model, temperature, max_tokens, system prompt, messages and
+  knowledge-graph context (canonical JSON)
+- Any change to the template, user notes or retrieved context is a new key
+
+STREAMS:
+- Streamed responses are stored chunk-by-chunk and replayed in the same
+  chunks, so SSE clients see the same sequence of events as the original run
+- Only completed responses are stored (an aborted stream is never cached)
+
+EVICTION:
+- Entries older than LLM_CACHE_MAX_AGE_DAYS are deleted
+- Least recently used entries are deleted while the cache exceeds
+  LLM_CACHE_MAX_MB
+
+CONFIGURATION:
+- LLM_CACHE_ENABLED (default false - sampling at temperature > 0 is
+  otherwise expected to vary between runs)
+- LLM_CACHE_PATH (default ./llm_cache/cache.db)
+- LLM_CACHE_MAX_MB (default 256)
+- LLM_CACHE_MAX_AGE_DAYS (default 30)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.getenv("LLM_CACHE_PATH", "./llm_cache/cache.db")
+DEFAULT_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+DEFAULT_MAX_AGE_SECONDS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30")) * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    chunks TEXT NOT NULL,
+    usage TEXT NOT NULL,
+    stop_reason TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+CREATE INDEX IF NOT EXISTS idx_responses_created_at ON responses (created_at);
+"""
+
+
+def make_key(
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str,
+    messages: List[Dict[str, Any]],
+    context: Optional[str] = None
+) -> str:
+    """Content address of a request"""
+    material = {
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "system": system_prompt,
+        "messages": messages,
+        "context": context or "",
+    }
+    return hashlib.sha256(
+        json.dumps(material, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode()
+    ).hexdigest()
+
+
+class CachedResponse:
+    """One stored response"""
+
+    def __init__(self, key: str, model: str, chunks: List[str], usage: Dict[str, Any], stop_reason: Optional[str]):
+        self.key = key
+        self.model = model
+        self.chunks = chunks
+        self.usage = usage
+        self.stop_reason = stop_reason
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+
+class LLMResponseCache:
+    """SQLite-backed response cache with age and size eviction"""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS
+    ):
+        """
+        Initialize response cache (the database is opened on first use).
+
+        Args:
+            path: SQLite database file
+            max_bytes: Total stored response size before LRU eviction
+            max_age_seconds: Age after which entries are deleted
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self._conn: Optional[sqlite3.Connection] = None
+        # sqlite3 connections are shared with worker threads (asyncio.to_thread)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            logger.info(f"✅ LLM response cache opened: {self.path}")
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Reads and writes (async wrappers run SQLite off the event loop)
+    # ------------------------------------------------------------------
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        """Cached response for key, or None on miss/expiry"""
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(
+        self,
+        key: str,
+        model: str,
+        chunks: List[str],
+        usage: Dict[str, Any],
+        stop_reason: Optional[str] = None
+    ) -> None:
+        """Store a completed response and apply eviction"""
+        await asyncio.to_thread(self._put, key, model, chunks, usage, stop_reason)
+
+    def _get(self, key: str) -> Optional[CachedResponse]:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT model, chunks, usage, stop_reason, created_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or now - row[4] >= self.max_age_seconds:
+                self.misses += 1
+                return None
+
+            conn.execute(
+                "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key)
+            )
+            conn.commit()
+
+        self.hits += 1
+        model, chunks, usage, stop_reason, _ = row
+        return CachedResponse(key, model, json.loads(chunks), json.loads(usage), stop_reason)
+
+    def _put(
+        self,
+        key: str,
+        model: str,
+        chunks: List[str],
+        usage: Dict[str, Any],
+        stop_reason: Optional[str]
+    ) -> None:
+        chunks_json = json.dumps(chunks, ensure_ascii=False)
+        usage_json = json.dumps(usage)
+        size = len(chunks_json.encode()) + len(usage_json)
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, chunks, usage, stop_reason, size, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, model, chunks_json, usage_json, stop_reason, size, now, now)
+            )
+            self.stores += 1
+            self._evict(conn, now)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Delete expired entries, then LRU entries until under max_bytes"""
+        expired = conn.execute(
+            "DELETE FROM responses WHERE created_at < ?",
+            (now - self.max_age_seconds,)
+        ).rowcount
+
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        dropped = 0
+        if total > self.max_bytes:
+            for key, size in conn.execute(
+                "SELECT key, size FROM responses ORDER BY last_access"
+            ).fetchall():
+                if total <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                dropped += 1
+
+        if expired or dropped:
+            self.evictions += expired + dropped
+            logger.info(f"🧹 LLM response cache evicted {expired} expired, {dropped} over size limit")
+
+    def clear(self) -> None:
+        """Remove every entry"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss and storage metrics for monitoring"""
+        with self._lock:
+            conn = self._connect()
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get or create response cache singleton"""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
@@ -0,0 +1,272 @@
+"""
+PARSE CACHE
+===========
+Content-addressed disk cache of parsed documents.
+
+WHY:
+- Every POST /documents/ingest and every corpus ingestion run re-parsed the
+  same AAOIFI standards from scratch; LlamaParse calls are slow and billed,
+  PyPDF2 costs ~0.1s of CPU per page
+- Re-ingesting an unchanged file should skip parsing entirely
+
+KEYING:
+- SHA-256 of the file bytes plus the parser version (e.g. "pypdf2-3.0.1",
+  "llamaparse-markdown"); the file name and upload time do not matter
+- Upgrading a parser or switching LlamaParse on is a new key, so text from
+  an older extraction is never served for the new one
+
+STORAGE:
+- PARSE_CACHE_DIR/<sha256[:2]>/<sha256>.<parser>.txt - extracted text
+- PARSE_CACHE_DIR/<sha256[:2]>/<sha256>.<parser>.json - page offsets
+  (number, start, end) into the text, SHA-1 of each page's text, parse time
+- Both are written to a temp file and renamed; the .json is written last and
+  marks the entry complete
+
+PROVENANCE:
+- The page SHA-1s are the `prov_text_sha1s` of the ProvenanceFields mixin
+  (Pydantic Models/overlays); ParsedDocument.provenance() returns them with
+  page_nums and the file SHA-256 as revision id under the same slot names
+
+CONFIGURATION:
+- PARSE_CACHE_ENABLED (default true)
+- PARSE_CACHE_DIR (default ./parse_cache)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+DEFAULT_DIR = os.getenv("PARSE_CACHE_DIR", "./parse_cache")
+
+# Bump when the stored layout changes; older entries become misses
+CACHE_FORMAT = 1
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """SHA-256 of a file, read in fixed-size blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha1(text: str) -> str:
+    """SHA-1 of source text (prov_text_sha1s)"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ParsedDocument:
+    """
+    Extracted text of one file plus page offsets into it.
+
+    pages holds (page number, start, end) character spans of each page's
+    text; documents without pages (DOCX) have none.
+    """
+
+    def __init__(
+        self,
+        file_sha256: str,
+        parser: str,
+        text: str,
+        pages: List[Tuple[int, int, int]],
+        text_sha1s: Optional[List[str]] = None,
+        parse_seconds: float = 0.0
+    ):
+        self.file_sha256 = file_sha256
+        self.parser = parser
+        self.text = text
+        self.pages = [tuple(page) for page in pages]
+        self.text_sha1s = text_sha1s if text_sha1s is not None else [
+            text_sha1(text) for _, text in self.iter_pages()
+        ]
+        self.parse_seconds = parse_seconds
+        self.cached = False
+
+    @classmethod
+    def from_pages(
+        cls,
+        file_sha256: str,
+        parser: str,
+        pages: Iterable[Tuple[int, str]],
+        marker: Callable[[int], str] = lambda number: "",
+        separator: str = ""
+    ) -> "ParsedDocument":
+        """
+        Join page texts, recording where each page starts and ends.
+
+        Args:
+            file_sha256: SHA-256 of the source file
+            parser: Parser version
+            pages: (page number, text) in order
+            marker: Text placed before each page (e.g. "--- Page N ---")
+            separator: Text placed between pages
+        """
+        parts = []
+        spans = []
+        offset = 0
+        for index, (number, text) in enumerate(pages):
+            head = (separator if index else "") + marker(number)
+            offset += len(head)
+            spans.append((number, offset, offset + len(text)))
+            offset += len(text)
+            parts.append(head)
+            parts.append(text)
+        return cls(file_sha256, parser, "".join(parts), spans)
+
+    def iter_pages(self) -> Iterator[Tuple[int, str]]:
+        """(page number, text) of each page; the whole text as page 1 if unpaged"""
+        if not self.pages:
+            yield 1, self.text
+            return
+        for number, start, end in self.pages:
+            yield number, self.text[start:end]
+
+    def provenance(self) -> Dict[str, Any]:
+        """ProvenanceFields slots derived from the content hashes"""
+        return {
+            "prov_rev_ids": [self.file_sha256],
+            "prov_text_sha1s": list(self.text_sha1s),
+            "page_nums": [number for number, _, _ in self.pages],
+        }
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "format": CACHE_FORMAT,
+            "file_sha256": self.file_sha256,
+            "parser": self.parser,
+            "chars": len(self.text),
+            "pages": [list(page) for page in self.pages],
+            "text_sha1s": self.text_sha1s,
+            "parse_seconds": round(self.parse_seconds, 3),
+            "created_at": time.time(),
+        }
+
+
+class ParseCache:
+    """
+    Disk cache of ParsedDocument by (file SHA-256, parser version).
+
+    Usage:
+        cache = get_parse_cache()
+        parsed = await cache.get(file_sha256, parser)
+        if parsed is None:
+            parsed = ...  # parse
+            await cache.put(parsed)
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR, enabled: bool = DEFAULT_ENABLED):
+        """
+        Initialize parse cache (the directory is created on first store).
+
+        Args:
+            directory: Cache root
+            enabled: False makes every lookup a miss and every store a no-op
+        """
+        self.directory = Path(directory)
+        self.enabled = enabled
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.parse_seconds_saved = 0.0
+
+    def _paths(self, file_sha256: str, parser: str) -> Tuple[Path, Path]:
+        base = self.directory / file_sha256[:2] / f"{file_sha256}.{parser}"
+        return base.with_name(base.name + ".txt"), base.with_name(base.name + ".json")
+
+    # ------------------------------------------------------------------
+    # Reads and writes (async wrappers run file I/O off the event loop)
+    # ------------------------------------------------------------------
+
+    async def get(self, file_sha256: str, parser: str) -> Optional[ParsedDocument]:
+        """Cached parse for the file hash and parser, or None on miss"""
+        if not self.enabled:
+            return None
+        parsed = await asyncio.to_thread(self._get, file_sha256, parser)
+        if parsed is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.parse_seconds_saved += parsed.parse_seconds
+        return parsed
+
+    async def put(self, parsed: ParsedDocument) -> None:
+        """Store a parse (failures are logged, never raised)"""
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self._put, parsed)
+            self.stores += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Parse cache store failed for {parsed.file_sha256[:12]}: {e}")
+
+    def _get(self, file_sha256: str, parser: str) -> Optional[ParsedDocument]:
+        text_path, meta_path = self._paths(file_sha256, parser)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta.get("format") != CACHE_FORMAT:
+                return None
+            text = text_path.read_bytes().decode("utf-8")
+        except (OSError, ValueError):
+            return None
+        if len(text) != meta["chars"]:
+            logger.warning(f"⚠️ Parse cache entry {meta_path.name} is truncated, ignoring it")
+            return None
+
+        parsed = ParsedDocument(
+            file_sha256, parser, text, meta["pages"],
+            text_sha1s=meta["text_sha1s"], parse_seconds=meta.get("parse_seconds", 0.0)
+        )
+        parsed.cached = True
+        return parsed
+
+    def _put(self, parsed: ParsedDocument) -> None:
+        text_path, meta_path = self._paths(parsed.file_sha256, parsed.parser)
+        text_path.parent.mkdir(parents=True, exist_ok=True)
+        for path, content in (
+            (text_path, parsed.text),
+            (meta_path, json.dumps(parsed.meta(), separators=(",", ":"))),
+        ):
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp.write_bytes(content.encode("utf-8"))
+            os.replace(tmp, path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "stores": self.stores,
+            "parse_seconds_saved": round(self.parse_seconds_saved, 1),
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    """Get or create parse cache singleton"""
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
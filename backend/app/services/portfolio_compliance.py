@@ -0,0 +1,339 @@
+"""
+PORTFOLIO COMPLIANCE CALCULATOR
+===============================
+Columnar (NumPy) compliance calculation for portfolio-wide views.
+
+WHY:
+- ComplianceEngine builds one ComponentCompliance object per deal component,
+  which is right for deal pages but slow for 10k+ deal portfolio metrics
+- Here every component type is a set of parallel arrays (one row per deal),
+  so completion, status classification and rollups are a single vectorized
+  pass regardless of portfolio size
+
+FORMULAS (same as compliance_engine):
+- control_completion  = completed_requirements / total_requirements x 100
+- evidence_completion = evidence_count / required_evidence x 100
+- overall_completion  = control x 0.6 + evidence x 0.4
+- COMPLIANT if overall >= 90, NEEDS_ATTENTION if > 5 outstanding
+  requirements, else IN_PROGRESS
+
+USAGE:
+    calculator = PortfolioComplianceCalculator.from_deals(deals, COMPONENT_REQUIREMENTS)
+    result = calculator.compute()
+    result.rollup(ComponentType.JURISDICTION)
+    result.group_by(calculator.column('shariah_structure'))
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from app.models import ComplianceStatus, ComponentType, Deal
+from app.services.compliance_engine import DEFAULT_REQUIREMENTS, ROLLUP_NAMES
+
+# Status codes used in the status arrays (index into STATUS_ORDER)
+STATUS_ORDER = (
+    ComplianceStatus.COMPLIANT,
+    ComplianceStatus.NEEDS_ATTENTION,
+    ComplianceStatus.IN_PROGRESS,
+)
+COMPLIANT, NEEDS_ATTENTION, IN_PROGRESS = range(3)
+
+# Deal field holding the component ID for each component type
+COMPONENT_FIELDS = {
+    ComponentType.SHARIAH_STRUCTURE: 'shariah_structure',
+    ComponentType.JURISDICTION: 'jurisdiction',
+    ComponentType.ACCOUNTING: 'accounting_standard',
+    ComponentType.IMPACT: 'impact_framework',
+}
+
+
+def _percent(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise numerator / denominator x 100 (0 where denominator is 0)"""
+    out = np.zeros(numerator.shape, dtype=np.float64)
+    np.divide(numerator * 100.0, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _classify(overall: np.ndarray, needs_attention: np.ndarray) -> np.ndarray:
+    """Vectorized classify_compliance() -> status code array"""
+    return np.select(
+        [overall >= 90, needs_attention > 5],
+        [COMPLIANT, NEEDS_ATTENTION],
+        default=IN_PROGRESS
+    ).astype(np.int8)
+
+
+@dataclass
+class ComponentColumns:
+    """Requirement and evidence counts for one component type (one row per deal)"""
+    total_requirements: np.ndarray
+    completed_requirements: np.ndarray
+    required_evidence: np.ndarray
+    evidence_count: np.ndarray
+    # False where the deal does not use this component (e.g. no impact framework)
+    applies: np.ndarray
+
+
+@dataclass
+class ComponentResult:
+    """Vectorized compliance for one component type"""
+    columns: ComponentColumns
+    control_completion: np.ndarray
+    evidence_completion: np.ndarray
+    overall_completion: np.ndarray
+    needs_attention: np.ndarray
+    status: np.ndarray
+
+
+class PortfolioResult:
+    """Output of PortfolioComplianceCalculator.compute()"""
+
+    def __init__(
+        self,
+        deal_ids: List[str],
+        components: Dict[ComponentType, ComponentResult],
+        overall_completion: np.ndarray,
+        status: np.ndarray
+    ):
+        self.deal_ids = deal_ids
+        self.components = components
+        self.overall_completion = overall_completion
+        self.status = status
+
+    def status_counts(self) -> Dict[str, int]:
+        """Number of deals per compliance status"""
+        counts = np.bincount(self.status, minlength=len(STATUS_ORDER))
+        return {s.value: int(counts[i]) for i, s in enumerate(STATUS_ORDER)}
+
+    def rollup(self, component_type: ComponentType) -> Dict[str, Any]:
+        """Portfolio-wide compliance for a component type (summed counts)"""
+        result = self.components[component_type]
+        cols = result.columns
+        applies = cols.applies
+
+        total = int(cols.total_requirements[applies].sum())
+        completed = int(cols.completed_requirements[applies].sum())
+        required = int(cols.required_evidence[applies].sum())
+        evidence = int(cols.evidence_count[applies].sum())
+        needs_attention = int(result.needs_attention[applies].sum())
+
+        control = _percent(np.array([completed]), np.array([total]))
+        evidence_pct = _percent(np.array([evidence]), np.array([required]))
+        overall = control * 0.6 + evidence_pct * 0.4
+        status = _classify(overall, np.array([needs_attention]))[0]
+        component_id, component_name = ROLLUP_NAMES[component_type]
+
+        return {
+            'component_type': component_type.value,
+            'component_id': component_id,
+            'component_name': component_name,
+            'deal_count': int(applies.sum()),
+            'total_requirements': total,
+            'completed_requirements': completed,
+            'evidence_count': evidence,
+            'required_evidence_count': required,
+            'control_completion': float(control[0]),
+            'evidence_completion': float(evidence_pct[0]),
+            'overall_completion': float(overall[0]),
+            'status': STATUS_ORDER[status].value,
+            'needs_attention_count': needs_attention,
+        }
+
+    def group_by(self, keys: np.ndarray) -> Dict[str, Dict[str, Any]]:
+        """
+        Deal count, mean completion and status counts per group.
+
+        Args:
+            keys: Group key per deal (same order as deal_ids)
+        """
+        if len(keys) == 0:
+            return {}
+        labels, inverse = np.unique(keys.astype(str), return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(labels))
+        completion = np.bincount(inverse, weights=self.overall_completion, minlength=len(labels))
+        by_status = np.zeros((len(labels), len(STATUS_ORDER)), dtype=np.int64)
+        np.add.at(by_status, (inverse, self.status), 1)
+
+        return {
+            str(label): {
+                'deal_count': int(counts[i]),
+                'average_completion': float(completion[i] / counts[i]),
+                'by_status': {s.value: int(by_status[i, j]) for j, s in enumerate(STATUS_ORDER)},
+            }
+            for i, label in enumerate(labels)
+        }
+
+
+class PortfolioComplianceCalculator:
+    """
+    Columnar compliance calculator.
+
+    Holds per-deal inputs as NumPy arrays; compute() evaluates every deal and
+    component at once.
+    """
+
+    def __init__(
+        self,
+        deal_ids: Sequence[str],
+        columns: Dict[ComponentType, ComponentColumns],
+        overdue: Optional[np.ndarray] = None,
+        attributes: Optional[Dict[str, np.ndarray]] = None
+    ):
+        """
+        Initialize calculator.
+
+        Args:
+            deal_ids: Deal IDs (row order for every array)
+            columns: Requirement/evidence counts per component type
+            overdue: Optional bool array - deal has overdue open tasks
+            attributes: Optional extra per-deal columns for grouping
+        """
+        self.deal_ids = list(deal_ids)
+        self.columns = columns
+        self.overdue = overdue if overdue is not None else np.zeros(len(self.deal_ids), dtype=bool)
+        self.attributes = attributes or {}
+
+    def __len__(self) -> int:
+        return len(self.deal_ids)
+
+    def subset(self, mask: np.ndarray) -> "PortfolioComplianceCalculator":
+        """Calculator over the deals selected by a boolean mask"""
+        columns = {
+            component_type: ComponentColumns(
+                total_requirements=cols.total_requirements[mask],
+                completed_requirements=cols.completed_requirements[mask],
+                required_evidence=cols.required_evidence[mask],
+                evidence_count=cols.evidence_count[mask],
+                applies=cols.applies[mask]
+            )
+            for component_type, cols in self.columns.items()
+        }
+        return PortfolioComplianceCalculator(
+            [deal_id for deal_id, keep in zip(self.deal_ids, mask) if keep],
+            columns,
+            self.overdue[mask],
+            {name: values[mask] for name, values in self.attributes.items()}
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        """Per-deal attribute column (e.g. 'shariah_structure', 'status')"""
+        return self.attributes[name]
+
+    @classmethod
+    def from_deals(
+        cls,
+        deals: Iterable[Deal],
+        requirements: Dict[str, Dict],
+        overdue_deal_ids: Iterable[str] = ()
+    ) -> "PortfolioComplianceCalculator":
+        """
+        Build columns from deals.
+
+        Requirement counts are looked up once per distinct component ID and
+        broadcast to deals; completion and evidence are derived exactly as
+        ComplianceEngine does (deal completion, Guardian evidence artifacts).
+
+        Args:
+            deals: Deals to evaluate
+            requirements: COMPONENT_REQUIREMENTS catalogue
+            overdue_deal_ids: Deals with overdue open tasks
+        """
+        deals = list(deals)
+        n = len(deals)
+        overdue_ids = set(overdue_deal_ids)
+
+        completion = np.fromiter(
+            ((d.overall_completion or 0.0) for d in deals), dtype=np.float64, count=n
+        )
+        completion = np.clip(completion / 100.0, 0.0, 1.0)
+
+        artifacts = np.array(
+            [
+                (
+                    bool(d.guardian_policy_id),
+                    bool(d.guardian_transaction_id),
+                    d.has_certificate and d.certificate_status == 'issued',
+                    d.has_token,
+                )
+                for d in deals
+            ],
+            dtype=bool
+        ).reshape(n, 4)
+        evidence = artifacts.mean(axis=1) if n else np.zeros(0)
+
+        attributes = {
+            field: np.array([getattr(d, field) or 'none' for d in deals], dtype=object)
+            for field in ('shariah_structure', 'jurisdiction', 'accounting_standard',
+                          'impact_framework', 'status', 'originator')
+        }
+        attributes['created_at'] = np.array([d.created_at for d in deals], dtype='datetime64[us]')
+
+        columns = {}
+        for component_type, field in COMPONENT_FIELDS.items():
+            ids = attributes[field]
+            default_total, default_evidence = DEFAULT_REQUIREMENTS[component_type]
+            if n:
+                unique_ids, inverse = np.unique(ids.astype(str), return_inverse=True)
+            else:
+                unique_ids, inverse = np.array([], dtype=str), np.zeros(0, dtype=np.int64)
+            lookup_total = np.array(
+                [requirements.get(c, {}).get('total_requirements', default_total) for c in unique_ids],
+                dtype=np.int64
+            )
+            lookup_evidence = np.array(
+                [requirements.get(c, {}).get('required_evidence', default_evidence) for c in unique_ids],
+                dtype=np.int64
+            )
+            total = lookup_total[inverse] if n else np.zeros(0, dtype=np.int64)
+            required = lookup_evidence[inverse] if n else np.zeros(0, dtype=np.int64)
+            applies = ids != 'none' if component_type == ComponentType.IMPACT else np.ones(n, dtype=bool)
+
+            columns[component_type] = ComponentColumns(
+                total_requirements=total,
+                completed_requirements=(total * completion).astype(np.int64),
+                required_evidence=required,
+                evidence_count=(required * evidence).astype(np.int64),
+                applies=applies
+            )
+
+        overdue = np.array([d.deal_id in overdue_ids for d in deals], dtype=bool)
+        return cls([d.deal_id for d in deals], columns, overdue, attributes)
+
+    def compute(self) -> PortfolioResult:
+        """Evaluate completion and status for every deal and component"""
+        n = len(self)
+        components = {}
+        overall_sum = np.zeros(n, dtype=np.float64)
+        component_count = np.zeros(n, dtype=np.int64)
+        any_attention = np.zeros(n, dtype=bool)
+
+        for component_type, cols in self.columns.items():
+            control = _percent(cols.completed_requirements, cols.total_requirements)
+            evidence = _percent(cols.evidence_count, cols.required_evidence)
+            overall = control * 0.6 + evidence * 0.4
+            needs_attention = cols.total_requirements - cols.completed_requirements
+            status = _classify(overall, needs_attention)
+
+            components[component_type] = ComponentResult(
+                columns=cols,
+                control_completion=control,
+                evidence_completion=evidence,
+                overall_completion=overall,
+                needs_attention=needs_attention,
+                status=status
+            )
+
+            overall_sum += np.where(cols.applies, overall, 0.0)
+            component_count += cols.applies
+            any_attention |= cols.applies & (status == NEEDS_ATTENTION)
+
+        deal_overall = _percent(overall_sum, component_count * 100.0) if n else np.zeros(0)
+        deal_status = np.select(
+            [self.overdue | any_attention, deal_overall >= 90],
+            [NEEDS_ATTENTION, COMPLIANT],
+            default=IN_PROGRESS
+        ).astype(np.int8)
+
+        return PortfolioResult(self.deal_ids, components, deal_overall, deal_status)
@@ -0,0 +1,80 @@
+"""
+RESPONSE BUFFER
+===============
+Chunk accumulator shared by every layer of one streamed Claude response.
+
+WHY:
+- A 16k-token answer arrives as thousands of small text deltas; building
+  the text with `text += chunk` copies the whole response on every delta
+  wherever CPython cannot resize the string in place (attributes such as
+  execution.current_response), which is quadratic in the response length
+- ClaudeService, WorkflowEngine and the session stream each kept their own
+  copy of the same text
+
+DESIGN:
+- Chunks are appended to a list (amortized O(1)); the character count is
+  kept incrementally for logs and progress metrics
+- The text is joined lazily, only when it is read (periodic progress saves,
+  completion); the joined prefix is memoized so a later read only joins the
+  chunks appended since
+- mark() / text_since() give the text of one turn (e.g. the partial answer
+  before an interrupt) without a second accumulator
+
+USAGE:
+    buffer = ResponseBuffer()
+    async for chunk in claude_service.stream_generate(..., buffer=buffer):
+        yield chunk                  # ClaudeService appended it already
+    execution.current_response = buffer.text
+"""
+
+from typing import List, Optional
+
+
+class ResponseBuffer:
+    """Append-only list of response chunks with lazily joined text"""
+
+    def __init__(self, initial: Optional[str] = None):
+        """
+        Initialize response buffer.
+
+        Args:
+            initial: Text already accumulated (e.g. a resumed execution)
+        """
+        self.chunks: List[str] = []
+        self._chars = 0
+        self._text = ""
+        self._joined = 0  # Number of chunks included in self._text
+        if initial:
+            self.append(initial)
+
+    def append(self, chunk: str) -> None:
+        """Add one chunk"""
+        self.chunks.append(chunk)
+        self._chars += len(chunk)
+
+    def __len__(self) -> int:
+        """Characters accumulated so far"""
+        return self._chars
+
+    def __bool__(self) -> bool:
+        return self._chars > 0
+
+    @property
+    def text(self) -> str:
+        """Full text (joined on demand)"""
+        if self._joined < len(self.chunks):
+            self._text = "".join([self._text, *self.chunks[self._joined:]])
+            self._joined = len(self.chunks)
+        return self._text
+
+    def mark(self) -> int:
+        """Position to pass to text_since() or chunks_since() later"""
+        return len(self.chunks)
+
+    def chunks_since(self, mark: int) -> List[str]:
+        """Chunks appended after mark"""
+        return self.chunks[mark:]
+
+    def text_since(self, mark: int) -> str:
+        """Text appended after mark"""
+        return "".join(self.chunks[mark:])
@@ -0,0 +1,283 @@
+"""
+SESSION HISTORY MANAGER
+=======================
+Keeps the message history sent to Claude for a session within a token budget.
+
+WHY:
+- The Messages API is stateless, so every /stream resends the whole
+  conversation; input tokens (and latency) grow with every turn and the
+  total cost of a session grows quadratically
+- Long interactive reviews easily outgrow the useful context window
+
+DESIGN:
+- Every Message carries an estimated token_count (computed once on creation)
+- The first user message is the pinned head: knowledge-graph context +
+  the original task + a running summary of compacted turns
+- Messages after the head are sent verbatim from session.history_offset on
+- When head + window exceed the budget, the oldest turns are folded into the
+  summary until the total is under the compaction target (a fraction of the
+  budget), so compaction happens once every several turns rather than on
+  every turn and the prompt-cache prefix stays stable in between
+- The system prompt is always sent separately and is never compacted
+
+SUMMARIZATION:
+- SESSION_HISTORY_SUMMARIZE=true: compacted turns are summarized by Claude
+  (incrementally: previous summary + newly compacted turns)
+- Otherwise (or if summarization fails) an extractive digest of the
+  compacted turns is kept instead
+
+CONFIGURATION:
+- SESSION_HISTORY_TOKEN_BUDGET (default 60000 input tokens)
+- SESSION_HISTORY_COMPACT_RATIO target after compaction (default 0.6)
+- SESSION_HISTORY_SUMMARIZE (default true)
+- SESSION_SUMMARY_MAX_TOKENS (default 1024)
+"""
+
+import logging
+import math
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("SESSION_HISTORY_TOKEN_BUDGET", "60000"))
+DEFAULT_COMPACT_RATIO = float(os.getenv("SESSION_HISTORY_COMPACT_RATIO", "0.6"))
+DEFAULT_SUMMARY_MAX_TOKENS = int(os.getenv("SESSION_SUMMARY_MAX_TOKENS", "1024"))
+SUMMARIZE_WITH_CLAUDE = os.getenv("SESSION_HISTORY_SUMMARIZE", "true").lower() == "true"
+
+# Conservative characters-per-token for English/Arabic-transliterated prose
+# (over-estimating keeps requests safely under the budget)
+CHARS_PER_TOKEN = 3.5
+
+# Per-message overhead of the Messages API framing
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Characters of each compacted message kept by the extractive digest
+DIGEST_CHARS_PER_MESSAGE = 240
+
+SUMMARY_SYSTEM_PROMPT = (
+    "You maintain a running summary of an Islamic finance compliance review "
+    "conversation. Merge the previous summary with the new turns into one "
+    "concise summary. Keep every decision, requirement, AAOIFI standard "
+    "reference, figure and open question; drop pleasantries and repetition. "
+    "Write plain markdown bullet points, no preamble."
+)
+
+Summarizer = Callable[[Optional[str], List["Message"]], Awaitable[str]]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimated token count of a piece of text"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def format_head(context: Optional[str], first_message: str, summary: Optional[str]) -> str:
+    """Pinned first user turn: context, original task, summary of compacted turns"""
+    parts = []
+    if context:
+        parts.append(context)
+    parts.append(first_message)
+    if summary:
+        parts.append(f"## Summary of earlier conversation\n\n{summary}")
+    return "\n\n---\n\n".join(parts)
+
+
+async def extractive_summary(previous: Optional[str], messages: List["Message"]) -> str:
+    """
+    Digest of compacted turns without an LLM call.
+
+    Keeps the opening of each compacted message; the oldest lines are dropped
+    first once the digest exceeds SESSION_SUMMARY_MAX_TOKENS.
+    """
+    lines = previous.splitlines() if previous else []
+    for message in messages:
+        text = " ".join(message.content.split())
+        if len(text) > DIGEST_CHARS_PER_MESSAGE:
+            text = text[:DIGEST_CHARS_PER_MESSAGE].rstrip() + "…"
+        lines.append(f"- {message.role.value}: {text}")
+
+    max_chars = int(DEFAULT_SUMMARY_MAX_TOKENS * CHARS_PER_TOKEN)
+    while len(lines) > 1 and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+async def claude_summary(previous: Optional[str], messages: List["Message"]) -> str:
+    """Incremental summary of compacted turns written by Claude"""
+    from app.services.claude_service import get_claude_service
+
+    transcript = "\n\n".join(
+        f"**{message.role.value}:** {message.content}" for message in messages
+    )
+    user_message = (
+        f"## Previous summary\n\n{previous or '(none)'}\n\n"
+        f"## New turns\n\n{transcript}\n\n"
+        f"Write the updated summary in at most {DEFAULT_SUMMARY_MAX_TOKENS} tokens."
+    )
+    result = await get_claude_service().generate(
+        system_prompt=SUMMARY_SYSTEM_PROMPT,
+        user_message=user_message,
+        metadata={"purpose": "session_history_summary"}
+    )
+    return result["text"].strip()
+
+
+class SessionHistoryManager:
+    """
+    Builds the Claude message list for a session within a token budget.
+
+    Usage:
+        manager = get_session_history_manager()
+        messages = await manager.build_messages(session, context=context)
+    """
+
+    def __init__(
+        self,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        compact_ratio: float = DEFAULT_COMPACT_RATIO,
+        summarizer: Optional[Summarizer] = None
+    ):
+        """
+        Initialize history manager.
+
+        Args:
+            token_budget: Maximum estimated input tokens per request
+                (system prompt + messages)
+            compact_ratio: Fraction of the budget to compact down to
+            summarizer: Coroutine (previous_summary, messages) -> summary;
+                defaults to Claude or extractive per SESSION_HISTORY_SUMMARIZE
+        """
+        if not 0 < compact_ratio <= 1:
+            raise ValueError("compact_ratio must be in (0, 1]")
+
+        self.token_budget = token_budget
+        self.compact_ratio = compact_ratio
+        self.summarizer = summarizer or (claude_summary if SUMMARIZE_WITH_CLAUDE else extractive_summary)
+
+        # Metrics
+        self.compactions = 0
+        self.compacted_messages = 0
+        self.summary_failures = 0
+
+    def estimate_request_tokens(self, session, context: Optional[str] = None) -> int:
+        """Estimated input tokens of the next request as the history stands"""
+        return self._head_tokens(session, context) + self._window_tokens(session, session.history_offset)
+
+    async def build_messages(self, session, context: Optional[str] = None) -> List[Dict[str, str]]:
+        """
+        Messages for the next Claude request, compacting old turns if needed.
+
+        Args:
+            session: SessionState (history_offset/history_summary are updated
+                in place when turns are compacted)
+            context: Knowledge-graph context pinned into the first user turn
+
+        Returns:
+            Anthropic-format message list
+        """
+        messages = session.messages
+        if not messages:
+            return []
+
+        if messages[0].role.value != "user":
+            # No user head to pin context/summary to - send as-is
+            return [{"role": m.role.value, "content": m.content} for m in messages]
+
+        if self.estimate_request_tokens(session, context) > self.token_budget:
+            await self._compact(session, context)
+
+        head = format_head(context, messages[0].content, session.history_summary)
+        return [{"role": "user", "content": head}] + [
+            {"role": m.role.value, "content": m.content}
+            for m in messages[session.history_offset:]
+        ]
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _head_tokens(self, session, context: Optional[str]) -> int:
+        return (
+            estimate_tokens(session.system_prompt)
+            + estimate_tokens(context)
+            + session.messages[0].token_count
+            + estimate_tokens(session.history_summary)
+            + MESSAGE_OVERHEAD_TOKENS
+        )
+
+    def _window_tokens(self, session, offset: int) -> int:
+        return sum(m.token_count + MESSAGE_OVERHEAD_TOKENS for m in session.messages[offset:])
+
+    def _choose_offset(self, session, context: Optional[str]) -> int:
+        """
+        Earliest cut that brings the request under the compaction target.
+
+        The window must start with an assistant turn (the head is a user
+        turn) and always keeps the latest exchange.
+        """
+        messages = session.messages
+        candidates = [
+            i for i in range(session.history_offset, len(messages))
+            if messages[i].role.value == "assistant"
+        ]
+        if not candidates:
+            return session.history_offset
+
+        target = self.token_budget * self.compact_ratio
+        # Rough allowance for the summary growing by the compacted turns
+        head = self._head_tokens(session, context) + DEFAULT_SUMMARY_MAX_TOKENS // 2
+        for i in candidates:
+            if head + self._window_tokens(session, i) <= target:
+                return i
+        return candidates[-1]
+
+    async def _compact(self, session, context: Optional[str]) -> None:
+        before = self.estimate_request_tokens(session, context)
+        offset = self._choose_offset(session, context)
+        if offset <= session.history_offset:
+            return
+
+        evicted = session.messages[session.history_offset:offset]
+        try:
+            summary = await self.summarizer(session.history_summary, evicted)
+        except Exception as e:
+            logger.warning(f"⚠️ History summarization failed, keeping extractive digest: {e}")
+            self.summary_failures += 1
+            summary = await extractive_summary(session.history_summary, evicted)
+
+        session.history_summary = summary
+        session.history_offset = offset
+        self.compactions += 1
+        self.compacted_messages += len(evicted)
+
+        logger.info(
+            f"🧹 Compacted session {session.session_id}: {len(evicted)} messages summarized, "
+            f"~{before} → ~{self.estimate_request_tokens(session, context)} tokens "
+            f"(budget {self.token_budget})"
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        """Compaction metrics for monitoring"""
+        return {
+            "token_budget": self.token_budget,
+            "compactions": self.compactions,
+            "compacted_messages": self.compacted_messages,
+            "summary_failures": self.summary_failures,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_session_history_manager: Optional[SessionHistoryManager] = None
+
+
+def get_session_history_manager() -> SessionHistoryManager:
+    """Get or create history manager singleton"""
+    global _session_history_manager
+    if _session_history_manager is None:
+        _session_history_manager = SessionHistoryManager()
+    return _session_history_manager
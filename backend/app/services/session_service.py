@@ -10,15 +10,19 @@ WHY SESSION STORAGE:
 - Follow Anthropic Agent SDK patterns
 
 ARCHITECTURE:
-- In-memory storage (dict) for MVP (easy to upgrade to Redis)
+- Pluggable state backend (state_backends.py): bounded in-memory store by
+  default (idle/over-budget sessions spill to disk), Redis for multi-worker
+  deployments (STATE_BACKEND=redis)
 - Session contains: system_prompt, messages[], metadata
 - Messages follow Anthropic format: {"role": "user|assistant", "content": "..."}
 - Stateful sessions but stateless Claude API (send full history each time)
+- Long histories are compacted to a token budget (see session_history.py)
 
 FLOW:
 1. Create session → Get session_id
 2. Stream session → Claude processes full message history
-3. Interrupt session → Append user message, ready for next stream
+3. Interrupt session → Append user message, publish interrupt (stops a
+   stream still running on any worker), ready for next stream
 4. Resume session → Continue with updated history
 """
 
@@ -29,6 +33,9 @@ from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel
 
+from app.services.session_history import estimate_tokens, get_session_history_manager
+from app.services.state_backends import InterruptSubscription, StateBackend, create_state_backend
+
 logger = logging.getLogger(__name__)
 
 
@@ -46,14 +53,18 @@ class Message(BaseModel):
     - role: "user" or "assistant" (must alternate)
     - content: message text
     - timestamp: when message was created (for debugging)
+    - token_count: estimated tokens of content (for history budgeting)
     """
     role: MessageRole
     content: str
     timestamp: str = None
+    token_count: int = 0
 
     def __init__(self, **data):
         if 'timestamp' not in data:
             data['timestamp'] = datetime.now().isoformat()
+        if not data.get('token_count'):
+            data['token_count'] = estimate_tokens(data.get('content'))
         super().__init__(**data)
 
 
@@ -96,6 +107,13 @@ class SessionState(BaseModel):
     context_document_ids: List[str] = []
     user_notes: Dict[str, str] = {}
 
+    # Pinned knowledge-graph context (retrieved once, resent every turn)
+    pinned_context: Optional[str] = None
+
+    # History compaction (see SessionHistoryManager)
+    history_summary: Optional[str] = None  # Summary of compacted turns
+    history_offset: int = 1                # First message sent verbatim after the head
+
     # Execution tracking
     execution_id: Optional[str] = None  # Link to WorkflowEngine execution
     error_message: Optional[str] = None
@@ -103,27 +121,33 @@ class SessionState(BaseModel):
 
 class SessionService:
     """
-    In-memory session storage and management.
-
-    PRODUCTION UPGRADE PATH:
-    - Replace self.sessions dict with Redis
-    - Use Redis TTL for automatic cleanup
-    - Enable multi-server deployment
-    - Persist sessions across restarts
-
-    For MVP, in-memory is sufficient:
-    - Simple to understand and debug
-    - No Redis dependency
-    - Fast access
-    - Easy to test
+    Session storage and management on a pluggable state backend.
+
+    BACKENDS (STATE_BACKEND):
+    - memory (default): bounded in-process store - simple, no Redis
+      dependency, single uvicorn worker only
+    - redis: sessions and interrupts shared by every worker and node,
+      Redis TTL for automatic cleanup
+
+    Sessions are loaded, modified and written back with save_session(), so
+    every change is visible to other workers.
     """
 
-    def __init__(self):
-        """Initialize session storage"""
-        self.sessions: Dict[str, SessionState] = {}
-        logger.info("🔧 Session service initialized (in-memory storage)")
+    def __init__(self, backend: Optional[StateBackend] = None):
+        """
+        Initialize session storage.
 
-    def create_session(
+        Args:
+            backend: State backend (defaults to STATE_BACKEND)
+        """
+        self.sessions: StateBackend[SessionState] = backend or create_state_backend(
+            "sessions",
+            SessionState,
+            in_flight=lambda session: session.status == SessionStatus.STREAMING
+        )
+        logger.info(f"🔧 Session service initialized ({type(self.sessions).__name__})")
+
+    async def create_session(
         self,
         template_id: str,
         system_prompt: str,
@@ -174,7 +198,7 @@ class SessionService:
             execution_id=execution_id
         )
 
-        self.sessions[session_id] = session
+        await self.sessions.put(session_id, session)
 
         logger.info(
             f"✅ Created session: {session_id} "
@@ -183,7 +207,7 @@ class SessionService:
 
         return session
 
-    def get_session(self, session_id: str) -> Optional[SessionState]:
+    async def get_session(self, session_id: str) -> Optional[SessionState]:
         """
         Get session by ID.
 
@@ -193,14 +217,24 @@ class SessionService:
         Returns:
             SessionState or None if not found
         """
-        session = self.sessions.get(session_id)
+        session = await self.sessions.get(session_id)
         if session:
             logger.debug(f"📖 Retrieved session: {session_id}")
         else:
             logger.warning(f"⚠️ Session not found: {session_id}")
         return session
 
-    def append_message(
+    async def save_session(self, session: SessionState) -> None:
+        """
+        Write back a session modified outside this service.
+
+        Args:
+            session: Session previously returned by get_session()
+        """
+        session.last_updated = datetime.now().isoformat()
+        await self.sessions.put(session.session_id, session)
+
+    async def append_message(
         self,
         session_id: str,
         role: MessageRole,
@@ -221,7 +255,7 @@ class SessionService:
         Returns:
             True if message appended, False if session not found
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return False
 
@@ -248,6 +282,7 @@ class SessionService:
         )
         session.messages.append(message)
         session.last_updated = datetime.now().isoformat()
+        await self.sessions.put(session_id, session)
 
         logger.info(
             f"➕ Appended {role} message to session {session_id} "
@@ -256,7 +291,43 @@ class SessionService:
 
         return True
 
-    def update_status(
+    async def add_interrupt_message(self, session_id: str, content: str) -> bool:
+        """
+        Append a user interrupt and notify a running stream on any worker.
+
+        If the interrupted stream never produced a reply (last message is
+        still the user's), the interrupt is folded into that pending user
+        turn instead of breaking role alternation.
+
+        Args:
+            session_id: Session identifier
+            content: Interrupt message text
+
+        Returns:
+            True if recorded, False if session not found
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            return False
+
+        if session.messages and session.messages[-1].role == MessageRole.USER:
+            pending = session.messages[-1]
+            session.messages[-1] = Message(
+                role=MessageRole.USER,
+                content=f"{pending.content}\n\n{content}",
+                timestamp=pending.timestamp
+            )
+            session.status = SessionStatus.INTERRUPTED
+            await self.save_session(session)
+            logger.info(f"➕ Folded interrupt into pending user turn of session {session_id}")
+        else:
+            await self.append_message(session_id, MessageRole.USER, content)
+            await self.update_status(session_id, SessionStatus.INTERRUPTED)
+
+        await self.sessions.publish_interrupt(session_id, {"message": content})
+        return True
+
+    async def update_status(
         self,
         session_id: str,
         status: SessionStatus,
@@ -273,7 +344,7 @@ class SessionService:
         Returns:
             True if updated, False if session not found
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return False
 
@@ -283,11 +354,13 @@ class SessionService:
         if error_message:
             session.error_message = error_message
 
+        await self.sessions.put(session_id, session)
+
         logger.info(f"📊 Session {session_id} status → {status}")
 
         return True
 
-    def get_messages_for_claude(
+    async def get_messages_for_claude(
         self,
         session_id: str
     ) -> Optional[List[Dict[str, str]]]:
@@ -307,7 +380,7 @@ class SessionService:
         Returns:
             List of message dicts or None if session not found
         """
-        session = self.get_session(session_id)
+        session = await self.get_session(session_id)
         if not session:
             return None
 
@@ -317,7 +390,40 @@ class SessionService:
             for msg in session.messages
         ]
 
-    def delete_session(self, session_id: str) -> bool:
+    async def build_messages_for_claude(
+        self,
+        session_id: str,
+        context: Optional[str] = None
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Get messages for the next Claude request within the token budget.
+
+        The first user turn carries the pinned context, the original task and
+        a summary of compacted turns; later turns are sent verbatim.
+
+        Args:
+            session_id: Session identifier
+            context: Knowledge-graph context to pin into the first user turn
+
+        Returns:
+            List of message dicts or None if session not found
+        """
+        session = await self.get_session(session_id)
+        if not session:
+            return None
+
+        offset = session.history_offset
+        messages = await get_session_history_manager().build_messages(session, context=context)
+        if session.history_offset != offset:
+            # Turns were compacted - persist the summary and new offset
+            await self.sessions.put(session_id, session)
+        return messages
+
+    def subscribe_interrupts(self, session_id: str) -> InterruptSubscription:
+        """Interrupts for a session (async context manager)"""
+        return self.sessions.subscribe(session_id)
+
+    async def delete_session(self, session_id: str) -> bool:
         """
         Delete a session (cleanup).
 
@@ -327,19 +433,18 @@ class SessionService:
         Returns:
             True if deleted, False if not found
         """
-        if session_id in self.sessions:
-            del self.sessions[session_id]
+        if await self.sessions.delete(session_id):
             logger.info(f"🗑️ Deleted session: {session_id}")
             return True
         return False
 
-    def get_session_count(self) -> int:
+    async def get_session_count(self) -> int:
         """Get total number of active sessions"""
-        return len(self.sessions)
+        return await self.sessions.count()
 
-    def list_sessions(self) -> List[str]:
+    async def list_sessions(self) -> List[str]:
         """Get list of all session IDs"""
-        return list(self.sessions.keys())
+        return await self.sessions.keys()
 
 
 # ============================================================================
@@ -0,0 +1,225 @@
+"""
+SSE ENCODER
+===========
+Server-Sent Events framing shared by the workflow and session streams.
+
+WHY:
+- One SSE frame per Claude text delta means one HTTP body write (and
+  syscall) per token, each carrying ~40 bytes of framing for ~4 bytes of text
+- Hand-built f-string JSON needs manual escaping, which is easy to get wrong
+  (control characters, backslashes, newlines in error messages)
+
+DESIGN:
+- Payloads are encoded with orjson when installed (json otherwise); frames
+  are bytes, ready for StreamingResponse
+- Chunk text is batched into one `chunk` frame until SSE_FLUSH_BYTES are
+  pending or SSE_FLUSH_MS has passed since the first pending chunk; the
+  interval also flushes while Claude is idle, so no text is held back
+- Any other event (status, error, done) flushes pending text first, so
+  event order is preserved
+
+EVENT IDS / RESUME:
+- Every chunk frame carries `id: <offset>` = characters of response text
+  delivered up to and including that frame
+- A reconnecting client sends `Last-Event-ID: <offset>` (EventSource does
+  this automatically) and the endpoint resumes from that character offset
+  instead of re-sending (or re-generating) text the client already has
+
+CONFIGURATION:
+- SSE_FLUSH_MS (default 50; 0 sends every chunk as its own frame)
+- SSE_FLUSH_BYTES (default 2048)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+DEFAULT_FLUSH_MS = float(os.getenv("SSE_FLUSH_MS", "50"))
+DEFAULT_FLUSH_BYTES = int(os.getenv("SSE_FLUSH_BYTES", "2048"))
+
+
+def encode_json(payload: Any) -> bytes:
+    """Compact UTF-8 JSON (newlines and quotes always escaped)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def format_event(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> bytes:
+    """One SSE frame"""
+    head = f"id: {event_id}\nevent: {event}\ndata: " if event_id is not None else f"event: {event}\ndata: "
+    return head.encode() + encode_json(data) + b"\n\n"
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Character offset from a Last-Event-ID header (None if absent or invalid)"""
+    if not value:
+        return None
+    try:
+        offset = int(value.strip())
+    except ValueError:
+        return None
+    return offset if offset >= 0 else None
+
+
+class SSEEncoder:
+    """
+    Frames one stream: batched chunk events with offset ids, plus other events.
+
+    Usage:
+        encoder = SSEEncoder()
+        yield encoder.event("status", {"status": "starting"})
+        async for frame in encoder.stream(chunks):
+            yield frame
+        yield encoder.event("done", {"execution_id": execution_id})
+    """
+
+    def __init__(
+        self,
+        flush_ms: float = DEFAULT_FLUSH_MS,
+        flush_bytes: int = DEFAULT_FLUSH_BYTES,
+        offset: int = 0
+    ):
+        """
+        Initialize encoder.
+
+        Args:
+            flush_ms: Longest time chunk text is held back (0 disables batching)
+            flush_bytes: Pending text size that forces a frame
+            offset: Characters the client already has (resume)
+        """
+        self.flush_interval = flush_ms / 1000
+        self.flush_bytes = flush_bytes
+        self.offset = offset
+
+        self._pending: List[str] = []
+        self._pending_bytes = 0
+        self._pending_since: Optional[float] = None
+
+        # Metrics
+        self.chunks = 0
+        self.frames = 0
+        self.bytes = 0
+
+    # ------------------------------------------------------------------
+    # Frames
+    # ------------------------------------------------------------------
+
+    def event(self, event: str, data: Dict[str, Any]) -> bytes:
+        """A non-chunk event, preceded by any pending chunk text"""
+        return self.flush() + self._emit(format_event(event, data))
+
+    def chunk(self, text: str) -> bytes:
+        """Add chunk text; returns a frame when a flush is due (else b"")"""
+        if not text:
+            return b""
+        self.chunks += 1
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+        self._pending.append(text)
+        self._pending_bytes += len(text.encode())
+
+        if self._pending_bytes >= self.flush_bytes or self._flush_timeout() == 0:
+            return self.flush()
+        return b""
+
+    def flush(self) -> bytes:
+        """Frame for all pending chunk text (b"" if none)"""
+        if not self._pending:
+            return b""
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._pending_since = None
+        self.offset += len(text)
+        return self._emit(format_event("chunk", {"text": text}, event_id=str(self.offset)))
+
+    def resume(self, text: str) -> bytes:
+        """Frame for the part of text after the client's offset (b"" if none)"""
+        tail = text[self.offset:]
+        if not tail:
+            return b""
+        self.offset += len(tail)
+        self.chunks += 1
+        return self._emit(format_event("chunk", {"text": tail}, event_id=str(self.offset)))
+
+    def _emit(self, frame: bytes) -> bytes:
+        self.frames += 1
+        self.bytes += len(frame)
+        return frame
+
+    def _flush_timeout(self) -> Optional[float]:
+        """Seconds until pending text must be flushed (None if nothing pending)"""
+        if self._pending_since is None:
+            return None
+        return max(0.0, self.flush_interval - (time.monotonic() - self._pending_since))
+
+    # ------------------------------------------------------------------
+    # Streams
+    # ------------------------------------------------------------------
+
+    async def stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """
+        Chunk frames for a text stream.
+
+        While text is pending, the next chunk is awaited with a timeout so the
+        flush interval also applies when the source goes quiet.
+        """
+        iterator = chunks.__aiter__()
+        next_chunk: Optional[asyncio.Task] = None
+        try:
+            while True:
+                timeout = self._flush_timeout()
+                if timeout is None and next_chunk is None:
+                    # Nothing pending - wait for the source directly
+                    try:
+                        text = await iterator.__anext__()
+                    except StopAsyncIteration:
+                        break
+                else:
+                    if next_chunk is None:
+                        next_chunk = asyncio.ensure_future(iterator.__anext__())
+                    done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+                    if not done:
+                        yield self.flush()
+                        continue
+                    task, next_chunk = next_chunk, None
+                    try:
+                        text = task.result()
+                    except StopAsyncIteration:
+                        break
+
+                frame = self.chunk(text)
+                if frame:
+                    yield frame
+        finally:
+            if next_chunk is not None:
+                next_chunk.cancel()
+                await asyncio.gather(next_chunk, return_exceptions=True)
+            # Client gone or source failed - close the source (e.g. the Claude stream) now
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+        frame = self.flush()
+        if frame:
+            yield frame
+
+    def get_stats(self) -> Dict[str, int]:
+        """Framing metrics for this stream"""
+        return {
+            "chunks": self.chunks,
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "offset": self.offset,
+        }
@@ -0,0 +1,392 @@
+"""
+STATE BACKENDS
+==============
+Pluggable storage for sessions and workflow executions, plus interrupt
+delivery, so the API can run with several uvicorn workers.
+
+BACKENDS:
+- InMemoryStateBackend: BoundedStateStore in this process (default; single
+  worker only - state and interrupts are invisible to other workers)
+- RedisStateBackend: any Redis-protocol server (Redis, Valkey, KeyDB;
+  fakeredis for local testing); state is shared by every worker/node
+
+INTERRUPTS:
+- Published on a per-entry channel and delivered to subscribers (the worker
+  streaming that execution/session), instead of streams polling `status`
+- In-memory: asyncio queues; Redis: PUBLISH / SUBSCRIBE
+
+CONSISTENCY:
+- Values are Pydantic models; services load, modify and put() them back.
+  With Redis, concurrent writers to the same entry are last-write-wins, so
+  delivery of interrupts relies on pub/sub, not on the stored status
+
+CONFIGURATION:
+    STATE_BACKEND=memory   # default
+    STATE_BACKEND=redis    # uses REDIS_URL (default redis://localhost:6379/0)
+    STATE_REDIS_PREFIX     # key/channel prefix (default ifw)
+    STATE_REDIS_TTL        # seconds an untouched entry is kept (default 86400)
+"""
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Generic, List, Optional, Set, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.services.state_store import BoundedStateStore
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+DEFAULT_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+DEFAULT_REDIS_PREFIX = os.getenv("STATE_REDIS_PREFIX", "ifw")
+DEFAULT_REDIS_TTL = int(os.getenv("STATE_REDIS_TTL", "86400"))
+
+
+# ============================================================================
+# INTERFACES
+# ============================================================================
+
+class InterruptSubscription(ABC):
+    """
+    Interrupts published for one key, received by one subscriber.
+
+    Usage:
+        async with backend.subscribe(execution_id) as interrupts:
+            message = interrupts.poll()           # non-blocking
+            message = await interrupts.get(5.0)   # wait up to 5s
+    """
+
+    @abstractmethod
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next interrupt payload (None on timeout)"""
+
+    @abstractmethod
+    async def poll(self) -> Optional[Dict[str, Any]]:
+        """Next interrupt payload if one is already waiting"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Unsubscribe"""
+
+    async def __aenter__(self) -> "InterruptSubscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class StateBackend(ABC, Generic[T]):
+    """
+    Abstract state backend used by SessionService and WorkflowEngine.
+
+    One instance per namespace ("sessions", "executions"). All methods are
+    async so network-backed implementations never block the event loop.
+    """
+
+    def __init__(self, namespace: str, model: Type[T]):
+        self.namespace = namespace
+        self.model = model
+
+    async def start(self) -> None:
+        """Start background work (called from app lifespan)"""
+
+    async def stop(self) -> None:
+        """Stop background work and release connections"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[T]:
+        """Get a value by key"""
+
+    @abstractmethod
+    async def put(self, key: str, value: T) -> None:
+        """Insert or replace a value (call again after modifying it)"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete a value, returning False if it did not exist"""
+
+    @abstractmethod
+    async def keys(self) -> List[str]:
+        """All keys in this namespace"""
+
+    async def count(self) -> int:
+        """Number of entries in this namespace"""
+        return len(await self.keys())
+
+    @abstractmethod
+    async def publish_interrupt(self, key: str, payload: Dict[str, Any]) -> None:
+        """Deliver an interrupt to every subscriber of key"""
+
+    @abstractmethod
+    def subscribe(self, key: str) -> InterruptSubscription:
+        """Subscribe to interrupts for key (use as an async context manager)"""
+
+    @abstractmethod
+    async def get_stats(self) -> Dict[str, Any]:
+        """Backend metrics for monitoring"""
+
+
+# ============================================================================
+# IN-MEMORY BACKEND
+# ============================================================================
+
+class _QueueSubscription(InterruptSubscription):
+    def __init__(self, channels: Dict[str, Set[asyncio.Queue]], key: str):
+        self._channels = channels
+        self._key = key
+        self._queue: asyncio.Queue = asyncio.Queue()
+        channels.setdefault(key, set()).add(self._queue)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def poll(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self._queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+
+    async def close(self) -> None:
+        subscribers = self._channels.get(self._key)
+        if subscribers is not None:
+            subscribers.discard(self._queue)
+            if not subscribers:
+                del self._channels[self._key]
+
+
+class InMemoryStateBackend(StateBackend[T]):
+    """Process-local state in a BoundedStateStore (TTL, byte budget, disk spill)"""
+
+    def __init__(
+        self,
+        namespace: str,
+        model: Type[T],
+        in_flight: Optional[Callable[[T], bool]] = None
+    ):
+        super().__init__(namespace, model)
+        self.store: BoundedStateStore[T] = BoundedStateStore(namespace, model, in_flight=in_flight)
+        self._channels: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def start(self) -> None:
+        await self.store.start()
+
+    async def stop(self) -> None:
+        await self.store.stop()
+
+    async def get(self, key: str) -> Optional[T]:
+        return self.store.get(key)
+
+    async def put(self, key: str, value: T) -> None:
+        self.store[key] = value
+
+    async def delete(self, key: str) -> bool:
+        return self.store.pop(key)
+
+    async def keys(self) -> List[str]:
+        return self.store.keys()
+
+    async def count(self) -> int:
+        return len(self.store)
+
+    async def publish_interrupt(self, key: str, payload: Dict[str, Any]) -> None:
+        for queue in self._channels.get(key, ()):
+            queue.put_nowait(payload)
+
+    def subscribe(self, key: str) -> InterruptSubscription:
+        return _QueueSubscription(self._channels, key)
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self.store.get_stats()}
+
+
+# ============================================================================
+# REDIS BACKEND
+# ============================================================================
+
+class _RedisSubscription(InterruptSubscription):
+    def __init__(self, client, channel: str):
+        self._pubsub = client.pubsub()
+        self._channel = channel
+        self._subscribed = False
+
+    async def _ensure_subscribed(self) -> None:
+        if not self._subscribed:
+            await self._pubsub.subscribe(self._channel)
+            self._subscribed = True
+
+    async def __aenter__(self) -> "InterruptSubscription":
+        # Subscribe before the caller starts work so no interrupt is missed
+        await self._ensure_subscribed()
+        return self
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        await self._ensure_subscribed()
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - loop.time())
+            # get_message(timeout=None) blocks until a message arrives
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message is not None and message.get("type") == "message":
+                return json.loads(message["data"])
+            if deadline is not None and loop.time() >= deadline:
+                return None
+
+    async def poll(self) -> Optional[Dict[str, Any]]:
+        await self._ensure_subscribed()
+        message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=0.0)
+        if message is not None and message.get("type") == "message":
+            return json.loads(message["data"])
+        return None
+
+    async def close(self) -> None:
+        try:
+            if self._subscribed:
+                await self._pubsub.unsubscribe(self._channel)
+        finally:
+            await self._pubsub.aclose()
+
+
+class RedisStateBackend(StateBackend[T]):
+    """
+    Shared state in a Redis-protocol server.
+
+    Entries are JSON strings at {prefix}:{namespace}:{key} with a sliding TTL;
+    interrupts use the channel {prefix}:{namespace}:interrupt:{key}.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        model: Type[T],
+        client=None,
+        url: str = DEFAULT_REDIS_URL,
+        prefix: str = DEFAULT_REDIS_PREFIX,
+        ttl_seconds: int = DEFAULT_REDIS_TTL
+    ):
+        """
+        Initialize Redis backend.
+
+        Args:
+            namespace: Key namespace ("sessions", "executions")
+            model: Pydantic model class of stored values
+            client: redis.asyncio client (e.g. fakeredis.FakeAsyncRedis);
+                created from url if omitted
+            url: Redis URL
+            prefix: Key and channel prefix
+            ttl_seconds: Sliding expiry of untouched entries
+        """
+        super().__init__(namespace, model)
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+
+        # Metrics
+        self.reads = 0
+        self.writes = 0
+        self.interrupts_published = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{self.namespace}:{key}"
+
+    def _channel(self, key: str) -> str:
+        return f"{self.prefix}:{self.namespace}:interrupt:{key}"
+
+    async def stop(self) -> None:
+        await self.client.aclose()
+
+    async def get(self, key: str) -> Optional[T]:
+        self.reads += 1
+        # GETEX refreshes the sliding TTL on read
+        data = await self.client.getex(self._key(key), ex=self.ttl_seconds)
+        if data is None:
+            return None
+        return self.model.model_validate_json(data)
+
+    async def put(self, key: str, value: T) -> None:
+        self.writes += 1
+        await self.client.set(self._key(key), value.model_dump_json(), ex=self.ttl_seconds)
+
+    async def delete(self, key: str) -> bool:
+        return bool(await self.client.delete(self._key(key)))
+
+    async def keys(self) -> List[str]:
+        prefix = self._key("")
+        keys = []
+        async for raw in self.client.scan_iter(match=f"{prefix}*", count=500):
+            name = raw.decode() if isinstance(raw, bytes) else raw
+            keys.append(name[len(prefix):])
+        return keys
+
+    async def publish_interrupt(self, key: str, payload: Dict[str, Any]) -> None:
+        self.interrupts_published += 1
+        await self.client.publish(self._channel(key), json.dumps(payload))
+
+    def subscribe(self, key: str) -> InterruptSubscription:
+        return _RedisSubscription(self.client, self._channel(key))
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            "entries": await self.count(),
+            "ttl_seconds": self.ttl_seconds,
+            "reads": self.reads,
+            "writes": self.writes,
+            "interrupts_published": self.interrupts_published,
+        }
+
+
+# ============================================================================
+# BACKEND FACTORY
+# ============================================================================
+
+_redis_client = None
+
+
+def _shared_redis_client():
+    """One connection pool for every namespace"""
+    global _redis_client
+    if _redis_client is None:
+        import redis.asyncio as redis
+        _redis_client = redis.Redis.from_url(DEFAULT_REDIS_URL)
+    return _redis_client
+
+
+def create_state_backend(
+    namespace: str,
+    model: Type[T],
+    in_flight: Optional[Callable[[T], bool]] = None,
+    backend: Optional[str] = None
+) -> StateBackend[T]:
+    """
+    Create the configured state backend for a namespace.
+
+    Args:
+        namespace: "sessions" or "executions"
+        model: Pydantic model class of stored values
+        in_flight: Entries the in-memory store must keep resident
+        backend: 'memory' or 'redis' (defaults to STATE_BACKEND env var)
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    backend = (backend or os.getenv("STATE_BACKEND", "memory")).lower()
+
+    if backend == "memory":
+        return InMemoryStateBackend(namespace, model, in_flight=in_flight)
+    if backend == "redis":
+        logger.info(f"✅ {namespace} state backend: Redis ({DEFAULT_REDIS_URL})")
+        return RedisStateBackend(namespace, model, client=_shared_redis_client())
+
+    raise ValueError(f"Unknown STATE_BACKEND: {backend}. Must be 'memory' or 'redis'")
@@ -0,0 +1,392 @@
+"""
+BOUNDED STATE STORE
+===================
+Size-accounted, TTL-evicting store for sessions and workflow executions,
+with a spill-to-disk tier for idle entries.
+
+WHY:
+- SessionService.sessions and WorkflowEngine.executions were plain dicts;
+  every entry keeps its context text, full message history and accumulated
+  response until a client calls DELETE, so memory grew without bound
+- Most entries are finished conversations that are rarely read again, but
+  clients do come back to recent ones (status polls, follow-up turns)
+
+DESIGN:
+- Dict-like interface (get / [] / in / del / len / keys) so the services keep
+  their existing code paths; values are mutable Pydantic models
+- Each resident entry has an estimated size in bytes (string payload +
+  per-field overhead), refreshed on access and on every sweep
+- Idle entries (no access for STATE_STORE_IDLE_TTL) are moved to disk
+- While resident bytes exceed STATE_STORE_MAX_MB, the least recently used
+  entries are moved to disk; entries reported as in-flight (streaming /
+  running) are never moved for size
+- Spilled entries are loaded back transparently on access and deleted
+  after STATE_STORE_SPILL_TTL
+- Set STATE_STORE_SPILL_DIR to an empty string to drop evicted entries
+  instead of spilling them
+
+CONFIGURATION:
+- STATE_STORE_MAX_MB resident bytes per store (default 512)
+- STATE_STORE_IDLE_TTL seconds (default 1800)
+- STATE_STORE_SPILL_DIR (default ./state_spill)
+- STATE_STORE_SPILL_TTL seconds (default 86400)
+- STATE_STORE_SWEEP_INTERVAL seconds (default 60)
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, Type, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = int(float(os.getenv("STATE_STORE_MAX_MB", "512")) * 1024 * 1024)
+DEFAULT_IDLE_TTL = float(os.getenv("STATE_STORE_IDLE_TTL", "1800"))
+DEFAULT_SPILL_DIR = os.getenv("STATE_STORE_SPILL_DIR", "./state_spill")
+DEFAULT_SPILL_TTL = float(os.getenv("STATE_STORE_SPILL_TTL", "86400"))
+DEFAULT_SWEEP_INTERVAL = float(os.getenv("STATE_STORE_SWEEP_INTERVAL", "60"))
+
+# Rough CPython overhead per object/field, added to string payload sizes
+OBJECT_OVERHEAD_BYTES = 64
+
+SAFE_KEY = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate resident bytes of a model / container / scalar"""
+    if isinstance(value, str):
+        return len(value) + OBJECT_OVERHEAD_BYTES
+    if isinstance(value, BaseModel):
+        return OBJECT_OVERHEAD_BYTES + sum(
+            estimate_size(getattr(value, name)) for name in type(value).model_fields
+        )
+    if isinstance(value, dict):
+        return OBJECT_OVERHEAD_BYTES + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return OBJECT_OVERHEAD_BYTES + sum(estimate_size(v) for v in value)
+    return 16
+
+
+class _Entry:
+    __slots__ = ("value", "size", "last_access")
+
+    def __init__(self, value: BaseModel, size: int, last_access: float):
+        self.value = value
+        self.size = size
+        self.last_access = last_access
+
+
+class BoundedStateStore(Generic[T]):
+    """
+    Resident LRU of Pydantic models with byte budget, idle TTL and disk tier.
+
+    Usage:
+        store = BoundedStateStore("sessions", SessionState,
+                                  in_flight=lambda s: s.status == SessionStatus.STREAMING)
+        store[session.session_id] = session
+        session = store.get(session_id)   # reloads from disk if spilled
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Type[T],
+        in_flight: Optional[Callable[[T], bool]] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        spill_dir: Optional[str] = DEFAULT_SPILL_DIR,
+        spill_ttl: float = DEFAULT_SPILL_TTL,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL
+    ):
+        """
+        Initialize state store.
+
+        Args:
+            name: Store name (spill subdirectory, logs, stats)
+            model: Pydantic model class of stored values (for reloading)
+            in_flight: Returns True for entries that must stay resident
+            max_bytes: Resident byte budget
+            idle_ttl: Seconds without access before an entry leaves memory
+            spill_dir: Directory for spilled entries (None/"" disables spilling)
+            spill_ttl: Seconds a spilled entry is kept on disk
+            sweep_interval: Seconds between background sweeps
+        """
+        self.name = name
+        self.model = model
+        self.in_flight = in_flight or (lambda value: False)
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self.spill_dir = os.path.join(spill_dir, name) if spill_dir else None
+        self.spill_ttl = spill_ttl
+        self.sweep_interval = sweep_interval
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._resident_bytes = 0
+        # key -> (spilled_at wall time, bytes on disk)
+        self._spilled: Dict[str, tuple] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.idle_evictions = 0
+        self.size_evictions = 0
+        self.spills = 0
+        self.restores = 0
+        self.drops = 0
+        self.spill_expirations = 0
+
+        if self.spill_dir:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self._scan_spilled()
+
+    # ------------------------------------------------------------------
+    # Dict-like interface
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default: Optional[T] = None) -> Optional[T]:
+        """Value for key (reloaded from disk if spilled), refreshing its recency"""
+        entry = self._entries.get(key)
+        if entry is None:
+            value = self._restore(key)
+            if value is None:
+                return default
+            return value
+
+        self._entries.move_to_end(key)
+        entry.last_access = time.monotonic()
+        self._resize(entry)
+        if self._resident_bytes > self.max_bytes:
+            self._enforce_limit(keep=key)
+        return entry.value
+
+    def __getitem__(self, key: str) -> T:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: T) -> None:
+        self._discard(key)
+        self._delete_spilled(key)
+        entry = _Entry(value, estimate_size(value), time.monotonic())
+        self._entries[key] = entry
+        self._resident_bytes += entry.size
+        if self._resident_bytes > self.max_bytes:
+            self._enforce_limit(keep=key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or key in self._spilled
+
+    def __delitem__(self, key: str) -> None:
+        if not self.pop(key):
+            raise KeyError(key)
+
+    def pop(self, key: str) -> bool:
+        """Remove key from memory and disk; True if it existed"""
+        existed = self._discard(key) is not None
+        return self._delete_spilled(key) or existed
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._spilled)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def keys(self) -> List[str]:
+        """Resident and spilled keys"""
+        return list(self._entries.keys()) + [k for k in self._spilled if k not in self._entries]
+
+    def values(self) -> List[T]:
+        """Resident values only (spilled entries are not loaded)"""
+        return [entry.value for entry in self._entries.values()]
+
+    @property
+    def resident_count(self) -> int:
+        return len(self._entries)
+
+    @property
+    def resident_bytes(self) -> int:
+        return self._resident_bytes
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _resize(self, entry: _Entry) -> None:
+        size = estimate_size(entry.value)
+        self._resident_bytes += size - entry.size
+        entry.size = size
+
+    def _discard(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._resident_bytes -= entry.size
+        return entry
+
+    def _evict(self, key: str) -> None:
+        """Move an entry out of memory (to disk if spilling is enabled)"""
+        entry = self._discard(key)
+        if entry is None:
+            return
+        if self.spill_dir:
+            self._spill(key, entry.value)
+        else:
+            self.drops += 1
+
+    def _enforce_limit(self, keep: Optional[str] = None) -> None:
+        """Evict least recently used entries until under max_bytes"""
+        for key in list(self._entries.keys()):
+            if self._resident_bytes <= self.max_bytes:
+                break
+            entry = self._entries[key]
+            if key == keep or self.in_flight(entry.value):
+                continue
+            self._evict(key)
+            self.size_evictions += 1
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Refresh sizes, evict idle entries, expire old spills, enforce budget.
+
+        Returns:
+            Counts of entries evicted/expired by this sweep
+        """
+        now = time.monotonic()
+        idle = []
+        for key, entry in self._entries.items():
+            self._resize(entry)
+            if now - entry.last_access >= self.idle_ttl:
+                idle.append(key)
+
+        for key in idle:
+            self._evict(key)
+        self.idle_evictions += len(idle)
+
+        before = self.size_evictions
+        self._enforce_limit()
+
+        expired = 0
+        wall_now = time.time()
+        for key, (spilled_at, _) in list(self._spilled.items()):
+            if wall_now - spilled_at >= self.spill_ttl:
+                self._delete_spilled(key)
+                expired += 1
+        self.spill_expirations += expired
+
+        if idle or expired or self.size_evictions > before:
+            logger.info(
+                f"🧹 {self.name} store sweep: {len(idle)} idle, "
+                f"{self.size_evictions - before} over budget, {expired} spills expired "
+                f"({self.resident_count} resident, {self._resident_bytes} bytes)"
+            )
+        return {"idle": len(idle), "size": self.size_evictions - before, "expired": expired}
+
+    async def start(self) -> None:
+        """Start the background sweeper (call from app lifespan)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_loop(), name=f"{self.name}-store-sweep")
+
+    async def stop(self) -> None:
+        """Stop the background sweeper"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"❌ {self.name} store sweep failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _path(self, key: str) -> str:
+        filename = key if SAFE_KEY.match(key) else hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.spill_dir, f"{filename}.json")
+
+    def _scan_spilled(self) -> None:
+        """Index entries spilled by a previous process"""
+        for filename in os.listdir(self.spill_dir):
+            if filename.endswith(".json"):
+                path = os.path.join(self.spill_dir, filename)
+                stat = os.stat(path)
+                self._spilled[filename[:-5]] = (stat.st_mtime, stat.st_size)
+
+    def _spill(self, key: str, value: BaseModel) -> None:
+        data = value.model_dump_json()
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"❌ Failed to spill {self.name} entry {key}: {e}")
+            self.drops += 1
+            return
+        self._spilled[key] = (time.time(), len(data))
+        self.spills += 1
+
+    def _restore(self, key: str) -> Optional[T]:
+        if key not in self._spilled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = self.model.model_validate_json(f.read())
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Failed to restore {self.name} entry {key}: {e}")
+            self._delete_spilled(key)
+            return None
+
+        self._delete_spilled(key)
+        entry = _Entry(value, estimate_size(value), time.monotonic())
+        self._entries[key] = entry
+        self._resident_bytes += entry.size
+        self.restores += 1
+        if self._resident_bytes > self.max_bytes:
+            self._enforce_limit(keep=key)
+        return value
+
+    def _delete_spilled(self, key: str) -> bool:
+        if self._spilled.pop(key, None) is None:
+            return False
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Memory/disk accounting and eviction metrics"""
+        return {
+            "resident_entries": len(self._entries),
+            "resident_bytes": self._resident_bytes,
+            "max_bytes": self.max_bytes,
+            "in_flight": sum(1 for e in self._entries.values() if self.in_flight(e.value)),
+            "spilled_entries": len(self._spilled),
+            "spilled_bytes": sum(size for _, size in self._spilled.values()),
+            "idle_ttl_seconds": self.idle_ttl,
+            "spill_ttl_seconds": self.spill_ttl,
+            "idle_evictions": self.idle_evictions,
+            "size_evictions": self.size_evictions,
+            "spills": self.spills,
+            "restores": self.restores,
+            "drops": self.drops,
+            "spill_expirations": self.spill_expirations,
+        }
@@ -0,0 +1,326 @@
+"""
+STREAM HUB
+==========
+Live Claude streams that outlive the HTTP connection, with replay and fan-out.
+
+WHY:
+- The SSE endpoints used to run Claude inside the request: a browser that
+  dropped mid-generation lost the output, and reconnecting started a new
+  Claude call (and a second full bill)
+- Two viewers of the same execution each started their own generation
+
+DESIGN:
+- One LiveStream per execution / session turn; its producer task runs the
+  upstream generation independently of any client connection
+- Text is appended as offset-numbered chunks to a bounded ring buffer
+  (STREAM_REPLAY_MAX_CHARS); offsets are the SSE event ids of sse_encoder
+- Viewers follow a LiveStream from any offset: buffered chunks are replayed,
+  then the viewer waits for the producer - every viewer shares one upstream
+  stream, each with its own SSE batching
+- Offsets older than the ring are served from the caller's stored text
+  (e.g. execution.current_response)
+- Finished streams are kept for STREAM_RETAIN_SECONDS so a late reconnect
+  still replays without calling Claude
+
+SCOPE:
+- Streams live in this process; with several workers, reconnects must reach
+  the same worker (sticky sessions) to attach to a live stream. Finished
+  output is always replayable from the state backend
+
+CONFIGURATION:
+- STREAM_REPLAY_MAX_CHARS (default 1000000 per stream)
+- STREAM_RETAIN_SECONDS (default 300)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.services.sse_encoder import SSEEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLAY_MAX_CHARS = int(os.getenv("STREAM_REPLAY_MAX_CHARS", "1000000"))
+DEFAULT_RETAIN_SECONDS = float(os.getenv("STREAM_RETAIN_SECONDS", "300"))
+
+
+class LiveStream:
+    """
+    One upstream generation: ring buffer of text chunks plus final events.
+
+    The producer calls append() for text and add_event() for the events that
+    close the stream (status, done, error); viewers call follow().
+    """
+
+    def __init__(self, key: str, base_offset: int = 0, max_chars: int = DEFAULT_REPLAY_MAX_CHARS):
+        """
+        Initialize live stream.
+
+        Args:
+            key: Execution or session ID
+            base_offset: Offset of the first character of this stream
+                (text stored before it, e.g. an earlier run's response)
+            max_chars: Ring buffer size
+        """
+        self.key = key
+        self.base_offset = base_offset
+        self.offset = base_offset
+        self.max_chars = max_chars
+
+        self._ring: Deque[Tuple[int, str]] = deque()  # (start offset, text)
+        self._ring_chars = 0
+        self._waiter = asyncio.Event()
+
+        self.events: List[Tuple[str, Dict[str, Any]]] = []
+        self.done = False
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.viewers = 0
+
+    @property
+    def replay_start(self) -> int:
+        """Oldest offset still in the ring buffer"""
+        return self._ring[0][0] if self._ring else self.offset
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def append(self, text: str) -> None:
+        """Add a chunk and wake viewers"""
+        if not text:
+            return
+        self._ring.append((self.offset, text))
+        self._ring_chars += len(text)
+        self.offset += len(text)
+        while self._ring_chars > self.max_chars and len(self._ring) > 1:
+            _, dropped = self._ring.popleft()
+            self._ring_chars -= len(dropped)
+        self._notify()
+
+    def add_event(self, event: str, data: Dict[str, Any]) -> None:
+        """Event sent to every viewer after the text (status, done, error)"""
+        self.events.append((event, data))
+
+    def finish(self) -> None:
+        """Mark the stream complete and wake viewers"""
+        self.done = True
+        self.finished_at = time.monotonic()
+        self._notify()
+
+    def _notify(self) -> None:
+        waiter, self._waiter = self._waiter, asyncio.Event()
+        waiter.set()
+
+    # ------------------------------------------------------------------
+    # Viewer side
+    # ------------------------------------------------------------------
+
+    def _read(self, offset: int) -> str:
+        """Buffered text from offset to the live end"""
+        if offset >= self.offset:
+            return ""
+        parts = []
+        for start, text in reversed(self._ring):
+            if start + len(text) <= offset:
+                break
+            parts.append(text[offset - start:] if start < offset else text)
+        parts.reverse()
+        return "".join(parts)
+
+    async def follow(self, offset: int) -> AsyncIterator[str]:
+        """
+        Text from offset until the producer finishes.
+
+        A viewer that falls behind receives everything buffered since its
+        offset as one piece instead of chunk by chunk.
+        """
+        offset = max(offset, self.replay_start)
+        while True:
+            waiter = self._waiter
+            text = self._read(offset)
+            if text:
+                offset += len(text)
+                yield text
+                continue
+            if self.done:
+                return
+            await waiter.wait()
+
+
+class StreamHub:
+    """
+    Registry of live streams by execution / session ID.
+
+    Usage:
+        hub = get_stream_hub()
+        live = hub.get(execution_id) or hub.start(execution_id, produce, base_offset)
+        return StreamingResponse(hub.sse(live, offset))
+    """
+
+    def __init__(
+        self,
+        replay_max_chars: int = DEFAULT_REPLAY_MAX_CHARS,
+        retain_seconds: float = DEFAULT_RETAIN_SECONDS
+    ):
+        self.replay_max_chars = replay_max_chars
+        self.retain_seconds = retain_seconds
+        self.streams: Dict[str, LiveStream] = {}
+
+        # Metrics
+        self.upstreams_started = 0
+        self.viewers_attached = 0
+        self.replays = 0
+
+    def get(self, key: str) -> Optional[LiveStream]:
+        """Live or recently finished stream for key"""
+        self._expire()
+        return self.streams.get(key)
+
+    def create(self, key: str, base_offset: int = 0) -> LiveStream:
+        """
+        Register a live stream whose producer is run later (see run()).
+
+        Viewers can attach immediately and wait for the first text.
+
+        Raises:
+            RuntimeError: If a stream for key is still running
+        """
+        self._expire()
+        current = self.streams.get(key)
+        if current is not None and not current.done:
+            raise RuntimeError(f"Stream already running: {key}")
+
+        live = LiveStream(key, base_offset=base_offset, max_chars=self.replay_max_chars)
+        self.streams[key] = live
+        return live
+
+    def start(
+        self,
+        key: str,
+        produce: Callable[[LiveStream], Awaitable[None]],
+        base_offset: int = 0
+    ) -> LiveStream:
+        """
+        Start the upstream producer for key in a background task.
+
+        Args:
+            key: Execution or session ID
+            produce: Coroutine that appends text and final events to the
+                LiveStream; an exception becomes an `error` event
+            base_offset: Offset of the first character produced
+
+        Raises:
+            RuntimeError: If a producer for key is still running
+        """
+        live = self.create(key, base_offset)
+        live.task = asyncio.create_task(self.run(live, produce))
+        return live
+
+    async def run(self, live: LiveStream, produce: Callable[[LiveStream], Awaitable[None]]) -> None:
+        """Run a producer to completion (in the caller's task)"""
+        self.upstreams_started += 1
+        try:
+            await produce(live)
+        except asyncio.CancelledError:
+            live.add_event("error", {"error": "Stream cancelled"})
+            raise
+        except Exception as e:
+            logger.error(f"❌ Live stream {live.key} failed: {e}")
+            live.add_event("error", {"error": str(e)})
+        finally:
+            live.finish()
+
+    async def sse(
+        self,
+        live: LiveStream,
+        offset: Optional[int] = None,
+        history: Optional[str] = None,
+        status: str = "starting"
+    ) -> AsyncIterator[bytes]:
+        """
+        SSE frames for one viewer of a live stream.
+
+        Args:
+            live: Stream to follow
+            offset: Client's Last-Event-ID offset (None = from the stream start)
+            history: Stored text covering offsets before the ring buffer
+            status: Status event sent first
+        """
+        start = live.base_offset if offset is None else min(offset, live.offset)
+        encoder = SSEEncoder(offset=start)
+        live.viewers += 1
+        self.viewers_attached += 1
+        if offset is not None:
+            self.replays += 1
+
+        try:
+            yield encoder.event("status", {"status": status})
+
+            # Offsets already evicted from the ring come from stored text
+            if start < live.replay_start:
+                if history is not None and len(history) >= live.replay_start:
+                    frame = encoder.resume(history[:live.replay_start])
+                    if frame:
+                        yield frame
+                else:
+                    logger.warning(
+                        f"⚠️ Stream {live.key}: offset {start} no longer buffered, "
+                        f"resuming at {live.replay_start}"
+                    )
+                    encoder.offset = live.replay_start
+
+            async for frame in encoder.stream(live.follow(encoder.offset)):
+                yield frame
+            for event, data in live.events:
+                yield encoder.event(event, data)
+        finally:
+            live.viewers -= 1
+
+    def _expire(self) -> None:
+        """Drop finished streams past the retention window"""
+        now = time.monotonic()
+        expired = [
+            key for key, live in self.streams.items()
+            if live.done and now - live.finished_at > self.retain_seconds
+        ]
+        for key in expired:
+            del self.streams[key]
+
+    async def stop(self) -> None:
+        """Cancel running producers (app shutdown)"""
+        tasks = [live.task for live in self.streams.values() if live.task and not live.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fan-out metrics for monitoring"""
+        self._expire()
+        live = [s for s in self.streams.values() if not s.done]
+        return {
+            "live_streams": len(live),
+            "retained_streams": len(self.streams) - len(live),
+            "viewers": sum(s.viewers for s in self.streams.values()),
+            "upstreams_started": self.upstreams_started,
+            "viewers_attached": self.viewers_attached,
+            "replays": self.replays,
+        }
+
+
+# ============================================================================
+# SINGLETON INSTANCE
+# ============================================================================
+
+_stream_hub: Optional[StreamHub] = None
+
+
+def get_stream_hub() -> StreamHub:
+    """Get or create stream hub singleton"""
+    global _stream_hub
+    if _stream_hub is None:
+        _stream_hub = StreamHub()
+    return _stream_hub
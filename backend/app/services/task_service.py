@@ -15,7 +15,7 @@ Follows Vanta's task management patterns.
 """
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from typing import Callable, List, Optional, Dict
 from uuid import uuid4
 
 from app.models import Task, TaskStatus
@@ -34,6 +34,33 @@ _contract_tasks: Dict[str, List[str]] = {}
 # user_email -> List[task_id]
 _user_tasks: Dict[str, List[str]] = {}
 
+# Callbacks notified with the contract_id whenever a contract's tasks change
+_task_listeners: List[Callable[[str], None]] = []
+
+
+def add_task_listener(callback: Callable[[str], None]) -> None:
+    """
+    Register a callback invoked with the contract_id on task create/update/delete.
+
+    Used by the compliance engine to invalidate cached deal compliance.
+    """
+    _task_listeners.append(callback)
+
+
+def _notify_task_listeners(contract_id: str) -> None:
+    for callback in _task_listeners:
+        callback(contract_id)
+
+
+def utc_now() -> datetime:
+    """
+    Clock for task timestamps and due-date checks (naive UTC).
+
+    Due dates are compared against this everywhere, including by the
+    compliance engine, so overdue detection agrees across services.
+    """
+    return datetime.utcnow()
+
 
 # ============================================================================
 # TASK CRUD OPERATIONS
@@ -71,7 +98,7 @@ def create_task(
     Returns:
         Task object
     """
-    now = datetime.utcnow()
+    now = utc_now()
 
     # Create task
     task = Task(
@@ -105,6 +132,8 @@ def create_task(
         _user_tasks[assignee_email] = []
     _user_tasks[assignee_email].append(task.task_id)
 
+    _notify_task_listeners(contract_id)
+
     return task
 
 
@@ -153,7 +182,7 @@ def update_task_status(
     if task.assignee_email != user_email:
         raise PermissionError("Only task assignee can update task status")
 
-    now = datetime.utcnow()
+    now = utc_now()
 
     # Update status
     task.status.status = new_status
@@ -168,6 +197,8 @@ def update_task_status(
         task.status.cancelled_at = now
         task.status.cancellation_reason = cancellation_reason or "No reason provided"
 
+    _notify_task_listeners(task.contract_id)
+
     return task
 
 
@@ -220,6 +251,8 @@ def delete_task(
             if tid != task_id
         ]
 
+    _notify_task_listeners(task.contract_id)
+
     return True
 
 
@@ -265,7 +298,7 @@ def list_tasks(
         tasks = [t for t in tasks if t.priority == priority]
 
     if overdue_only:
-        now = datetime.utcnow()
+        now = utc_now()
         tasks = [
             t for t in tasks
             if t.due_date and t.due_date < now and t.status.status != 'completed'
@@ -356,7 +389,7 @@ def get_user_task_stats(user_email: str) -> Dict[str, any]:
         Dictionary with task stats
     """
     tasks = get_user_tasks(user_email)
-    now = datetime.utcnow()
+    now = utc_now()
 
     stats = {
         "total": len(tasks),
@@ -440,7 +473,7 @@ def get_overdue_tasks(user_email: Optional[str] = None) -> List[Task]:
     else:
         tasks = list(_tasks.values())
 
-    now = datetime.utcnow()
+    now = utc_now()
 
     overdue = [
         t for t in tasks
@@ -473,7 +506,7 @@ def is_task_overdue(task_id: str) -> bool:
     if not task.due_date:
         return False
 
-    return task.due_date < datetime.utcnow()
+    return task.due_date < utc_now()
 
 
 def get_tasks_due_soon(
@@ -495,7 +528,7 @@ def get_tasks_due_soon(
     else:
         tasks = list(_tasks.values())
 
-    now = datetime.utcnow()
+    now = utc_now()
     threshold = now + timedelta(hours=hours)
 
     due_soon = [
@@ -515,7 +548,7 @@ def get_tasks_due_soon(
 def initialize_mock_data():
     """Initialize mock task data for testing."""
     # Create mock tasks
-    now = datetime.utcnow()
+    now = utc_now()
 
     mock_tasks = [
         {
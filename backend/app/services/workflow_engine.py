@@ -8,6 +8,9 @@ WHY IN-MEMORY:
 - No Redis dependency
 - Easy to understand and debug
 - Suitable for single-server deployment
+- Pluggable state backend (state_backends.py): bounded in-memory store by
+  default (idle/over-budget executions spill to disk), Redis for multi-worker
+  deployments; interrupts are delivered via pub/sub
 
 FEATURES:
 - Execution state management
@@ -17,22 +20,34 @@ FEATURES:
 - Progress tracking
 """
 
+import asyncio
 import logging
+import time
 import uuid
+from collections import deque
 from typing import Optional, Dict, Any, List, AsyncGenerator
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel
 
 from app.services.claude_service import get_claude_service
-from app.services.graphiti_mcp_service import get_graphiti_mcp_service  # NEW: Using MCP
+from app.services.graphiti_context import get_graphiti_context  # Cached MCP search + formatting
+from app.services.response_buffer import ResponseBuffer
+from app.services.state_backends import StateBackend, create_state_backend
 
 logger = logging.getLogger(__name__)
 
+# Seconds between writes of an in-progress response back to the state backend
+PROGRESS_SAVE_SECONDS = 1.0
+
+# Recent interrupt-to-ack latencies kept for get_interrupt_stats()
+INTERRUPT_LATENCY_WINDOW = 256
+
 
 class ExecutionStatus(str, Enum):
     """Workflow execution status"""
     PENDING = "pending"
+    QUEUED = "queued"
     RUNNING = "running"
     PAUSED = "paused"
     COMPLETED = "completed"
@@ -45,6 +60,8 @@ class ExecutionState(BaseModel):
     id: str
     template_id: str
     status: ExecutionStatus
+    tenant_id: str = "default"
+    priority: str = "medium"
     started_at: str
     completed_at: Optional[str] = None
     context_text: Optional[str] = None
@@ -53,27 +70,44 @@ class ExecutionState(BaseModel):
     current_response: str = ""
     error: Optional[str] = None
     interrupt_message: Optional[str] = None
+    # Acknowledged interrupts: message, ack_latency_ms, acked_at, response_chars
+    interrupts: List[Dict[str, Any]] = []
 
 
 class WorkflowEngine:
     """
-    In-memory workflow execution engine.
+    Workflow execution engine on a pluggable state backend.
 
     Manages execution state and orchestrates Claude interactions
-    with Graphiti context.
+    with Graphiti context. Executions live in the configured state
+    backend (STATE_BACKEND); interrupts are delivered via its pub/sub.
     """
 
-    def __init__(self):
-        """Initialize workflow engine"""
-        self.executions: Dict[str, ExecutionState] = {}
-        logger.info("🔧 Workflow engine initialized (in-memory)")
+    def __init__(self, backend: Optional[StateBackend] = None):
+        """
+        Initialize workflow engine.
 
-    def create_execution(
+        Args:
+            backend: State backend (defaults to STATE_BACKEND)
+        """
+        self.executions: StateBackend[ExecutionState] = backend or create_state_backend(
+            "executions",
+            ExecutionState,
+            in_flight=lambda execution: execution.status in (
+                ExecutionStatus.QUEUED, ExecutionStatus.RUNNING, ExecutionStatus.INTERRUPTED
+            )
+        )
+        self.interrupt_ack_ms: deque = deque(maxlen=INTERRUPT_LATENCY_WINDOW)
+        logger.info(f"🔧 Workflow engine initialized ({type(self.executions).__name__})")
+
+    async def create_execution(
         self,
         template_id: str,
         context_text: Optional[str] = None,
         context_document_ids: List[str] = None,
-        user_notes: Dict[str, str] = None
+        user_notes: Dict[str, str] = None,
+        tenant_id: str = "default",
+        priority: str = "medium"
     ) -> str:
         """
         Create a new workflow execution.
@@ -83,6 +117,8 @@ class WorkflowEngine:
             context_text: Optional context text
             context_document_ids: Optional context document IDs
             user_notes: Optional user notes/guidance
+            tenant_id: Tenant the execution is scheduled (and limited) under
+            priority: Scheduling priority (low, medium, high, critical)
 
         Returns:
             Execution ID
@@ -93,43 +129,78 @@ class WorkflowEngine:
             id=execution_id,
             template_id=template_id,
             status=ExecutionStatus.PENDING,
+            tenant_id=tenant_id,
+            priority=priority,
             started_at=datetime.now().isoformat(),
             context_text=context_text,
             context_document_ids=context_document_ids or [],
             user_notes=user_notes or {}
         )
 
-        self.executions[execution_id] = execution
+        await self.executions.put(execution_id, execution)
         logger.info(f"✅ Created execution: {execution_id}")
 
         return execution_id
 
-    def get_execution(self, execution_id: str) -> Optional[ExecutionState]:
+    async def get_execution(self, execution_id: str) -> Optional[ExecutionState]:
         """Get execution state by ID"""
-        return self.executions.get(execution_id)
+        return await self.executions.get(execution_id)
 
-    def update_status(self, execution_id: str, status: ExecutionStatus):
+    async def update_status(self, execution_id: str, status: ExecutionStatus):
         """Update execution status"""
-        if execution_id in self.executions:
-            self.executions[execution_id].status = status
-            if status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED]:
-                self.executions[execution_id].completed_at = datetime.now().isoformat()
-            logger.info(f"📊 Execution {execution_id} status: {status}")
-
-    def add_interrupt(self, execution_id: str, message: str):
-        """Add user interrupt/guidance message"""
-        if execution_id in self.executions:
-            self.executions[execution_id].interrupt_message = message
-            self.executions[execution_id].status = ExecutionStatus.INTERRUPTED
+        execution = await self.executions.get(execution_id)
+        if execution:
+            self._set_status(execution, status)
+            await self.executions.put(execution_id, execution)
+
+    def _set_status(self, execution: ExecutionState, status: ExecutionStatus):
+        execution.status = status
+        if status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED]:
+            execution.completed_at = datetime.now().isoformat()
+        logger.info(f"📊 Execution {execution.id} status: {status}")
+
+    async def add_interrupt(self, execution_id: str, message: str):
+        """Add user interrupt/guidance message (delivered to the streaming worker via pub/sub)"""
+        execution = await self.executions.get(execution_id)
+        if execution:
+            execution.interrupt_message = message
+            execution.status = ExecutionStatus.INTERRUPTED
+            await self.executions.put(execution_id, execution)
+            await self.executions.publish_interrupt(
+                execution_id,
+                {"message": message, "sent_at": time.time()}
+            )
             logger.info(f"⏸️ Execution {execution_id} interrupted with message")
 
-    def clear_interrupt(self, execution_id: str):
+    async def clear_interrupt(self, execution_id: str):
         """Clear interrupt and resume execution"""
-        if execution_id in self.executions:
-            self.executions[execution_id].interrupt_message = None
-            self.executions[execution_id].status = ExecutionStatus.RUNNING
+        execution = await self.executions.get(execution_id)
+        if execution:
+            execution.interrupt_message = None
+            execution.status = ExecutionStatus.RUNNING
+            await self.executions.put(execution_id, execution)
             logger.info(f"▶️ Execution {execution_id} resumed")
 
+    async def fail_unfinished(self, execution_ids: List[str], reason: str) -> int:
+        """
+        Mark executions that will never finish as FAILED (e.g. the runner's
+        queued and running jobs on shutdown), so stream clients get a final
+        status instead of waiting on a job nothing will resume.
+
+        Returns:
+            Number of executions marked failed
+        """
+        failed = 0
+        for execution_id in execution_ids:
+            execution = await self.executions.get(execution_id)
+            if not execution or execution.status in (ExecutionStatus.COMPLETED, ExecutionStatus.FAILED):
+                continue
+            execution.error = reason
+            self._set_status(execution, ExecutionStatus.FAILED)
+            await self.executions.put(execution_id, execution)
+            failed += 1
+        return failed
+
     async def execute_workflow(
         self,
         execution_id: str,
@@ -139,6 +210,21 @@ class WorkflowEngine:
         """
         Execute workflow with Claude streaming.
 
+        INTERRUPTS:
+        - A listener task waits on the execution's interrupt subscription;
+          an interrupt cancels the in-flight Claude stream immediately
+          (not when the next token happens to arrive)
+        - The partial answer and the guidance are folded into a new turn
+          (user → assistant partial → user guidance) and streaming resumes
+        - Interrupt-to-ack latency (publish → stream cancelled and
+          acknowledged to the client) is recorded per interrupt
+        - An interrupt that races the end of the stream (published after the
+          last chunk) is drained before completing and re-prompts the same way
+        - Interrupts published while no stream is running (context retrieval,
+          re-prompt setup) are folded in before the next stream starts
+        - Guidance already stored on the execution when it starts is part of
+          the first turn; its pub/sub copy is dropped
+
         Args:
             execution_id: Execution ID
             system_prompt: Template system prompt
@@ -147,61 +233,300 @@ class WorkflowEngine:
         Yields:
             Response chunks from Claude
         """
-        execution = self.get_execution(execution_id)
-        if not execution:
-            raise ValueError(f"Execution not found: {execution_id}")
-
-        try:
-            # Update status to running
-            self.update_status(execution_id, ExecutionStatus.RUNNING)
-
-            # Build user message
-            user_message = self._build_user_message(execution)
-
-            # Get Graphiti context if documents are provided OR if required standards specified
-            context = None
-            if execution.context_document_ids or execution.context_text or required_standards:
-                context = await self._get_graphiti_context(
-                    execution=execution,
-                    required_standards=required_standards
-                )
-
-            # Get Claude service and stream response
-            claude_service = get_claude_service()
-
-            async for chunk in claude_service.stream_generate(
-                system_prompt=system_prompt,
-                user_message=user_message,
-                context=context,
-                metadata={
+        # Subscribe before loading state so no interrupt falls in between
+        async with self.executions.subscribe(execution_id) as interrupts:
+            execution = await self.get_execution(execution_id)
+            if not execution:
+                raise ValueError(f"Execution not found: {execution_id}")
+
+            events: asyncio.Queue = asyncio.Queue()
+            # producer: in-flight stream task; skip: messages already folded in
+            turn: Dict[str, Any] = {"producer": None, "skip": []}
+            response: Optional[ResponseBuffer] = None
+            listener = asyncio.create_task(self._listen_for_interrupts(interrupts, events, turn))
+
+            try:
+                # Update status to running
+                self._set_status(execution, ExecutionStatus.RUNNING)
+
+                # Build user message (guidance posted before the stream started is included)
+                user_message = self._build_user_message(execution)
+                if execution.interrupt_message:
+                    user_message += f"\n\n{self._format_guidance(execution.interrupt_message)}"
+                    # add_interrupt also published it - drop that copy
+                    turn["skip"].append(execution.interrupt_message)
+                    execution.interrupt_message = None
+                await self.executions.put(execution_id, execution)
+
+                # Get Graphiti context if documents are provided OR if required standards specified
+                context = None
+                if execution.context_document_ids or execution.context_text or required_standards:
+                    context = await self._get_graphiti_context(
+                        execution=execution,
+                        required_standards=required_standards
+                    )
+
+                # Get Claude service and stream response
+                claude_service = get_claude_service()
+                metadata = {
                     "execution_id": execution_id,
                     "template_id": execution.template_id
                 }
-            ):
-                # Check for interrupts
-                current_execution = self.get_execution(execution_id)
-                if current_execution.status == ExecutionStatus.INTERRUPTED:
-                    logger.info(f"⏸️ Execution paused due to interrupt")
-                    yield f"\n\n**[INTERRUPTED]**\n"
-                    yield f"User guidance: {current_execution.interrupt_message}\n\n"
 
-                    # Resume with guidance
-                    self.clear_interrupt(execution_id)
-                    continue
+                # Conversation so far (only needed once an interrupt re-prompts)
+                first_turn = user_message
+                if context and context.strip():
+                    first_turn = f"{claude_service.format_context_message(context)}\n\n---\n\n{user_message}"
+                conversation: List[Dict[str, str]] = [{"role": "user", "content": first_turn}]
+
+                # One accumulator for the whole execution: ClaudeService appends
+                # each chunk, current_response is joined only when saved
+                response = ResponseBuffer(execution.current_response)
+                turn_start = response.mark()
+                stream = claude_service.stream_generate(
+                    system_prompt=system_prompt,
+                    user_message=user_message,
+                    context=context,
+                    metadata=metadata,
+                    buffer=response
+                )
+                last_saved = time.monotonic()
+
+                while True:
+                    queued = self._queued_interrupts(events, turn)
+                    if queued:
+                        # Published while no stream was running - fold it in
+                        # before streaming rather than interrupting the next turn
+                        await stream.aclose()
+                        payload = self._merge_interrupts(queued)
+                    else:
+                        turn["producer"] = asyncio.create_task(self._pump(stream, events))
+                        kind, payload = await events.get()
+
+                        while kind == "chunk":
+                            yield payload
+
+                            # Publish progress for status reads (other workers / after spill)
+                            if time.monotonic() - last_saved >= PROGRESS_SAVE_SECONDS:
+                                execution.current_response = response.text
+                                await self.executions.put(execution_id, execution)
+                                last_saved = time.monotonic()
+
+                            kind, payload = await events.get()
+
+                        if kind == "error":
+                            raise payload
+                        if kind == "done":
+                            payload = await self._pending_interrupt(interrupts, events, listener, turn)
+                            if payload is None:
+                                break
+                            listener = asyncio.create_task(self._listen_for_interrupts(interrupts, events, turn))
+
+                    # Interrupt: stop the producer (already cancelled unless the
+                    # stream finished) - acknowledge, fold the guidance into a
+                    # new turn and resume
+                    await self._await_cancelled(turn["producer"], cancel=True)
+                    turn["producer"] = None
+                    execution.current_response = response.text
+                    latency_ms = self._record_interrupt_ack(execution, payload)
+                    logger.info(f"⏸️ Execution {execution_id} interrupted (ack in {latency_ms:.1f}ms)")
+
+                    # Markers are part of the stored transcript (SSE offsets match
+                    # current_response) but not of the partial answer sent back
+                    partial_response = response.text_since(turn_start)
+                    for marker in ("\n\n**[INTERRUPTED]**\n", f"User guidance: {payload['message']}\n\n"):
+                        response.append(marker)
+                        yield marker
+
+                    conversation = self._fold_guidance(conversation, partial_response, payload["message"])
+                    turn_start = response.mark()
 
-                # Accumulate response
-                execution.current_response += chunk
-                yield chunk
+                    # Resume with guidance
+                    execution.interrupt_message = None
+                    self._set_status(execution, ExecutionStatus.RUNNING)
+                    await self.executions.put(execution_id, execution)
+
+                    stream = claude_service.stream_with_messages(
+                        system_prompt=system_prompt,
+                        messages=conversation,
+                        metadata=metadata,
+                        buffer=response
+                    )
+
+                # Mark as completed
+                execution.current_response = response.text
+                self._set_status(execution, ExecutionStatus.COMPLETED)
+                await self.executions.put(execution_id, execution)
+                logger.info(f"✅ Execution {execution_id} completed successfully")
+
+            except asyncio.CancelledError:
+                # Worker cancelled (shutdown): keep the partial answer and end the
+                # execution, otherwise shared state would say RUNNING forever
+                logger.warning(f"⚠️ Execution {execution_id} cancelled")
+                if response is not None:
+                    execution.current_response = response.text
+                execution.error = "Execution cancelled before it finished"
+                self._set_status(execution, ExecutionStatus.FAILED)
+                await self.executions.put(execution_id, execution)
+                raise
+
+            except Exception as e:
+                logger.error(f"❌ Execution {execution_id} failed: {e}")
+                if response is not None:
+                    execution.current_response = response.text
+                execution.error = str(e)
+                self._set_status(execution, ExecutionStatus.FAILED)
+                await self.executions.put(execution_id, execution)
+                raise
+
+            finally:
+                listener.cancel()
+                await self._await_cancelled(turn["producer"], cancel=True)
+                await self._await_cancelled(listener)
+
+    # ------------------------------------------------------------------
+    # Interrupt plumbing
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def _pump(stream: AsyncGenerator[str, None], events: asyncio.Queue) -> None:
+        """Forward one Claude stream into the execution's event queue"""
+        try:
+            async for chunk in stream:
+                events.put_nowait(("chunk", chunk))
+            events.put_nowait(("done", None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            events.put_nowait(("error", e))
+        finally:
+            # Closes the Anthropic stream (HTTP response) when cancelled
+            await stream.aclose()
+
+    @staticmethod
+    def _is_duplicate(payload: Dict[str, Any], turn: Dict[str, Any]) -> bool:
+        """True (once) for the pub/sub copy of guidance already folded in"""
+        if payload["message"] in turn["skip"]:
+            turn["skip"].remove(payload["message"])
+            return True
+        return False
+
+    @classmethod
+    async def _listen_for_interrupts(cls, interrupts, events: asyncio.Queue, turn: Dict[str, Any]) -> None:
+        """Cancel the in-flight turn as soon as an interrupt is published"""
+        while True:
+            payload = await interrupts.get()
+            if payload is None or cls._is_duplicate(payload, turn):
+                continue
+            producer = turn["producer"]
+            if producer is not None:
+                producer.cancel()
+            events.put_nowait(("interrupt", payload))
+
+    async def _pending_interrupt(
+        self,
+        interrupts,
+        events: asyncio.Queue,
+        listener: asyncio.Task,
+        turn: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Interrupts that arrived after the producer queued "done".
 
-            # Mark as completed
-            self.update_status(execution_id, ExecutionStatus.COMPLETED)
-            logger.info(f"✅ Execution {execution_id} completed successfully")
+        Stops the listener (so it cannot consume the subscription
+        concurrently), then collects interrupts already forwarded to events
+        and any still waiting in the subscription. Several are merged into
+        one payload (earliest sent_at, messages in order).
+        """
+        await self._await_cancelled(listener, cancel=True)
+
+        pending = self._queued_interrupts(events, turn)
+        while (payload := await interrupts.poll()) is not None:
+            if not self._is_duplicate(payload, turn):
+                pending.append(payload)
+
+        if not pending:
+            return None
+        return self._merge_interrupts(pending)
+
+    @classmethod
+    def _queued_interrupts(cls, events: asyncio.Queue, turn: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Interrupts waiting in events (only called while no producer is running)"""
+        pending: List[Dict[str, Any]] = []
+        while not events.empty():
+            kind, payload = events.get_nowait()
+            if kind == "interrupt" and not cls._is_duplicate(payload, turn):
+                pending.append(payload)
+        return pending
+
+    @staticmethod
+    def _merge_interrupts(pending: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """One payload for several interrupts (earliest sent_at, messages in order)"""
+        return {
+            "message": "\n\n".join(payload["message"] for payload in pending),
+            "sent_at": pending[0].get("sent_at"),
+        }
+
+    @staticmethod
+    async def _await_cancelled(task: Optional[asyncio.Task], cancel: bool = False) -> None:
+        if task is None:
+            return
+        if cancel:
+            task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    @staticmethod
+    def _format_guidance(message: str) -> str:
+        return (
+            f"**User Guidance (interrupt):** {message}\n\n"
+            "Continue the task from where you stopped, applying this guidance. "
+            "Do not repeat what you have already written."
+        )
 
-        except Exception as e:
-            logger.error(f"❌ Execution {execution_id} failed: {e}")
-            execution.error = str(e)
-            self.update_status(execution_id, ExecutionStatus.FAILED)
-            raise
+    def _fold_guidance(
+        self,
+        conversation: List[Dict[str, str]],
+        partial_response: str,
+        message: str
+    ) -> List[Dict[str, str]]:
+        """Next-turn messages: previous turns + partial answer + guidance"""
+        guidance = self._format_guidance(message)
+        if partial_response.strip():
+            return conversation + [
+                {"role": "assistant", "content": partial_response.rstrip()},
+                {"role": "user", "content": guidance},
+            ]
+        # Interrupted before any text - amend the pending user turn instead
+        last = conversation[-1]
+        return conversation[:-1] + [{"role": "user", "content": f"{last['content']}\n\n{guidance}"}]
+
+    def _record_interrupt_ack(self, execution: ExecutionState, payload: Dict[str, Any]) -> float:
+        """Interrupt-to-ack latency in ms (publish time → stream cancelled)"""
+        sent_at = payload.get("sent_at")
+        latency_ms = (time.time() - sent_at) * 1000 if sent_at else 0.0
+        self.interrupt_ack_ms.append(latency_ms)
+        execution.interrupts.append({
+            "message": payload["message"],
+            "ack_latency_ms": round(latency_ms, 2),
+            "acked_at": datetime.now().isoformat(),
+            "response_chars": len(execution.current_response),
+        })
+        return latency_ms
+
+    def get_interrupt_stats(self) -> Dict[str, Any]:
+        """Interrupt-to-ack latency summary (recent interrupts)"""
+        latencies = sorted(self.interrupt_ack_ms)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "p50_ms": round(latencies[len(latencies) // 2], 2),
+            "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+            "max_ms": round(latencies[-1], 2),
+        }
 
     def _build_user_message(self, execution: ExecutionState) -> str:
         """Build user message from execution context"""
@@ -242,88 +567,12 @@ class WorkflowEngine:
         Returns:
             Formatted context string with facts, entities, and standards
         """
-        try:
-            # Use MCP service instead of direct Graphiti client
-            graphiti_mcp_service = get_graphiti_mcp_service()
-
-            # Build search query from context text and notes
-            search_parts = []
-            if execution.context_text:
-                search_parts.append(execution.context_text[:300])  # Increased from 200
-            if execution.user_notes:
-                search_parts.extend(execution.user_notes.values())
-
-            search_query = " ".join(search_parts)
-
-            if not search_query.strip():
-                search_query = "Islamic finance compliance requirements"
-
-            logger.info(f"🔍 Searching Graphiti via MCP for context: '{search_query[:100]}...'")
-
-            # Use MCP search (blade-graphiti)
-            results = await graphiti_mcp_service.search(
-                query_text=search_query,
-                group_ids=["aaoifi-documents", "context-documents"],  # Match MCP group_id naming
-                num_results=10
-            )
-
-            # Build rich context from search results
-            context_parts = []
-
-            # Section 1: Key Facts (from enhanced search)
-            if results.get('facts'):
-                context_parts.append("## AAOIFI Standards and Compliance Requirements\n")
-
-                # Group facts by relevance
-                high_relevance = [f for f in results['facts'] if f.get('relevance', 0) >= 0.7]
-
-                if high_relevance:
-                    for i, fact_data in enumerate(high_relevance[:5], 1):
-                        fact_text = fact_data.get('fact', '')
-                        relevance = fact_data.get('relevance', 0)
-                        context_parts.append(
-                            f"{i}. [{relevance*100:.0f}% relevant] {fact_text}"
-                        )
-                    context_parts.append("")  # Blank line
-
-            # Section 2: Required Standards (if specified by template)
-            if required_standards:
-                context_parts.append("## Required Standards for This Workflow\n")
-                context_parts.append(f"You must reference and apply: {', '.join(required_standards)}")
-                context_parts.append("")
-
-            # Section 3: Related Entities (if available)
-            if results.get('entities') and len(results['entities']) > 0:
-                context_parts.append("## Related Entities\n")
-                for entity in results['entities'][:3]:  # Top 3 entities
-                    entity_name = entity.get('name', '')
-                    entity_summary = entity.get('summary', '')
-                    if entity_name:
-                        context_parts.append(f"- **{entity_name}**: {entity_summary}")
-                context_parts.append("")
-
-            # Section 4: Context Quality Indicator
-            confidence = results.get('confidence', 'low')
-            fact_count = len(results.get('facts', []))
-
-            context_parts.append(f"---")
-            context_parts.append(
-                f"*Context quality: {confidence} ({fact_count} facts retrieved)*\n"
-            )
-
-            formatted_context = "\n".join(context_parts)
-
-            logger.info(
-                f"✅ Retrieved Graphiti context: {fact_count} facts, "
-                f"{len(results.get('entities', []))} entities, confidence={confidence}"
-            )
-
-            return formatted_context
-
-        except Exception as e:
-            logger.error(f"❌ Failed to retrieve Graphiti context: {e}")
-            # Return empty string on error - don't break the workflow
-            return ""
+        # Search results and formatted blocks are cached (shared with sessions)
+        return await get_graphiti_context(
+            context_text=execution.context_text,
+            user_notes=execution.user_notes,
+            required_standards=required_standards
+        )
 
 
 # ============================================================================
@@ -0,0 +1,97 @@
+"""
+Benchmark GraphitiMCPService direct mode vs Claude Agent SDK mode
+
+Runs the same knowledge-graph searches through both GRAPHITI_MCP_MODE
+settings and reports latency per call. Searches bypass the search cache
+(GraphitiMCPService._search), so every timed call reaches the MCP server.
+
+Requires NEO4J_* credentials (and ANTHROPIC_API_KEY for agent mode) in .env.
+
+Usage:
+    python benchmark_graphiti_modes.py
+    python benchmark_graphiti_modes.py --runs 20 --modes direct
+    python benchmark_graphiti_modes.py --query "Ijarah lease requirements"
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.graphiti_mcp_client import get_graphiti_mcp_client
+from app.services.graphiti_mcp_service import GraphitiMCPService
+
+DEFAULT_QUERIES = [
+    "Murabaha cost-plus disclosure requirements",
+    "Sukuk Ijara asset ownership transfer",
+    "AAOIFI Shariah Standard 62 Sukuk",
+]
+
+
+async def benchmark_mode(mode: str, queries, runs: int, num_results: int) -> dict:
+    """Time `runs` uncached searches in one mode (first call reported separately)"""
+    service = GraphitiMCPService(mode=mode)
+
+    # First call includes session / subprocess startup
+    start = time.perf_counter()
+    await service._search(queries[0], num_results=num_results)
+    first_call = time.perf_counter() - start
+
+    latencies = []
+    for i in range(runs):
+        start = time.perf_counter()
+        await service._search(queries[i % len(queries)], num_results=num_results)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "mode": mode,
+        "first_call": first_call,
+        "mean": statistics.mean(latencies),
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "max": latencies[-1],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare Graphiti MCP call modes")
+    parser.add_argument("--runs", type=int, default=10, help="Timed searches per mode")
+    parser.add_argument("--num-results", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=["direct", "agent"], choices=["direct", "agent"])
+    parser.add_argument("--query", action="append", help="Search query (repeatable)")
+    args = parser.parse_args()
+
+    queries = args.query or DEFAULT_QUERIES
+
+    print("=" * 60)
+    print("Graphiti MCP Mode Benchmark")
+    print("=" * 60)
+    print(f"Runs per mode: {args.runs}  |  Queries: {len(queries)}")
+
+    results = []
+    try:
+        for mode in args.modes:
+            print(f"\nRunning {mode} mode...")
+            results.append(await benchmark_mode(mode, queries, args.runs, args.num_results))
+    finally:
+        await get_graphiti_mcp_client().disconnect()
+
+    print(f"\n{'mode':<8}{'first':>10}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}   (seconds)")
+    for r in results:
+        print(
+            f"{r['mode']:<8}{r['first_call']:>10.3f}{r['mean']:>10.3f}"
+            f"{r['p50']:>10.3f}{r['p95']:>10.3f}{r['max']:>10.3f}"
+        )
+
+    by_mode = {r["mode"]: r for r in results}
+    if "direct" in by_mode and "agent" in by_mode and by_mode["direct"]["mean"] > 0:
+        ratio = by_mode["agent"]["mean"] / by_mode["direct"]["mean"]
+        print(f"\nAgent / direct mean latency: {ratio:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
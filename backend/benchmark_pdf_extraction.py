@@ -0,0 +1,116 @@
+"""
+Benchmark PDF text extraction throughput (pages/sec)
+
+Extracts every PDF in AAOIFI_Standards/ with the PyPDF2 process-pool engine
+at several worker counts, and with the previous sequential in-process loop
+as a baseline. Also reports time to first page (how early downstream
+chunking can start) for the largest document.
+
+Scaling is bounded by the CPU cores of the machine running it.
+
+Usage:
+    python benchmark_pdf_extraction.py
+    python benchmark_pdf_extraction.py --workers 1 2 4 8 --pages-per-shard 4
+    python benchmark_pdf_extraction.py --corpus ../AAOIFI_Standards --limit 20
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from PyPDF2 import PdfReader
+
+from app.services.pdf_extraction import PdfExtractor
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "AAOIFI_Standards"
+
+
+def extract_sequential(paths) -> int:
+    """Previous behavior: one document after another, pages in-process"""
+    pages = 0
+    for path in paths:
+        reader = PdfReader(str(path))
+        for page in reader.pages:
+            page.extract_text()
+            pages += 1
+    return pages
+
+
+async def extract_parallel(paths, workers: int, pages_per_shard: int, concurrent_docs: int):
+    extractor = PdfExtractor(workers=workers, pages_per_shard=pages_per_shard)
+    semaphore = asyncio.Semaphore(concurrent_docs)
+
+    async def one(path):
+        async with semaphore:
+            count = 0
+            async for _ in extractor.iter_pages(path):
+                count += 1
+            return count
+
+    try:
+        # Start the worker processes before timing
+        await extractor.page_count(paths[0])
+        started = time.perf_counter()
+        pages = sum(await asyncio.gather(*(one(path) for path in paths)))
+        elapsed = time.perf_counter() - started
+
+        largest = max(paths, key=lambda p: p.stat().st_size)
+        first_started = time.perf_counter()
+        first_page = None
+        async for _ in extractor.iter_pages(largest):
+            if first_page is None:
+                first_page = time.perf_counter() - first_started
+        whole = time.perf_counter() - first_started
+        return pages, elapsed, first_page, whole
+    finally:
+        extractor.close()
+
+
+async def run(args) -> None:
+    paths = sorted(Path(args.corpus).glob("*.pdf"))[:args.limit or None]
+    if not paths:
+        raise SystemExit(f"No PDFs found in {args.corpus}")
+
+    print("=" * 60)
+    print("PDF Extraction Benchmark (PyPDF2)")
+    print("=" * 60)
+    print(f"Corpus: {args.corpus}  |  Documents: {len(paths)}  |  CPUs: {os.cpu_count()}")
+    print(f"Pages/shard: {args.pages_per_shard}  |  Concurrent documents: {args.concurrent_docs}")
+
+    started = time.perf_counter()
+    pages = extract_sequential(paths)
+    baseline = pages / (time.perf_counter() - started)
+
+    print(f"\n{'engine':<24}{'pages':>8}{'seconds':>10}{'pages/sec':>12}{'speedup':>10}{'1st page':>11}")
+    print(f"{'sequential (previous)':<24}{pages:>8}{pages / baseline:>10.2f}{baseline:>12.1f}{1.0:>9.2f}x{'-':>11}")
+
+    for workers in args.workers:
+        pages, elapsed, first_page, whole = await extract_parallel(
+            paths, workers, args.pages_per_shard, args.concurrent_docs
+        )
+        rate = pages / elapsed
+        print(
+            f"{f'pool, {workers} workers':<24}{pages:>8}{elapsed:>10.2f}{rate:>12.1f}"
+            f"{rate / baseline:>9.2f}x{first_page * 1000:>9.0f}ms"
+        )
+
+    print(f"\n1st page: time to the first page of the largest document (whole document: {whole:.2f}s at {args.workers[-1]} workers)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pages/sec of PDF extraction at several worker counts")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Directory of PDFs")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--pages-per-shard", type=int, default=8)
+    parser.add_argument("--concurrent-docs", type=int, default=4, help="Documents extracted at once")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N documents (0 = all)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark session history compaction (tokens per turn)
+
+Simulates a long interactive session and reports the estimated input tokens
+of each /stream request with the full history resent (previous behavior)
+and with SessionHistoryManager compaction.
+
+Runs offline with the extractive summarizer by default; --summarizer claude
+uses real Claude summaries (requires ANTHROPIC_API_KEY in .env).
+
+Usage:
+    python benchmark_session_history.py
+    python benchmark_session_history.py --turns 50 --budget 30000
+    python benchmark_session_history.py --assistant-chars 8000 --every 1
+"""
+import argparse
+import asyncio
+import random
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.session_history import (
+    SessionHistoryManager,
+    DEFAULT_TOKEN_BUDGET,
+    claude_summary,
+    estimate_tokens,
+    extractive_summary,
+)
+from app.services.session_service import MessageRole, SessionService
+
+WORDS = (
+    "sukuk ijara murabaha musharaka asset ownership transfer AAOIFI standard "
+    "shariah board review disclosure requirement rental payment purchase "
+    "undertaking compliance certificate profit rate tenor issuer obligor"
+).split()
+
+
+def synthetic_text(rng: random.Random, chars: int) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+async def run(args) -> None:
+    rng = random.Random(42)
+    summarizer = claude_summary if args.summarizer == "claude" else extractive_summary
+    manager = SessionHistoryManager(token_budget=args.budget, summarizer=summarizer)
+    sessions = SessionService()
+
+    session = await sessions.create_session(
+        template_id="sukuk_compliance_review",
+        system_prompt=synthetic_text(rng, args.system_chars),
+        initial_message=synthetic_text(rng, args.user_chars)
+    )
+    context = synthetic_text(rng, args.context_chars)
+
+    full_total = 0
+    compact_total = 0
+    rows = []
+
+    for turn in range(1, args.turns + 1):
+        # Previous behavior: every message resent (context only on turn 1)
+        full_tokens = estimate_tokens(session.system_prompt) + sum(m.token_count for m in session.messages)
+        if turn == 1:
+            full_tokens += estimate_tokens(context)
+
+        messages = await manager.build_messages(session, context=context)
+        compact_tokens = estimate_tokens(session.system_prompt) + sum(
+            estimate_tokens(m["content"]) for m in messages
+        )
+
+        full_total += full_tokens
+        compact_total += compact_tokens
+        rows.append((turn, full_tokens, compact_tokens, len(messages)))
+
+        # Assistant answers, user follows up
+        await sessions.append_message(session.session_id, MessageRole.ASSISTANT, synthetic_text(rng, args.assistant_chars))
+        await sessions.append_message(session.session_id, MessageRole.USER, synthetic_text(rng, args.user_chars))
+        session = await sessions.get_session(session.session_id)
+
+    print("=" * 60)
+    print("Session History Compaction Benchmark")
+    print("=" * 60)
+    print(f"Turns: {args.turns}  |  Budget: {args.budget} tokens  |  Summarizer: {args.summarizer}")
+    print(f"\n{'turn':>5}{'full history':>16}{'compacted':>14}{'messages':>11}   (est. input tokens)")
+    for turn, full_tokens, compact_tokens, count in rows:
+        if turn == 1 or turn % args.every == 0 or turn == args.turns:
+            print(f"{turn:>5}{full_tokens:>16,}{compact_tokens:>14,}{count:>11}")
+
+    print(f"\nTotal input tokens:  full {full_total:,}  |  compacted {compact_total:,}")
+    print(f"Mean tokens/turn:    full {full_total // args.turns:,}  |  compacted {compact_total // args.turns:,}")
+    print(f"Peak tokens/turn:    full {max(r[1] for r in rows):,}  |  compacted {max(r[2] for r in rows):,}")
+    print(f"Compactions: {manager.compactions} ({manager.compacted_messages} messages summarized)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tokens per turn with and without history compaction")
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--budget", type=int, default=DEFAULT_TOKEN_BUDGET, help="Token budget per request")
+    parser.add_argument("--system-chars", type=int, default=6000)
+    parser.add_argument("--context-chars", type=int, default=8000)
+    parser.add_argument("--user-chars", type=int, default=600)
+    parser.add_argument("--assistant-chars", type=int, default=6000)
+    parser.add_argument("--summarizer", default="extractive", choices=["extractive", "claude"])
+    parser.add_argument("--every", type=int, default=5, help="Print every Nth turn")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
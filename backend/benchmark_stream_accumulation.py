@@ -0,0 +1,165 @@
+"""
+Benchmark CPU per streamed token (response accumulation)
+
+Measures the CPU cost of accumulating a max-length Claude answer
+(max_tokens=16384, one text delta per token):
+
+1. Accumulation only: the previous pattern (ClaudeService, WorkflowEngine
+   and the session stream each building the text with `+=`, one of them on
+   execution.current_response) against one shared ResponseBuffer
+2. Pipeline: WorkflowEngine.execute_workflow end to end over a synthetic
+   Anthropic stream (no network; process CPU time per token)
+
+Usage:
+    python benchmark_stream_accumulation.py
+    python benchmark_stream_accumulation.py --tokens 16384 --chars-per-token 4 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# No request leaves the process - the Anthropic client is replaced below
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from app.services.claude_service import get_claude_service
+from app.services.response_buffer import ResponseBuffer
+from app.services.workflow_engine import WorkflowEngine
+
+WORDS = (
+    "sukuk ijara murabaha musharaka asset ownership transfer AAOIFI standard "
+    "shariah board review disclosure requirement rental payment purchase"
+).split()
+
+
+def synthetic_deltas(tokens: int, chars_per_token: int) -> list:
+    rng = random.Random(42)
+    deltas = []
+    for _ in range(tokens):
+        word = rng.choice(WORDS)
+        deltas.append((" " + word)[:chars_per_token].ljust(chars_per_token))
+    return deltas
+
+
+class SyntheticStream:
+    """Stand-in for AsyncAnthropic.messages.stream(...)"""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        for delta in self.deltas:
+            yield delta
+
+    async def get_final_message(self):
+        usage = SimpleNamespace(
+            input_tokens=1000, output_tokens=len(self.deltas),
+            cache_creation_input_tokens=0, cache_read_input_tokens=0
+        )
+        return SimpleNamespace(usage=usage, stop_reason="max_tokens")
+
+
+class SyntheticAnthropic:
+    def __init__(self, deltas):
+        self.messages = SimpleNamespace(stream=lambda **kwargs: SyntheticStream(deltas))
+
+
+# ---------------------------------------------------------------------------
+# 1. Accumulation only
+# ---------------------------------------------------------------------------
+
+def accumulate_concat(deltas) -> int:
+    """Previous pattern: three independent `+=` accumulators per stream"""
+    execution = SimpleNamespace(current_response="")
+    full_response = ""   # ClaudeService
+    turn_response = ""   # WorkflowEngine (per turn)
+    for delta in deltas:
+        full_response += delta
+        turn_response += delta
+        execution.current_response += delta
+    return len(full_response) + len(turn_response) + len(execution.current_response)
+
+
+def accumulate_buffer(deltas, snapshots: int) -> int:
+    """Shared ResponseBuffer, joined at progress saves and on completion"""
+    buffer = ResponseBuffer()
+    every = max(1, len(deltas) // max(1, snapshots))
+    for i, delta in enumerate(deltas, 1):
+        buffer.append(delta)
+        if i % every == 0:
+            buffer.text
+    return len(buffer.text)
+
+
+def cpu_us_per_token(fn, deltas, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        fn(deltas)
+        samples.append((time.process_time() - started) / len(deltas) * 1e6)
+    return statistics.median(samples)
+
+
+# ---------------------------------------------------------------------------
+# 2. Pipeline
+# ---------------------------------------------------------------------------
+
+async def pipeline_us_per_token(deltas, repeat: int) -> float:
+    service = get_claude_service()
+    service.client = SyntheticAnthropic(deltas)
+    service.response_cache = None
+    engine = WorkflowEngine()
+
+    samples = []
+    for _ in range(repeat):
+        execution_id = await engine.create_execution(template_id="benchmark")
+        started = time.process_time()
+        async for _ in engine.execute_workflow(execution_id, system_prompt="benchmark"):
+            pass
+        samples.append((time.process_time() - started) / len(deltas) * 1e6)
+
+        execution = await engine.get_execution(execution_id)
+        assert len(execution.current_response) == sum(len(d) for d in deltas)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU per streamed token for response accumulation")
+    parser.add_argument("--tokens", type=int, default=16384, help="Streamed deltas (max_tokens)")
+    parser.add_argument("--chars-per-token", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--snapshots", type=int, default=60,
+                        help="Progress saves per stream (PROGRESS_SAVE_SECONDS over a ~60s answer)")
+    args = parser.parse_args()
+
+    deltas = synthetic_deltas(args.tokens, args.chars_per_token)
+
+    concat_us = cpu_us_per_token(accumulate_concat, deltas, args.repeat)
+    buffer_us = cpu_us_per_token(lambda d: accumulate_buffer(d, args.snapshots), deltas, args.repeat)
+    pipeline_us = asyncio.run(pipeline_us_per_token(deltas, args.repeat))
+
+    print("=" * 60)
+    print("Stream Accumulation Benchmark")
+    print("=" * 60)
+    print(f"Tokens: {args.tokens:,}  |  Chars/token: {args.chars_per_token}  |  Repeat: {args.repeat} (median)")
+    print(f"\n{'accumulation':<36}{'CPU µs/token':>14}{'CPU ms/stream':>15}")
+    print(f"{'string += (3 accumulators)':<36}{concat_us:>14.3f}{concat_us * args.tokens / 1000:>15.1f}")
+    print(f"{'shared ResponseBuffer':<36}{buffer_us:>14.3f}{buffer_us * args.tokens / 1000:>15.1f}")
+    print(f"\n{'pipeline (execute_workflow)':<36}{pipeline_us:>14.3f}{pipeline_us * args.tokens / 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
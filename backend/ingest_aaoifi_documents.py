@@ -1,19 +1,48 @@
 """
-AAOIFI DOCUMENT INGESTION SCRIPT
-==================================
-Parse and ingest AAOIFI standards documents into Graphiti knowledge graph.
-
-This script:
-1. Parses SS_08_Murabahah.pdf and SS_30_Monetization_Tawarruq.pdf
-2. Ingests them into Graphiti with group_id "aaoifi"
-3. Makes them searchable for workflow execution
+AAOIFI CORPUS INGESTION
+=======================
+Parse and ingest every AAOIFI standard in AAOIFI_Standards/ into the
+Graphiti knowledge graph.
+
+PIPELINE:
+1. Parse: --parse-concurrency workers take files from a path queue (PyPDF2
+   pages run in the shared extraction process pool; unchanged files come
+   from the parse cache)
+2. Chunk: page/section chunks with stable hashes (document_chunker.py)
+3. Ingest: --ingest-concurrency workers send new/changed chunks through
+   add_episodes_bulk in batches of --batch-size
+
+BACKPRESSURE:
+- Parsed documents wait in a queue of at most --queue-size; a parse worker
+  blocks on a full queue before taking its next file, so when Graphiti falls
+  behind parsing pauses instead of holding the whole corpus in memory (at
+  most parse-concurrency + queue-size + ingest-concurrency documents)
+
+CHECKPOINTS / RESUME:
+- Each finished document is recorded (file SHA-256) in --checkpoint; a rerun
+  skips recorded files whose content is unchanged
+- Within a document the chunk manifest is saved after every bulk batch, so
+  a crash mid-document resumes with the batches that did not complete
+- --restart ignores the checkpoint (chunk manifests still skip chunks that
+  are already in the graph)
+
+Usage:
+    python ingest_aaoifi_documents.py
+    python ingest_aaoifi_documents.py --corpus ../AAOIFI_Standards --pattern "SS_*.pdf"
+    python ingest_aaoifi_documents.py --ingest-concurrency 2 --batch-size 10
+    python ingest_aaoifi_documents.py --dry-run   # parse + chunk only
 """
 
+import argparse
 import asyncio
+import json
 import logging
-import sys
 import os
+import sys
+import time
 from pathlib import Path
+from typing import Any, Dict, List
+
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,8 +51,11 @@ load_dotenv()
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from app.services.document_chunker import DEFAULT_MANIFEST_DIR, chunk_document
 from app.services.document_service import get_document_service
-from app.services.graphiti_service import get_graphiti_service
+from app.services.graphiti_mcp_client import get_graphiti_mcp_client
+from app.services.graphiti_mcp_service import DEFAULT_BULK_BATCH_SIZE, get_graphiti_mcp_service
+from app.services.parse_cache import hash_file
 
 # Configure logging
 logging.basicConfig(
@@ -32,93 +64,225 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_CORPUS = Path(__file__).resolve().parent.parent / "AAOIFI_Standards"
+DEFAULT_CHECKPOINT = Path(DEFAULT_MANIFEST_DIR) / "aaoifi_corpus_checkpoint.json"
+DOCUMENT_TYPE = "aaoifi"
+
+
+def document_metadata(path: Path, file_sha256: str) -> Dict[str, Any]:
+    """Metadata derived from the corpus file name (e.g. SS_08_Murabahah.pdf)"""
+    parts = path.stem.split("_")
+    if parts[0] == "SS" and len(parts) > 1:
+        category, number = "shariah_standard", parts[1]
+    else:
+        category, number = "front_matter", None
+    return {
+        "filename": path.name,
+        "file_sha256": file_sha256,
+        "category": category,
+        "standard_number": number,
+        "prov_system": "aaoifi_db",
+        "prov_file_ids": [path.name],
+    }
+
+
+class Checkpoint:
+    """Finished documents by file name -> file SHA-256 (saved after each document)"""
+
+    def __init__(self, path: Path, restart: bool = False):
+        self.path = path
+        self.done: Dict[str, Dict[str, Any]] = {}
+        if not restart and path.exists():
+            self.done = json.loads(path.read_text(encoding="utf-8")).get("documents", {})
+
+    def is_done(self, name: str, file_sha256: str) -> bool:
+        entry = self.done.get(name)
+        return entry is not None and entry["sha256"] == file_sha256
+
+    def record(self, name: str, file_sha256: str, chunks: int) -> None:
+        self.done[name] = {"sha256": file_sha256, "chunks": chunks, "ingested_at": time.time()}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"documents": self.done}, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class Stats:
+    """Corpus-level counters"""
+
+    def __init__(self, total: int, dry_run: bool = False):
+        self.total = total
+        self.dry_run = dry_run
+        self.started = time.perf_counter()
+        self.documents = 0
+        self.skipped = 0
+        self.failed: List[str] = []
+        self.chunks = 0
+        self.chunks_sent = 0
+        self.parse_cached = 0
+
+    @property
+    def minutes(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9) / 60
 
-async def ingest_aaoifi_documents():
-    """
-    Parse and ingest AAOIFI standards into Graphiti.
-    """
+    @property
+    def finished(self) -> int:
+        return self.documents + self.skipped + len(self.failed)
+
+
+async def parse_document(path: Path, checkpoint: Checkpoint, stats: Stats, queue: asyncio.Queue) -> None:
+    """Hash, parse and chunk one file, then queue it for ingestion (waits while the queue is full)"""
     try:
-        # Document paths
-        documents = [
-            {
-                "path": Path("../AAOIFI_Standards/SS_08_Murabahah.pdf"),
-                "name": "SS_08_Murabahah",
-                "description": "AAOIFI Shariah Standard 08 - Murabahah (Cost-Plus Sale)"
-            },
-            {
-                "path": Path("../AAOIFI_Standards/SS_30_Monetization_Tawarruq.pdf"),
-                "name": "SS_30_Monetization_Tawarruq",
-                "description": "AAOIFI Shariah Standard 30 - Monetization (Tawarruq)"
-            }
-        ]
-
-        logger.info("=" * 80)
-        logger.info("AAOIFI DOCUMENT INGESTION")
-        logger.info("=" * 80)
-
-        # Get services
-        doc_service = get_document_service()
-        graphiti_service = get_graphiti_service()
-
-        ingested_docs = []
-
-        for doc in documents:
-            logger.info(f"\n📄 Processing: {doc['name']}")
-            logger.info(f"   Description: {doc['description']}")
-
-            # Check if file exists
-            if not doc['path'].exists():
-                logger.error(f"   ❌ File not found: {doc['path']}")
-                continue
-
-            # Parse document
-            logger.info(f"   📖 Parsing PDF...")
-            text = await doc_service.parse_pdf(doc['path'])
-            logger.info(f"   ✅ Extracted {len(text):,} characters")
-
-            # Ingest into Graphiti with "aaoifi" group_id
-            logger.info(f"   🔗 Ingesting into Graphiti knowledge graph...")
-            episode_id = await graphiti_service.ingest_document(
-                content=text,
-                document_name=doc['name'],
-                document_type="aaoifi",
-                metadata={
-                    "filename": doc['path'].name,
-                    "description": doc['description'],
-                    "standard_number": doc['name'].split('_')[1],  # "08" or "30"
-                    "category": "shariah_standard"
-                }
+        file_sha256 = await asyncio.to_thread(hash_file, path)
+        if checkpoint.is_done(path.name, file_sha256):
+            stats.skipped += 1
+            logger.info(f"⏭️ [{stats.finished}/{stats.total}] {path.name}: unchanged since checkpoint")
+            return
+
+        parsed = await get_document_service().parse(path, file_sha256)
+        stats.parse_cached += parsed.cached
+        chunks = chunk_document(parsed)
+    except Exception as e:
+        stats.failed.append(path.name)
+        logger.error(f"❌ [{stats.finished}/{stats.total}] {path.name}: parsing failed: {e}")
+        return
+
+    await queue.put((path, file_sha256, chunks))
+
+
+async def parse_worker(paths: asyncio.Queue, checkpoint: Checkpoint, stats: Stats, queue: asyncio.Queue) -> None:
+    """Parse files from the path queue until it is empty (one document in hand at a time)"""
+    while True:
+        try:
+            path = paths.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        await parse_document(path, checkpoint, stats, queue)
+
+
+async def ingest_worker(
+    queue: asyncio.Queue,
+    checkpoint: Checkpoint,
+    stats: Stats,
+    batch_size: int,
+    dry_run: bool
+) -> None:
+    """Send queued documents' new/changed chunks to Graphiti until a None sentinel"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        path, file_sha256, chunks = item
+
+        try:
+            started = time.perf_counter()
+            if dry_run:
+                sent = 0
+            else:
+                result = await get_graphiti_mcp_service().ingest_chunks(
+                    chunks,
+                    document_name=path.name,
+                    document_type=DOCUMENT_TYPE,
+                    metadata=document_metadata(path, file_sha256),
+                    batch_size=batch_size
+                )
+                sent = result["added"]
+                checkpoint.record(path.name, file_sha256, len(chunks))
+
+            stats.documents += 1
+            stats.chunks += len(chunks)
+            stats.chunks_sent += sent
+            logger.info(
+                f"✅ [{stats.finished}/{stats.total}] {path.name}: {len(chunks)} chunks, "
+                f"{sent} sent ({time.perf_counter() - started:.1f}s) | "
+                f"{stats.documents / stats.minutes:.1f} docs/min, {stats.chunks / stats.minutes:.0f} chunks/min"
             )
+        except Exception as e:
+            stats.failed.append(path.name)
+            logger.error(f"❌ [{stats.finished}/{stats.total}] {path.name}: ingestion failed: {e}")
 
-            logger.info(f"   ✅ Ingested successfully → Episode ID: {episode_id}")
 
-            ingested_docs.append({
-                "name": doc['name'],
-                "episode_id": episode_id,
-                "char_count": len(text)
-            })
+async def ingest_corpus(args) -> Stats:
+    """Run the parse -> chunk -> ingest pipeline over the corpus"""
+    paths = sorted(Path(args.corpus).glob(args.pattern))[:args.limit or None]
+    if not paths:
+        raise SystemExit(f"No files matching {args.pattern} in {args.corpus}")
 
-        # Summary
-        logger.info("\n" + "=" * 80)
-        logger.info("INGESTION COMPLETE")
-        logger.info("=" * 80)
-        logger.info(f"\nTotal documents ingested: {len(ingested_docs)}")
+    checkpoint = Checkpoint(Path(args.checkpoint), restart=args.restart)
+    stats = Stats(len(paths), dry_run=args.dry_run)
 
-        for doc in ingested_docs:
-            logger.info(f"  • {doc['name']}")
-            logger.info(f"    - Episode ID: {doc['episode_id']}")
-            logger.info(f"    - Content: {doc['char_count']:,} characters")
+    logger.info("=" * 80)
+    logger.info("AAOIFI CORPUS INGESTION" + (" (dry run)" if args.dry_run else ""))
+    logger.info("=" * 80)
+    logger.info(
+        f"Corpus: {args.corpus} | Documents: {len(paths)} | Parse: {args.parse_concurrency} at once | "
+        f"Ingest: {args.ingest_concurrency} workers x {args.batch_size} episodes/batch | Queue: {args.queue_size}"
+    )
 
-        logger.info("\n✅ AAOIFI standards are now searchable in the knowledge graph!")
-        logger.info("   Group ID: 'aaoifi'")
-        logger.info("   Use these standards in Murabaha/Tawarruq workflows.\n")
+    pending: asyncio.Queue = asyncio.Queue()
+    for path in paths:
+        pending.put_nowait(path)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=args.queue_size)
+    workers = [
+        asyncio.create_task(ingest_worker(queue, checkpoint, stats, args.batch_size, args.dry_run))
+        for _ in range(args.ingest_concurrency)
+    ]
 
-        return ingested_docs
+    try:
+        await asyncio.gather(*(
+            parse_worker(pending, checkpoint, stats, queue) for _ in range(args.parse_concurrency)
+        ))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        get_document_service().pdf_extractor.close()
+        if not args.dry_run:
+            await get_graphiti_mcp_client().disconnect()
 
-    except Exception as e:
-        logger.error(f"\n❌ Ingestion failed: {e}", exc_info=True)
-        raise
+    return stats
+
+
+def report(stats: Stats) -> None:
+    logger.info("\n" + "=" * 80)
+    logger.info("INGESTION COMPLETE")
+    logger.info("=" * 80)
+    logger.info(f"Documents ingested: {stats.documents} ({stats.parse_cached} from parse cache)")
+    logger.info(f"Unchanged (checkpoint): {stats.skipped}")
+    logger.info(f"Failed: {len(stats.failed)}{' - ' + ', '.join(stats.failed) if stats.failed else ''}")
+    if stats.dry_run:
+        logger.info(f"Chunks: {stats.chunks} (dry run, nothing sent)")
+    else:
+        logger.info(f"Chunks: {stats.chunks} ({stats.chunks_sent} sent, {stats.chunks - stats.chunks_sent} unchanged)")
+    logger.info(f"Elapsed: {stats.minutes * 60:.1f}s")
+    logger.info(
+        f"Throughput: {stats.documents / stats.minutes:.1f} docs/min, "
+        f"{stats.chunks / stats.minutes:.0f} chunks/min ({stats.chunks_sent / stats.minutes:.0f} sent/min)"
+    )
+    if stats.failed:
+        logger.info("Rerun to retry failed documents (finished ones are skipped)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the AAOIFI standards corpus into Graphiti")
+    parser.add_argument("--corpus", default=str(DEFAULT_CORPUS), help="Directory of standards")
+    parser.add_argument("--pattern", default="*.pdf", help="Files to ingest (glob)")
+    parser.add_argument("--limit", type=int, default=0, help="Only the first N files (0 = all)")
+    parser.add_argument("--parse-concurrency", type=int, default=4, help="Documents parsed at once")
+    parser.add_argument("--ingest-concurrency", type=int, default=2, help="Concurrent add_episodes_bulk callers")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BULK_BATCH_SIZE, help="Episodes per bulk call")
+    parser.add_argument("--queue-size", type=int, default=4, help="Parsed documents waiting for ingestion")
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT), help="Progress file for resume")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint")
+    parser.add_argument("--dry-run", action="store_true", help="Parse and chunk only, no Graphiti calls")
+    args = parser.parse_args()
+
+    stats = asyncio.run(ingest_corpus(args))
+    report(stats)
+    sys.exit(1 if stats.failed else 0)
 
 
 if __name__ == "__main__":
-    asyncio.run(ingest_aaoifi_documents())
+    main()
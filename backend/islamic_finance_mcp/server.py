@@ -46,6 +46,7 @@ try:
     from app.services.workflow_engine import WorkflowEngine
     from app.services.document_service import DocumentService
     from app.services.session_service import SessionService
+    from app.services.dashboard_service import DashboardService
     from app.models import StakeholderRole
 except ImportError as e:
     print(f"ERROR: Could not import backend services: {e}", file=sys.stderr)
@@ -473,8 +474,9 @@ async def list_tools() -> List[Tool]:
             name="get_portfolio_metrics",
             description=(
                 "Get aggregate metrics across all contracts in the portfolio. "
-                "Returns contract counts by status, average completion time, "
-                "approval rates, overdue counts, and impact methodology distribution. "
+                "Returns contract counts by compliance and lifecycle status, average "
+                "completion, overdue counts, per-component compliance rollups, and "
+                "optional per-group breakdowns (e.g. impact methodology distribution). "
                 "Used by compliance managers and executives for oversight."
             ),
             inputSchema={
@@ -863,29 +865,10 @@ async def handle_get_dashboard(args: Dict[str, Any]) -> Dict[str, Any]:
 
 async def handle_get_portfolio_metrics(args: Dict[str, Any]) -> Dict[str, Any]:
     """Handle get_portfolio_metrics tool call"""
-    # TODO: Integrate with analytics service
-    return {
-        "time_period": args.get("time_period", "last_30_days"),
-        "metrics": {
-            "total_contracts": 15,
-            "by_status": {
-                "draft": 2,
-                "in_progress": 8,
-                "pending_approval": 3,
-                "approved": 1,
-                "executed": 1
-            },
-            "by_contract_type": {
-                "mudaraba": 5,
-                "murabaha": 4,
-                "musharaka": 3,
-                "ijara": 2,
-                "sukuk": 1
-            },
-            "average_completion_days": 14.5,
-            "approval_rate": 0.93
-        }
-    }
+    return await DashboardService.get_portfolio_metrics(
+        time_period=args.get("time_period", "last_30_days"),
+        group_by=args.get("group_by")
+    )
 
 
 async def handle_add_comment(args: Dict[str, Any]) -> Dict[str, Any]:
@@ -1124,6 +1107,15 @@ async def main():
     # Initialize services
     # (Already initialized at module level)
 
+    # Deal storage backs get_portfolio_metrics (via DashboardService) - this
+    # process does not run the FastAPI lifespan, so initialize it here the
+    # same way: create/load the SQL tables, seed mock deals into an empty store
+    from app.services.deal_storage import DealStorage, seed_mock_deals
+    await DealStorage.initialize()
+    if await DealStorage.count_deals() == 0:
+        await seed_mock_deals()
+        logger.info("Seeded mock deals into empty deal storage")
+
     # Run server
     async with stdio_server() as (read_stream, write_stream):
         logger.info("Server started successfully")
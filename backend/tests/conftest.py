@@ -0,0 +1,5 @@
+"""Make the backend package (app.*) importable when running pytest from backend/ or the repo root"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
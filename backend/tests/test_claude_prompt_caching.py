@@ -0,0 +1,191 @@
+"""
+Prompt caching in ClaudeService against a local stub of the Messages API.
+
+The stub records the request kwargs of messages.create / messages.stream and
+returns canned usage, so no network access or API key is needed.
+"""
+
+import asyncio
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.claude_service import ClaudeService
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def make_usage(input_tokens=10, output_tokens=5, cache_creation=0, cache_read=0):
+    return SimpleNamespace(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cache_creation_input_tokens=cache_creation,
+        cache_read_input_tokens=cache_read,
+    )
+
+
+class StubStream:
+    def __init__(self, chunks, usage):
+        self._chunks = chunks
+        self._usage = usage
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        async def iterate():
+            for chunk in self._chunks:
+                yield chunk
+        return iterate()
+
+    async def get_final_message(self):
+        return SimpleNamespace(usage=self._usage, stop_reason="end_turn")
+
+
+class StubMessages:
+    """messages.create / messages.stream returning canned responses"""
+
+    def __init__(self, usage):
+        self.usage = usage
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(copy.deepcopy(kwargs))
+        return SimpleNamespace(
+            content=[SimpleNamespace(text="stub answer")],
+            usage=self.usage,
+            stop_reason="end_turn",
+        )
+
+    def stream(self, **kwargs):
+        self.requests.append(copy.deepcopy(kwargs))
+        return StubStream(["stub ", "answer"], self.usage)
+
+
+def make_service(usage=None, prompt_caching=True):
+    service = ClaudeService(anthropic_api_key="test-key", prompt_caching=prompt_caching, response_cache=None)
+    service.client = SimpleNamespace(messages=StubMessages(usage or make_usage()))
+    return service
+
+
+def breakpoints(request):
+    """Every block of a request carrying cache_control"""
+    blocks = list(request["system"]) if isinstance(request["system"], list) else []
+    for message in request["messages"]:
+        if isinstance(message["content"], list):
+            blocks.extend(message["content"])
+    return [block for block in blocks if "cache_control" in block]
+
+
+def is_cached(content):
+    return isinstance(content, list) and content[-1].get("cache_control") == EPHEMERAL
+
+
+async def consume(generator):
+    return "".join([chunk async for chunk in generator])
+
+
+def test_generate_marks_system_prompt_and_context():
+    service = make_service()
+    asyncio.run(service.generate("You are a Shariah reviewer.", "Review this deal.", context="FAS 28 facts"))
+
+    request = service.client.messages.requests[0]
+    assert request["system"] == [
+        {"type": "text", "text": "You are a Shariah reviewer.", "cache_control": EPHEMERAL}
+    ]
+    context_message, user_message = request["messages"]
+    assert is_cached(context_message["content"])
+    assert "FAS 28 facts" in context_message["content"][0]["text"]
+    assert user_message == {"role": "user", "content": "Review this deal."}
+    assert len(breakpoints(request)) == 2
+
+
+def test_stream_generate_marks_system_prompt_and_context():
+    service = make_service()
+    text = asyncio.run(consume(service.stream_generate("System", "Question", context="Graph context")))
+
+    assert text == "stub answer"
+    request = service.client.messages.requests[0]
+    assert request["system"][0]["cache_control"] == EPHEMERAL
+    assert is_cached(request["messages"][0]["content"])
+    assert len(breakpoints(request)) <= 4
+
+
+def test_history_marks_previous_and_last_user_turns_without_mutating_caller():
+    messages = [
+        {"role": "user", "content": "Context and first question"},
+        {"role": "assistant", "content": "First answer"},
+        {"role": "user", "content": "Second question"},
+        {"role": "assistant", "content": "Second answer"},
+        {"role": "user", "content": "Third question"},
+    ]
+    original = copy.deepcopy(messages)
+    service = make_service()
+
+    asyncio.run(consume(service.stream_with_messages("System", messages)))
+
+    assert messages == original
+    request = service.client.messages.requests[0]
+    sent = request["messages"]
+    assert request["system"][0]["cache_control"] == EPHEMERAL
+    assert is_cached(sent[4]["content"])  # last user turn (written for the next turn)
+    assert is_cached(sent[2]["content"])  # previous user turn (read from last turn's write)
+    assert sent[0]["content"] == "Context and first question"
+    assert sent[1]["content"] == "First answer"
+    assert sent[3]["content"] == "Second answer"
+    assert len(breakpoints(request)) == 3
+
+
+def test_history_with_premarked_blocks_stays_within_four_breakpoints():
+    marked = lambda text: [{"type": "text", "text": text, "cache_control": EPHEMERAL}]
+    messages = [
+        {"role": "user", "content": marked("Context")},
+        {"role": "assistant", "content": marked("Answer 1")},
+        {"role": "user", "content": marked("Question 2")},
+        {"role": "assistant", "content": marked("Answer 2")},
+        {"role": "user", "content": [{"type": "text", "text": "Extra"}, *marked("Question 3")]},
+    ]
+    original = copy.deepcopy(messages)
+    service = make_service()
+
+    asyncio.run(consume(service.stream_with_messages("System", messages)))
+
+    assert messages == original
+    request = service.client.messages.requests[0]
+    assert len(breakpoints(request)) <= 4
+    assert is_cached(request["messages"][-1]["content"])
+
+
+def test_prompt_caching_off_sends_plain_request():
+    service = make_service(prompt_caching=False)
+    messages = [{"role": "user", "content": "Question"}]
+
+    asyncio.run(consume(service.stream_with_messages("System", messages)))
+
+    request = service.client.messages.requests[0]
+    assert request["system"] == "System"
+    assert request["messages"] == messages
+
+
+def test_cache_tokens_added_to_usage_stats():
+    service = make_service(make_usage(input_tokens=20, output_tokens=7, cache_creation=1000, cache_read=0))
+    result = asyncio.run(service.generate("System", "Question"))
+    assert result["usage"]["cache_creation_input_tokens"] == 1000
+
+    service.client.messages.usage = make_usage(input_tokens=20, output_tokens=7, cache_creation=0, cache_read=1000)
+    asyncio.run(consume(service.stream_with_messages("System", [{"role": "user", "content": "Question"}])))
+
+    stats = service.get_usage_stats()
+    assert stats["calls"] == 2
+    assert stats["input_tokens"] == 40
+    assert stats["output_tokens"] == 14
+    assert stats["cache_creation_input_tokens"] == 1000
+    assert stats["cache_read_input_tokens"] == 1000
+    assert stats["cache_hit_ratio"] == pytest.approx(1000 / 2040)
+    assert stats["last_call"]["cache_read_input_tokens"] == 1000
+    assert stats["last_call"]["time_to_first_token_ms"] is not None
@@ -0,0 +1,144 @@
+"""
+Workflow interrupts against a stub ClaudeService (no network access).
+
+Covers guidance published mid-stream, before the first chunk (while
+Graphiti context is retrieved), after the stream queued its final "done"
+event, and guidance that is both stored on the execution and published.
+"""
+
+import asyncio
+
+from app.services import workflow_engine as workflow_engine_module
+from app.services.workflow_engine import ExecutionStatus, WorkflowEngine
+
+
+class StubClaudeService:
+    """stream_generate / stream_with_messages yielding canned chunks"""
+
+    def __init__(self):
+        self.user_messages = []
+        self.conversations = []
+
+    def format_context_message(self, context):
+        return context
+
+    async def _stream(self, chunks, buffer):
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            buffer.append(chunk)
+            yield chunk
+
+    def stream_generate(self, system_prompt, user_message, context=None, metadata=None, buffer=None):
+        self.user_messages.append(user_message)
+        return self._stream(["first ", "answer ", "a3 ", "a4 "], buffer)
+
+    def stream_with_messages(self, system_prompt, messages, metadata=None, buffer=None):
+        self.conversations.append(messages)
+        return self._stream([" revised"], buffer)
+
+
+class LateInterruptEngine(WorkflowEngine):
+    """Publishes an interrupt right after the first stream queues "done" """
+
+    def __init__(self):
+        super().__init__()
+        self.execution_id = None
+        self.sent = False
+
+    async def _pump(self, stream, events):
+        await WorkflowEngine._pump(stream, events)
+        if not self.sent:
+            self.sent = True
+            await self.add_interrupt(self.execution_id, "cite the standard")
+
+
+class ContextInterruptEngine(WorkflowEngine):
+    """Publishes an interrupt while Graphiti context is being retrieved"""
+
+    async def _get_graphiti_context(self, execution, required_standards=None):
+        await self.add_interrupt(execution.id, "cite the standard")
+        await asyncio.sleep(0)
+        return "context"
+
+
+class StoredInterruptEngine(WorkflowEngine):
+    """Posts guidance between the stream's subscribe and its state read"""
+
+    async def get_execution(self, execution_id):
+        execution = await super().get_execution(execution_id)
+        if execution and execution.status == ExecutionStatus.PENDING:
+            await self.add_interrupt(execution_id, "cite the standard")
+            execution = await super().get_execution(execution_id)
+        return execution
+
+
+async def run_execution(engine, on_chunk=None):
+    execution_id = await engine.create_execution("template-1", context_text="deal terms")
+    engine.execution_id = execution_id
+    chunks = []
+    async for chunk in engine.execute_workflow(execution_id, "system"):
+        chunks.append(chunk)
+        if on_chunk:
+            await on_chunk(engine, chunks)
+    return chunks, await engine.get_execution(execution_id)
+
+
+def use_stub(monkeypatch):
+    claude = StubClaudeService()
+    monkeypatch.setattr(workflow_engine_module, "get_claude_service", lambda: claude)
+    return claude
+
+
+def assert_reprompted_once(claude, chunks, execution):
+    assert execution.status == ExecutionStatus.COMPLETED
+    assert execution.current_response == "".join(chunks)
+    assert chunks[-1] == " revised"
+    assert len(claude.conversations) == 1
+    assert claude.conversations[0][-1]["role"] == "user"
+    assert "cite the standard" in claude.conversations[0][-1]["content"]
+    assert [i["message"] for i in execution.interrupts] == ["cite the standard"]
+
+
+def test_interrupt_mid_stream_cancels_and_reprompts(monkeypatch):
+    claude = use_stub(monkeypatch)
+
+    async def interrupt_after_first(engine, chunks):
+        if len(chunks) == 1:
+            await engine.add_interrupt(engine.execution_id, "cite the standard")
+
+    chunks, execution = asyncio.run(run_execution(WorkflowEngine(), interrupt_after_first))
+
+    assert_reprompted_once(claude, chunks, execution)
+    assert "a4 " not in chunks
+    partial = "".join(chunks[:chunks.index("\n\n**[INTERRUPTED]**\n")])
+    assert claude.conversations[0][-2] == {"role": "assistant", "content": partial.rstrip()}
+
+
+def test_interrupt_before_first_chunk_is_folded_into_first_turn(monkeypatch):
+    claude = use_stub(monkeypatch)
+
+    chunks, execution = asyncio.run(run_execution(ContextInterruptEngine()))
+
+    assert_reprompted_once(claude, chunks, execution)
+    # The first generation never ran, so none of its text leaked into the transcript
+    assert not any(chunk in chunks for chunk in ("first ", "answer "))
+    assert len(claude.conversations[0]) == 1
+
+
+def test_stored_guidance_is_not_applied_twice(monkeypatch):
+    claude = use_stub(monkeypatch)
+
+    chunks, execution = asyncio.run(run_execution(StoredInterruptEngine()))
+
+    assert execution.status == ExecutionStatus.COMPLETED
+    assert "cite the standard" in claude.user_messages[0]
+    assert claude.conversations == []
+    assert "".join(chunks) == execution.current_response == "first answer a3 a4 "
+
+
+def test_interrupt_after_stream_end_reprompts(monkeypatch):
+    claude = use_stub(monkeypatch)
+
+    chunks, execution = asyncio.run(run_execution(LateInterruptEngine()))
+
+    assert_reprompted_once(claude, chunks, execution)
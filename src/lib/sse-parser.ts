@@ -182,6 +182,12 @@ export async function parseSSEStream(
           continue
         }
 
+        // "id: <offset>" line = characters received so far; a client that
+        // reconnects sends it as Last-Event-ID to resume (not used here)
+        if (line.startsWith('id:')) {
+          continue
+        }
+
         // Parse "event: <type>" line
         if (line.startsWith('event:')) {
           currentEvent.event = line.slice(6).trim()